@@ -1 +1,17 @@
-from .datasets import load_dataset, get_dataset_path
\ No newline at end of file
+__all__ = ["load_dataset", "get_dataset_path", "main"]
+
+
+def main(argv=None):
+    """Entry point of the `fysisk-biokemi` command (see `fysisk_biokemi.cli`)."""
+    from fysisk_biokemi.cli import main
+
+    return main(argv)
+
+
+def __getattr__(name):
+    # Imported on first use, so the command line starts without loading pandas.
+    if name in ("load_dataset", "get_dataset_path"):
+        from fysisk_biokemi import datasets
+
+        return getattr(datasets, name)
+    raise AttributeError(f"module 'fysisk_biokemi' has no attribute {name!r}")
@@ -0,0 +1,5 @@
+import sys
+
+from fysisk_biokemi.cli import main
+
+sys.exit(main())
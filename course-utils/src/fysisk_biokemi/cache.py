@@ -0,0 +1,335 @@
+"""Optional on-disk result cache shared by all kernels on a machine or hub.
+
+Results of the package's pure functions (`load_dataset`,
+`calculate_properties`, ...) are stored under a key made of the function
+name, the package version and a hash of the arguments, in either a SQLite
+database or a directory of pickle files. One warm cache can then serve every
+student kernel instead of each one recomputing the same results.
+
+The cache is off unless configured, either in code or with environment
+variables (read on first use):
+
+    FYSISK_BIOKEMI_CACHE=/srv/fysisk-biokemi/cache.sqlite   # or a directory
+    FYSISK_BIOKEMI_CACHE_READONLY=1                          # student kernels
+    FYSISK_BIOKEMI_CACHE_MAX_BYTES=2GB
+
+Values are pickled, so the cache location (and its parents) must be owned
+by root or the user running the kernel and not be writable by anyone else;
+the instructor's kernel warms it, student kernels read it. Any other
+location is refused and caching stays off (see `fysisk_biokemi.permissions`).
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import warnings
+from importlib.metadata import PackageNotFoundError, version
+
+from fysisk_biokemi.permissions import check_directory, check_owner
+
+
+ENV_PATH = "FYSISK_BIOKEMI_CACHE"
+ENV_READONLY = "FYSISK_BIOKEMI_CACHE_READONLY"
+ENV_MAX_BYTES = "FYSISK_BIOKEMI_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 1 * 2**30
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+try:
+    _VERSION = version("fysisk-biokemi")
+except PackageNotFoundError:
+    _VERSION = "dev"
+
+
+def parse_size(text):
+    """'500MB' -> 524288000; plain numbers are bytes."""
+    text = str(text).strip().upper().removesuffix("B")
+    units = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+
+def cache_key(name, args=(), kwargs=None):
+    """Key of one call: function name, package version and a hash of the arguments."""
+    payload = pickle.dumps((args, sorted((kwargs or {}).items())), protocol=5)
+    return f"{name}:{_VERSION}:{hashlib.sha256(payload).hexdigest()}"
+
+
+def _make_dir(path):
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+        os.chmod(path, 0o755)  # readable by the other users' kernels, whatever the umask
+
+
+class _Backend:
+    """Common bookkeeping for the storage backends."""
+
+    def __init__(self, path, read_only=False, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = os.fspath(path)
+        self.read_only = read_only
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "read_only": self.read_only,
+            "entries": len(self),
+            "nbytes": self.nbytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+class SQLiteCache(_Backend):
+    """Cache in one SQLite database; concurrent kernels are serialized by SQLite's locking."""
+
+    def __init__(self, path, read_only=False, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path, read_only, max_bytes)
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not read_only:
+            _make_dir(directory)
+        check_directory(directory)
+        if not read_only:
+            with self._connect() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS entries "
+                    "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            os.chmod(self.path, 0o644)
+
+    def _connect(self):
+        # sqlite3 connections may not be shared between threads (see JobRunner).
+        db = getattr(self._local, "db", None)
+        if db is None:
+            if self.read_only or os.path.exists(self.path):
+                check_owner(self.path)
+            if self.read_only:
+                db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=5)
+            else:
+                db = sqlite3.connect(self.path, timeout=30)
+                db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        db = self._connect()
+        row = db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if not self.read_only:
+            with db:
+                db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key, data):
+        if self.read_only or len(data) > self.max_bytes:
+            return
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (key, data, len(data), time.time())
+            )
+            self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def nbytes(self):
+        return self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM entries")
+
+
+class DirectoryCache(_Backend):
+    """Cache as one pickle file per entry; files are written to a temporary name and renamed into place."""
+
+    def __init__(self, path, read_only=False, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path, read_only, max_bytes)
+        if not read_only:
+            _make_dir(self.path)
+        check_directory(self.path)
+
+    def _file(self, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.path, digest[:2], digest + ".pkl")
+
+    def get(self, key):
+        path = self._file(key)
+        try:
+            check_owner(os.path.dirname(path))
+            check_owner(path)
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if not self.read_only:
+            try:
+                os.utime(path)  # eviction goes by last use
+            except OSError:
+                pass
+        return data
+
+    def put(self, key, data):
+        if self.read_only or len(data) > self.max_bytes:
+            return
+        path = self._file(key)
+        _make_dir(os.path.dirname(path))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp, 0o644)  # readable by the other users' kernels
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.path):
+            return entries
+        for shard in os.scandir(self.path):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".pkl"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # evicted by another kernel
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def nbytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def __len__(self):
+        return len(self._entries())
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+_backend = None
+_configured = False
+
+
+def configure(path=None, read_only=False, max_bytes=DEFAULT_MAX_BYTES):
+    """Use the cache at `path` (SQLite for .sqlite/.db files, otherwise a directory); None turns it off.
+
+    Raises ValueError if others than root and the current user could write to `path`.
+    """
+    global _backend, _configured
+    _configured = True
+    if path is None:
+        _backend = None
+    elif os.fspath(path).endswith(SQLITE_SUFFIXES):
+        _backend = SQLiteCache(path, read_only=read_only, max_bytes=max_bytes)
+    else:
+        _backend = DirectoryCache(path, read_only=read_only, max_bytes=max_bytes)
+    return _backend
+
+
+def configure_from_env():
+    path = os.environ.get(ENV_PATH, "").strip()
+    read_only = os.environ.get(ENV_READONLY, "").strip().lower() in ("1", "true", "yes", "on")
+    max_bytes = parse_size(os.environ.get(ENV_MAX_BYTES, DEFAULT_MAX_BYTES))
+    return configure(path or None, read_only=read_only, max_bytes=max_bytes)
+
+
+def get_cache():
+    """The configured backend, or None if the shared cache is off."""
+    if not _configured:
+        try:
+            configure_from_env()
+        except Exception as e:
+            # A missing, unreadable or untrusted cache must not break the course material.
+            warnings.warn(f"Shared cache disabled: {e}", stacklevel=2)
+            configure(None)
+    return _backend
+
+
+def cached(func=None, *, ignore=()):
+    """Serve calls of a pure function from the shared cache, when one is configured.
+
+    Arguments named in `ignore` (e.g. progress callbacks) are left out of the
+    key. Calls whose arguments or result cannot be pickled, and any error from
+    the cache itself, fall back to calling the function.
+
+    Example:
+        @cached
+        def load_dataset(name: str): ...
+    """
+    if func is None:
+        return functools.partial(cached, ignore=ignore)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        backend = get_cache()
+        if backend is None:
+            return func(*args, **kwargs)
+        try:
+            key = cache_key(name, args, {k: v for k, v in kwargs.items() if k not in ignore})
+            data = backend.get(key)
+        except Exception:
+            backend.errors += 1
+            return func(*args, **kwargs)
+        if data is not None:
+            try:
+                value = pickle.loads(data)
+            except Exception:
+                backend.errors += 1
+            else:
+                backend.hits += 1
+                return value
+
+        backend.misses += 1
+        value = func(*args, **kwargs)
+        try:
+            backend.put(key, pickle.dumps(value, protocol=5))
+        except Exception:
+            backend.errors += 1
+        return value
+
+    return wrapper
@@ -0,0 +1,411 @@
+"""Command line interface: batch processing of course data without Jupyter.
+
+    fysisk-biokemi properties proteins.fasta --ph 7.4 --workers 8 > properties.csv
+    fysisk-biokemi datasets convert --all --to csv --output-dir datasets/
+    fysisk-biokemi datasets verify --shared
+    fysisk-biokemi fit michaelis-menten group*.xlsx --x S --y v
+    fysisk-biokemi generate reaction --reaction "A = B" --initial A=1 --count 300 --output-dir students/
+
+Tables go to stdout as CSV unless an output is given; `.xlsx` and `.parquet`
+outputs are chosen by suffix. Heavy libraries are imported only by the
+subcommand that needs them, so `--help` returns immediately.
+"""
+
+import argparse
+import contextlib
+import csv
+import os
+import sys
+from collections import deque
+
+
+# ---------- Helpers ----------
+def _workers(n):
+    return n if n > 0 else os.cpu_count() or 1
+
+
+def _imap(func, items, workers):
+    """Ordered `map` over a process pool that keeps at most 2 * workers items in flight."""
+    if workers <= 1:
+        yield from map(func, items)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_table(df, output=None):
+    """Write a DataFrame to `output` (format by suffix) or as CSV to stdout."""
+    if output is None or output == "-":
+        df.to_csv(sys.stdout, index=False)
+    elif output.endswith(".xlsx"):
+        df.to_excel(output, index=False)
+    elif output.endswith(".parquet"):
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output, index=False)
+
+
+def _read_table(source):
+    """A data file (.csv, .txt, .xlsx) or the name of a packaged dataset."""
+    import pandas as pd
+
+    if not os.path.exists(source):
+        from fysisk_biokemi.datasets import load_dataset
+
+        return load_dataset(source)
+    if source.endswith((".xlsx", ".xls")):
+        return pd.read_excel(source)
+    if source.endswith(".txt"):
+        return pd.read_csv(source, sep=r"\s+", comment="#")
+    return pd.read_csv(source)
+
+
+def _key_values(pairs, what):
+    values = {}
+    for pair in pairs or ():
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"{what} must be given as NAME=VALUE, got {pair!r}")
+        values[key.strip()] = float(value)
+    return values
+
+
+# ---------- properties ----------
+PROPERTY_COLUMNS = ["Name", "Sequence", "Molecular Weight", "Extinction Coefficient", "Isoelectric Point", "Charge"]
+
+
+def _properties_rows(task):
+    from fysisk_biokemi.sequences import calculate_properties
+
+    records, ph = task
+    rows = []
+    for name, sequence in records:
+        prop = calculate_properties(sequence, ph)
+        if prop.valid:
+            rows.append(
+                [name, sequence, prop.molecular_weight, prop.extinction_coefficient, prop.isoelectric_point, prop.charge_at_ph]
+            )
+        else:
+            rows.append([name, sequence, "", "", "", ""])
+    return rows
+
+
+def properties(args):
+    from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+    handle = sys.stdin if args.fasta == "-" else open(args.fasta)
+    with handle:
+        tasks = ((chunk, args.ph) for chunk in _chunks(SimpleFastaParser(handle), args.chunk_size))
+        row_chunks = _imap(_properties_rows, tasks, _workers(args.workers))
+
+        if args.output and args.output.endswith((".parquet", ".xlsx")):
+            import pandas as pd
+
+            rows = [row for chunk in row_chunks for row in chunk]
+            df = pd.DataFrame(rows, columns=PROPERTY_COLUMNS)
+            for column in PROPERTY_COLUMNS[2:]:
+                df[column] = pd.to_numeric(df[column])
+            _write_table(df, args.output)
+            return 0
+
+        to_stdout = args.output in (None, "-")
+        with contextlib.nullcontext(sys.stdout) if to_stdout else open(args.output, "w", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(PROPERTY_COLUMNS)
+            for chunk in row_chunks:
+                writer.writerows(chunk)
+    return 0
+
+
+# ---------- datasets ----------
+def datasets(args):
+    from fysisk_biokemi.datasets.load_dataset import available_datasets
+
+    names = args.names if args.names and not args.all else list(available_datasets)
+    unknown = [n for n in names if n not in available_datasets]
+    if unknown:
+        raise SystemExit(f"Unknown datasets: {', '.join(unknown)}")
+    return {"list": _datasets_list, "convert": _datasets_convert, "verify": _datasets_verify}[args.action](args, names)
+
+
+def _datasets_list(args, names):
+    from fysisk_biokemi.datasets.load_dataset import available_datasets
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["name", "file"])
+    writer.writerows((name, available_datasets[name]) for name in names)
+    return 0
+
+
+def _datasets_convert(args, names):
+    import pandas as pd
+
+    from fysisk_biokemi.datasets import load_dataset
+
+    if args.output_dir is None and len(names) > 1:
+        raise SystemExit("--output-dir is needed to convert more than one dataset")
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    for name in names:
+        data = load_dataset(name)
+        if not isinstance(data, pd.DataFrame):
+            print(f"skipping {name}: not a table", file=sys.stderr)
+            continue
+        stem = os.path.splitext(name)[0]
+        _write_table(data, None if args.output_dir is None else os.path.join(args.output_dir, f"{stem}.{args.to}"))
+    return 0
+
+
+def _datasets_verify(args, names):
+    import pandas as pd
+
+    from fysisk_biokemi.datasets import load_dataset
+    from fysisk_biokemi.datasets.shared import ENV_DIR, shared_dir
+
+    if args.shared and shared_dir() is None:
+        raise ValueError(f"--shared needs {ENV_DIR} to name the shared dataset directory.")
+    failed = 0
+    for name in names:
+        try:
+            data = load_dataset(name)
+            if isinstance(data, pd.DataFrame):
+                if data.empty:
+                    raise ValueError("empty table")
+                if args.shared and not load_dataset(name, shared=True).equals(data):
+                    raise ValueError("shared copy differs")
+                detail = f"{data.shape[0]} rows x {data.shape[1]} columns"
+            else:
+                detail = f"{len(data)} characters"
+            print(f"ok    {name}: {detail}")
+        except Exception as e:
+            failed += 1
+            print(f"FAIL  {name}: {type(e).__name__}: {e}")
+    return int(failed > 0)
+
+
+# ---------- fit ----------
+def _model(name):
+    import numpy as np
+
+    # name: (function, parameter names, initial guess from the data)
+    models = {
+        "michaelis-menten": (
+            lambda S, Vmax, Km: Vmax * S / (Km + S),
+            ["Vmax", "Km"],
+            lambda x, y: [np.max(y), np.median(x)],
+        ),
+        "binding": (
+            lambda L, Bmax, K_D: Bmax * L / (K_D + L),
+            ["Bmax", "K_D"],
+            lambda x, y: [np.max(y), np.median(x)],
+        ),
+        "zero-order": (lambda t, A0, k: A0 - k * t, ["A0", "k"], lambda x, y: [y[0], (y[0] - y[-1]) / np.ptp(x)]),
+        "first-order": (lambda t, A0, k: A0 * np.exp(-k * t), ["A0", "k"], lambda x, y: [y[0], 1 / np.mean(x)]),
+        "second-order": (lambda t, A0, k: A0 / (1 + A0 * k * t), ["A0", "k"], lambda x, y: [y[0], 1 / (y[0] * np.mean(x))]),
+        "linear": (lambda x, a, b: a * x + b, ["a", "b"], lambda x, y: [1.0, 0.0]),
+    }
+    return models[name]
+
+
+FIT_MODELS = ["michaelis-menten", "binding", "zero-order", "first-order", "second-order", "linear"]
+
+
+def _fit_one(task):
+    import numpy as np
+    from scipy.optimize import curve_fit
+
+    source, model, x_col, y_cols = task
+    func, names, guess = _model(model)
+    rows = []
+    try:
+        df = _read_table(source)
+        x_col = x_col or df.columns[0]
+        for y_col in y_cols or [c for c in df.columns if c != x_col][:1]:
+            data = df[[x_col, y_col]].apply(lambda c: c.astype(float)).dropna()
+            x, y = data[x_col].to_numpy(), data[y_col].to_numpy()
+            popt, pcov = curve_fit(func, x, y, p0=guess(x, y), maxfev=10_000)
+            stderr = np.sqrt(np.diag(pcov))
+            rmse = float(np.sqrt(np.mean((func(x, *popt) - y) ** 2)))
+            rows.append([source, y_col, len(x), *[v for pair in zip(popt, stderr) for v in pair], rmse, ""])
+    except Exception as e:
+        rows.append([source, "", "", *[""] * (2 * len(names)), "", f"{type(e).__name__}: {e}"])
+    return rows
+
+
+def fit(args):
+    _, names, _ = _model(args.model)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["source", "y", "n", *[f"{n}{s}" for n in names for s in ("", "_stderr")], "rmse", "error"])
+    failed = False
+    for rows in _imap(_fit_one, ((source, args.model, args.x, args.y) for source in args.files), _workers(args.workers)):
+        writer.writerows(rows)
+        sys.stdout.flush()
+        failed |= any(row[-1] for row in rows)
+    return int(failed)
+
+
+# ---------- generate ----------
+def _generate_one(task):
+    import numpy as np
+    import pandas as pd
+
+    kind, params, seed = task
+    rng = np.random.default_rng(seed)
+    n = params["samples"]
+    if kind == "reaction":
+        from fysisk_biokemi.datasets.make_reversible_reaction_dataset import make_dataset_from_reaction
+        from fysisk_biokemi.widgets.utils.mass_action import MassActionSystem
+
+        # Species without --initial start at zero.
+        species = MassActionSystem(params["reaction"]).species
+        unknown = set(params["initial"]) - set(species)
+        if unknown:
+            raise ValueError(f"--initial names species not in the reaction: {', '.join(sorted(unknown))}")
+        t, concentrations = make_dataset_from_reaction(
+            params["reaction"],
+            {**dict.fromkeys(species, 0.0), **params["initial"]},
+            params["kf"],
+            params["kb"],
+            n_samples=n,
+            t1=params["t1"],
+            noise_level=params["noise"],
+            seed=seed,
+        )
+        return pd.DataFrame({"time": t, **concentrations})
+    if kind == "michaelis-menten":
+        S = np.linspace(0, params["x_max"], n)
+        v = params["vmax"] * S / (params["km"] + S)
+        return pd.DataFrame({"S": S, "v": v + rng.normal(0, params["noise"], n)})
+    if kind == "binding":
+        L = np.linspace(0, params["x_max"], n)
+        theta = L / (params["kd"] + L)
+        return pd.DataFrame({"L": L, "theta": theta + rng.normal(0, params["noise"], n)})
+    raise ValueError(f"Unknown kind: {kind}")
+
+
+def _write_generated(task):
+    df = _generate_one(task[:3])
+    _write_table(df, task[3])
+    return task[3]
+
+
+def generate(args):
+    params = {
+        "samples": args.samples,
+        "noise": args.noise,
+        "reaction": args.reaction,
+        "initial": _key_values(args.initial, "--initial"),
+        "kf": args.kf,
+        "kb": args.kb,
+        "t1": args.t1,
+        "vmax": args.vmax,
+        "km": args.km,
+        "kd": args.kd,
+        "x_max": args.x_max,
+    }
+    if args.count == 1 and args.output_dir is None:
+        _write_table(_generate_one((args.kind, params, args.seed)), args.output)
+        return 0
+    if args.output_dir is None:
+        raise SystemExit("--output-dir is needed with --count > 1")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    seed = args.seed if args.seed is not None else int.from_bytes(os.urandom(4), "little")
+    tasks = (
+        (args.kind, params, seed + i, os.path.join(args.output_dir, f"{args.kind}-{i:04d}.{args.to}"))
+        for i in range(args.count)
+    )
+    for path in _imap(_write_generated, tasks, _workers(args.workers)):
+        print(path)
+    return 0
+
+
+# ---------- Parser ----------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="fysisk-biokemi", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    workers = argparse.ArgumentParser(add_help=False)
+    workers.add_argument("--workers", type=int, default=1, help="worker processes (0: one per CPU)")
+
+    p = commands.add_parser("properties", parents=[workers], help="protein properties for every sequence in a FASTA file")
+    p.add_argument("fasta", help="FASTA file, or - for stdin")
+    p.add_argument("-o", "--output", help="output file (.csv, .xlsx, .parquet); default: CSV on stdout")
+    p.add_argument("--ph", type=float, default=7.0, help="pH for the net charge (default: 7.0)")
+    p.add_argument("--chunk-size", type=int, default=200, help="sequences per work item")
+    p.set_defaults(func=properties)
+
+    p = commands.add_parser("datasets", help="list, convert or verify the packaged datasets")
+    p.add_argument("action", choices=["list", "convert", "verify"])
+    p.add_argument("names", nargs="*", help="datasets (default: all)")
+    p.add_argument("--all", action="store_true", help="all datasets")
+    p.add_argument("--to", choices=["csv", "xlsx", "parquet"], default="csv", help="format for convert")
+    p.add_argument("--output-dir", help="directory for convert; default: CSV on stdout")
+    p.add_argument("--shared", action="store_true", help="verify: also publish and compare the shared copies")
+    p.set_defaults(func=datasets)
+
+    p = commands.add_parser("fit", parents=[workers], help="fit a model to one or more data files")
+    p.add_argument("model", choices=FIT_MODELS)
+    p.add_argument("files", nargs="+", help="data files (.csv, .txt, .xlsx) or packaged dataset names")
+    p.add_argument("--x", help="x column (default: first column)")
+    p.add_argument("--y", action="append", help="y column, may be repeated (default: second column)")
+    p.set_defaults(func=fit)
+
+    p = commands.add_parser("generate", parents=[workers], help="generate synthetic datasets")
+    p.add_argument("kind", choices=["reaction", "michaelis-menten", "binding"])
+    p.add_argument("-o", "--output", help="output file; default: CSV on stdout")
+    p.add_argument("--count", type=int, default=1, help="number of datasets, e.g. one per student")
+    p.add_argument("--output-dir", help="directory for --count > 1")
+    p.add_argument("--to", choices=["csv", "xlsx", "parquet"], default="csv", help="format with --output-dir")
+    p.add_argument("--seed", type=int, help="random seed (dataset i uses seed + i)")
+    p.add_argument("--samples", type=int, default=20, help="points per dataset")
+    p.add_argument("--noise", type=float, default=0.0, help="standard deviation of added noise")
+    p.add_argument("--reaction", default="A = B", help="reaction: reaction equation")
+    p.add_argument("--initial", action="append", help="reaction: initial concentration, e.g. A=1")
+    p.add_argument("--kf", type=float, default=1.0, help="reaction: forward rate constant")
+    p.add_argument("--kb", type=float, default=0.0, help="reaction: backward rate constant")
+    p.add_argument("--t1", type=float, default=10.0, help="reaction: end time")
+    p.add_argument("--vmax", type=float, default=100.0, help="michaelis-menten: Vmax")
+    p.add_argument("--km", type=float, default=10.0, help="michaelis-menten: Km")
+    p.add_argument("--kd", type=float, default=10.0, help="binding: K_D")
+    p.add_argument("--x-max", type=float, default=100.0, help="michaelis-menten/binding: largest [S] or [L]")
+    p.set_defaults(func=generate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, ImportError) as e:
+        # Bad input, or an optional dependency (e.g. a parquet engine) is missing.
+        print(f"fysisk-biokemi: error: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # Output piped into e.g. `head`: stop quietly.
+        sys.stdout = open(os.devnull, "w")
+        return 0
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
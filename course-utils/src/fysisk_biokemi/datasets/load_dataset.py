@@ -1,6 +1,8 @@
 import pandas as pd
 from importlib.resources import files
 
+from fysisk_biokemi.cache import cached
+
 available_datasets = {    
     'chlorophyll': 'chlorophyll_adsorption.xlsx',
     'reversible_reaction': 'reverse_reaction.xlsx',
@@ -45,10 +47,24 @@ def get_dataset_path(name: str) -> str:
         raise ValueError(f"Dataset '{name}' not found. Available datasets: {list(available_datasets.keys())}")
     return str(files('fysisk_biokemi.datasets.files').joinpath(available_datasets[name]))
 
-def load_dataset(name: str):
+def load_dataset(name: str, shared: bool = False):
+    """Load a packaged dataset.
+
+    With shared=True the table is parsed once per host and its columns are
+    memory-mapped files that all kernels share (see
+    `fysisk_biokemi.datasets.shared`).
+    """
     if name not in available_datasets:
         raise ValueError(f"Dataset '{name}' not found. Available datasets: {list(available_datasets.keys())}")
 
+    if shared:
+        from fysisk_biokemi.datasets.shared import load_shared
+
+        return load_shared(name, _read_dataset)
+    return _read_dataset(name)
+
+@cached
+def _read_dataset(name: str):
     dataset_path = get_dataset_path(name)
 
     if dataset_path.endswith('.csv'):
@@ -21,6 +21,35 @@ def make_dataset(
 
     return t, A_t, B_t
 
+def make_dataset_from_reaction(
+    reaction: str,
+    initial: dict,
+    k_forward,
+    k_backward=0.0,
+    n_samples: int = 200,
+    t0: float = 0,
+    t1: float = 10,
+    noise_level: float = 0.0,
+    seed: int | None = None,
+):
+    """Simulate a mass-action time course for any reaction string, e.g. '2 A + B = X'.
+
+    Returns (t, {species: concentration}) rounded like `make_dataset`.
+    """
+    from fysisk_biokemi.widgets.utils.mass_action import MassActionSystem
+
+    system = MassActionSystem(reaction)
+    t = np.linspace(t0, t1, n_samples)
+    concentrations = system.simulate(t, initial, k_forward, k_backward)
+
+    if noise_level > 0:
+        rng = np.random.default_rng(seed)
+        concentrations = concentrations + rng.normal(0, noise_level, size=concentrations.shape)
+
+    concentrations = np.round(concentrations, 3)
+    return t, {s: concentrations[..., i] for i, s in enumerate(system.species)}
+
+
 def make_dataframe(dataset):
     import pandas as pd
 
@@ -0,0 +1,210 @@
+"""Datasets published once per host as memory-mapped .npy files.
+
+The first kernel that asks for a dataset with `load_dataset(name, shared=True)`
+parses it and writes one .npy file per column to a shared directory; every
+kernel (including that one) then maps the files read-only. The operating
+system keeps a single copy of the pages in memory, however many students
+load the dataset. This needs pandas' copy-on-write (pandas >= 3, or
+`pd.options.mode.copy_on_write = True`); with older pandas each kernel gets
+a private copy of the attached data, so edits still work.
+
+Shared mode is off unless FYSISK_BIOKEMI_SHARED_DATASETS names the
+directory. Kernels trust whatever they find there, so the directory (and
+its parents) must be owned by root or the user running the kernel and not
+be writable by anyone else; otherwise loading fails with a ValueError. On a
+hub, publish the datasets once as the directory's owner, e.g.
+
+    sudo FYSISK_BIOKEMI_SHARED_DATASETS=/srv/fysisk-biokemi/datasets fysisk-biokemi datasets verify --shared
+
+Student kernels then only attach. Datasets that have not been published,
+tables that .npy files cannot hold without pickling (e.g. an index of
+strings or columns of mixed Python objects), and every dataset when shared
+mode is off are loaded privately as usual.
+"""
+
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+import pandas as pd
+
+from fysisk_biokemi.permissions import check_directory, check_owner
+
+
+ENV_DIR = "FYSISK_BIOKEMI_SHARED_DATASETS"
+META = "meta.json"
+
+try:
+    _VERSION = version("fysisk-biokemi")
+except PackageNotFoundError:
+    _VERSION = "dev"
+
+
+def shared_dir():
+    """The checked shared directory, or None when shared mode is off."""
+    path = os.environ.get(ENV_DIR, "").strip()
+    if not path or not hasattr(os, "getuid"):  # no owner checks without POSIX users
+        return None
+    os.makedirs(path, mode=0o755, exist_ok=True)
+    check_directory(path)
+    return path
+
+
+@contextlib.contextmanager
+def _lock(directory):
+    """Exclusive lock on the directory, so a dataset is only written by one kernel."""
+    try:
+        import fcntl
+    except ImportError:  # no flock (Windows): the atomic rename still keeps readers safe
+        yield
+        return
+    path = os.path.join(directory, ".lock")
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # releases the lock
+
+
+class _Unsupported(ValueError):
+    """The DataFrame has columns or an index that cannot be stored without pickling."""
+
+
+def _column_arrays(column):
+    """(values, missing) to store for a column; missing is None when nothing is missing."""
+    if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biufcmM":
+        return column.to_numpy(), None
+    if pd.api.types.is_string_dtype(column.dtype):
+        values = column.to_numpy(dtype=object)
+        missing = column.isna().to_numpy()
+        if all(isinstance(value, str) for value in values[~missing]):
+            # Strings are stored fixed-width; attach converts them back (with a copy).
+            return np.where(missing, "", values).astype(str), missing if missing.any() else None
+    raise _Unsupported(f"column {column.name!r} of dtype {column.dtype}")
+
+
+def _index_meta(index, directory):
+    if not isinstance(index.name, (str, type(None))):
+        raise _Unsupported(f"index name {index.name!r}")
+    if isinstance(index, pd.RangeIndex):
+        return {"range_index": [index.start, index.stop, index.step], "index_name": index.name}
+    if isinstance(index, pd.MultiIndex) or not (isinstance(index.dtype, np.dtype) and index.dtype.kind in "biufmM"):
+        raise _Unsupported(f"index of dtype {index.dtype}")
+    np.save(os.path.join(directory, "index.npy"), index.to_numpy(), allow_pickle=False)
+    return {"index_name": index.name}
+
+
+def _write(df, directory):
+    """Write `df` as .npy files; raises _Unsupported for data that would need pickling."""
+    if not all(isinstance(name, str) for name in df.columns):
+        raise _Unsupported("column names must be strings")
+    meta = {"columns": [], **_index_meta(df.index, directory)}
+    for i, (name, column) in enumerate(df.items()):
+        values, missing = _column_arrays(column)
+        entry = {"name": name, "file": f"col{i}.npy", "dtype": str(column.dtype)}
+        np.save(os.path.join(directory, entry["file"]), np.ascontiguousarray(values), allow_pickle=False)
+        if missing is not None:
+            entry["missing"] = f"col{i}.missing.npy"
+            np.save(os.path.join(directory, entry["missing"]), missing, allow_pickle=False)
+        meta["columns"].append(entry)
+
+    with open(os.path.join(directory, META), "w") as f:
+        json.dump(meta, f)
+    for file in os.listdir(directory):
+        os.chmod(os.path.join(directory, file), 0o644)
+    os.chmod(directory, 0o755)
+
+
+def publish(name, read):
+    """Write dataset `name` (the DataFrame returned by `read(name)`) to the shared directory once.
+
+    Returns its directory, or None if shared mode is off or the dataset is
+    not a DataFrame whose columns and index can be stored without pickling.
+    """
+    directory = shared_dir()
+    if directory is None:
+        return None
+    target = os.path.join(directory, name)
+    if os.path.exists(os.path.join(target, META)):
+        return target
+
+    with _lock(directory):
+        if os.path.exists(os.path.join(target, META)):
+            return target
+        data = read(name)
+        if not isinstance(data, pd.DataFrame):
+            return None
+        tmp = tempfile.mkdtemp(dir=directory, prefix=f".{name}-")
+        try:
+            _write(data, tmp)
+            os.rename(tmp, target)  # readers never see a partial dataset
+        except _Unsupported:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return None
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if os.path.exists(os.path.join(target, META)):
+                return target
+            raise
+    return target
+
+
+def attach(directory):
+    """DataFrame whose numeric columns are read-only views of the memory-mapped files."""
+    check_owner(directory)
+    for file in os.listdir(directory):
+        check_owner(os.path.join(directory, file))
+    with open(os.path.join(directory, META)) as f:
+        meta = json.load(f)
+    columns, strings = {}, {}
+    for c in meta["columns"]:
+        values = np.load(os.path.join(directory, c["file"]), mmap_mode="r")
+        if values.dtype.kind == "U":
+            values = values.astype(object)
+            if "missing" in c:
+                values[np.load(os.path.join(directory, c["missing"]))] = np.nan
+            strings[c["name"]] = c.get("dtype")
+        columns[c["name"]] = values
+    if "range_index" in meta:
+        index = pd.RangeIndex(*meta["range_index"], name=meta.get("index_name"))
+    else:
+        index = pd.Index(np.load(os.path.join(directory, "index.npy"), mmap_mode="r"), name=meta.get("index_name"), copy=False)
+    frame = pd.DataFrame(columns, index=index, copy=False)
+    # The constructor infers the string dtype; restore object columns (and vice versa).
+    changed = {name: dtype for name, dtype in strings.items() if dtype and str(frame[name].dtype) != dtype}
+    return frame.astype(changed) if changed else frame
+
+
+# Attached frames of this process. With copy-on-write (always on from
+# pandas 3) callers get shallow copies, and pandas copies a column before
+# the first in-place edit. Without it, edits would write into the read-only
+# mapping and fail, so callers get deep copies instead.
+_attached = {}
+
+
+def _copy_on_write():
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def load_shared(name, read):
+    """Attach dataset `name`, publishing it first if no kernel has done so yet.
+
+    Datasets that are not tables (plain text) are returned from `read(name)`,
+    as are all datasets when shared mode is off or the dataset has not been
+    published and this kernel may not write to the shared directory.
+    """
+    base = _attached.get(name)
+    if base is None:
+        try:
+            directory = publish(name, read)
+        except PermissionError:
+            directory = None
+        if directory is None:
+            return read(name)
+        base = _attached[name] = attach(directory)
+    return base.copy(deep=not _copy_on_write())
@@ -0,0 +1,39 @@
+"""Ownership checks for files that several users' kernels read.
+
+The shared result cache and the shared datasets are loaded without further
+validation (the cache even unpickles them), so they may only come from
+locations that nobody but root or the user running the kernel can write to.
+"""
+
+import os
+import stat
+
+
+def check_owner(path, sticky_ok=False):
+    """Raise ValueError unless `path` is owned by root or this user and only they can write to it.
+
+    With sticky_ok=True, directories like /tmp (writable by everyone, but
+    with the sticky bit set) are accepted.
+    """
+    if not hasattr(os, "getuid"):
+        raise ValueError(f"Not using {path}: file ownership cannot be checked on this platform.")
+    info = os.stat(path)
+    writable_by_others = info.st_mode & 0o022 and not (sticky_ok and info.st_mode & stat.S_ISVTX)
+    if info.st_uid not in (0, os.getuid()) or writable_by_others:
+        raise ValueError(
+            f"Not using {path}: it must be owned by root or the current user and not be writable by others."
+        )
+
+
+def check_directory(path):
+    """Check a directory and all its parents; sticky parents such as /tmp are allowed.
+
+    Example:
+        check_directory("/srv/fysisk-biokemi/cache")
+    """
+    path = os.path.realpath(path)
+    check_owner(path)
+    parent = os.path.dirname(path)
+    while parent != path:
+        check_owner(parent, sticky_ok=True)
+        path, parent = parent, os.path.dirname(parent)
@@ -0,0 +1,84 @@
+"""Protein sequence properties, without widget dependencies (used by the widgets and the CLI)."""
+
+import io
+from dataclasses import dataclass
+
+from fysisk_biokemi.cache import cached
+
+
+@dataclass
+class SequencePropertiesData:
+    valid: bool = False
+    sequence: str = ""
+    molecular_weight: float = 0.0
+    extinction_coefficient: float = 0.0
+    isoelectric_point: float = 0.0
+    charge_at_ph: float = 0.0
+
+@cached
+def calculate_properties(sequence: str, ph: float = 7.0) -> SequencePropertiesData:
+    from Bio.SeqUtils.ProtParam import ProteinAnalysis
+    try:
+        analysis = ProteinAnalysis(sequence)
+        mw = analysis.molecular_weight()
+        ec = analysis.molar_extinction_coefficient()
+        pi = analysis.isoelectric_point()
+        return SequencePropertiesData(
+            valid=True,
+            sequence=sequence,
+            molecular_weight=mw,
+            extinction_coefficient=ec[0],  # assuming reduced form
+            isoelectric_point=pi,
+            charge_at_ph=analysis.charge_at_pH(ph)
+        )
+    except Exception as e:
+        return SequencePropertiesData(sequence=sequence)
+
+
+def parse_fasta(content: bytes) -> list[str]:
+    from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+    return [seq for _, seq in SimpleFastaParser(io.StringIO(content.decode("utf-8")))]
+
+
+def sequences_to_df(file: str = None, sequences: list[str] = None, ph: float = 7.0, progress=None):
+    from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+    if file is None and sequences is None:
+        raise ValueError("Either file or sequences must be provided.")
+    
+    if sequences is None and file is not None:
+        sequences = []
+        with open(file) as handle:
+            for _, seq in SimpleFastaParser(handle):
+                sequences.append(seq)
+    return _properties_table(tuple(sequences), ph, progress=progress)
+
+
+@cached(ignore=("progress",))
+def _properties_table(sequences: tuple[str, ...], ph: float, progress=None):
+    import pandas as pd
+
+    mw = []
+    ec = []
+    pi = []
+    charge = []
+    for i, seq in enumerate(sequences):
+        if progress is not None:
+            progress(i, len(sequences))
+        # The table is cached as a whole, so skip the per-sequence cache.
+        prop = calculate_properties.__wrapped__(seq, ph)
+        if prop.valid:
+            mw.append(prop.molecular_weight)
+            ec.append(prop.extinction_coefficient)
+            pi.append(prop.isoelectric_point)
+            charge.append(prop.charge_at_ph)
+
+    data = {
+        "Sequence": list(sequences),
+        "Molecular Weight": mw,
+        "Extinction Coefficient": ec,
+        "Isoelectric Point": pi,
+        "Charge": charge,
+    }
+    return pd.DataFrame(data)
@@ -6,11 +6,13 @@ from .reaction_data_analysis import reaction_data_analysis
 from .buffer_equation import buffer_equation, buffer_visualization
 from .data_uploader import DataUploader
 from .sequence_properties import sequence_properties, sequence_dataframe
-from .uvis_eyeballing import estimate_kd, visualize_simple_vs_quadratic
+from .uvis_eyeballing import estimate_kd, visualize_simple_vs_quadratic, visualize_binding_model_breakdown
 from .michaelis_menten import michaelis_menten_demo
 from .solution_helper import SolutionHelper, solution_helper, concentration_mass_volume, mass_concentration_volume
 from .dilution_helper import DilutionHelper, dilution_helper
 from .michealis_menten_guesstimate import michealis_menten_guess
+from .equilibrium_composition import equilibrium_composition
+from .utils import LitePlot, set_plot_backend, registry, memory_report, instrumentation
 
 widgets = {
     "concentration_mass_volume": concentration_mass_volume,
@@ -25,9 +27,11 @@ widgets = {
     "sequence_dataframe": sequence_dataframe,
     "estimate_kd": estimate_kd,
     "visualize_simple_vs_quadratic": visualize_simple_vs_quadratic,
+    "visualize_binding_model_breakdown": visualize_binding_model_breakdown,
     "michaelis_menten_demo": michaelis_menten_demo,
     "solution_helper": solution_helper,
     "dilution_helper": dilution_helper,
     "michealis_menten_guess": michealis_menten_guess,
+    "equilibrium_composition": equilibrium_composition,
 }
 
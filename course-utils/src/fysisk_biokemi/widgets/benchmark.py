@@ -0,0 +1,193 @@
+"""Kernel-side latency benchmark for every entry in `fysisk_biokemi.widgets.widgets`.
+
+Each entry is opened in a `HeadlessSession` and driven the way a student
+would use it: sliders are dragged across their range, numbers and reactions
+are typed one key at a time, dropdowns cycled, buttons clicked and files
+uploaded. Events are handled on an event loop and spaced like a user's, so
+coalescing, debouncing, frame scheduling and background jobs behave as in a
+notebook. Per event the kernel-side latency, the messages sent to the front
+end and their size are recorded.
+
+    python -m fysisk_biokemi.widgets.benchmark --output bench.json
+    python -m fysisk_biokemi.widgets.benchmark --baseline bench.json  # exit 1 on regressions
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import ipywidgets as widgets
+
+from fysisk_biokemi.widgets.utils import StrictFloatText
+from fysisk_biokemi.widgets.utils.headless import HeadlessSession
+
+
+# What to type into free-text fields, by description.
+TEXT_INPUTS = {
+    "Reaktion:": "2 A + B = C + D",
+    "Formel:": "C6H12O6",
+    "Aminosyresekvens:": "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQFEVVHSLAKWKRQTLGQHDFSAGEGLYTHMKALRPDEDRLSPLHSVYVDQWDWERVMGDGERQFSTLKSTVEAIWAGIKATEAAVSEEFGLAPFLPDQIHFVHSQELLSRYPDLDAKGRERAIAKDLGAVFLVGIGGKLSDGHRHDVRAPDYDDWEAEGPLLPLTKEDKRETVRERLEKLKHLLYETS",
+}
+SLIDERS = (widgets.FloatSlider, widgets.IntSlider, widgets.FloatLogSlider, widgets.FloatRangeSlider)
+NUMBER_INPUTS = (widgets.FloatText, widgets.IntText, widgets.BoundedFloatText)
+
+
+def _reaction_csv(rows=20_000):
+    rng = np.random.default_rng(0)
+    t = np.arange(rows, dtype=float)
+    columns = {"t": t}
+    for species in ("A", "B", "C", "D"):
+        columns[f"{species} (µM)"] = 1.0 + rng.random(rows)
+    header = ",".join(columns)
+    body = "\n".join(",".join(f"{v:.6g}" for v in row) for row in zip(*columns.values()))
+    return f"{header}\n{body}\n".encode()
+
+
+def _fasta(n=50, length=300):
+    rng = np.random.default_rng(0)
+    alphabet = np.array(list("ACDEFGHIKLMNPQRSTVWY"))
+    return "".join(f">seq{i}\n{''.join(rng.choice(alphabet, length))}\n" for i in range(n)).encode()
+
+
+# Files uploaded into each entry's FileUpload widgets.
+UPLOADS = {
+    "data_uploader": ("data.csv", _reaction_csv),
+    "reaction_data_analysis": ("reaction.csv", _reaction_csv),
+    "sequence_dataframe": ("sequences.fasta", _fasta),
+}
+
+
+def explore(session, entry, steps=20):
+    """Drive every input of an opened entry once."""
+    inner_texts = {id(w.text_input) for w in entry.find_all(StrictFloatText)}
+
+    if entry.name in UPLOADS:
+        name, make = UPLOADS[entry.name]
+        for uploader in entry.find_all(widgets.FileUpload):
+            session.upload(uploader, name, make())
+
+    for w in entry.widgets:
+        if getattr(w, "disabled", False) or w.comm is None:
+            continue
+        if isinstance(w, SLIDERS):
+            session.drag(w, steps=steps)
+        elif isinstance(w, StrictFloatText):
+            session.type(w, "2.5e-3")
+        elif isinstance(w, NUMBER_INPUTS):
+            for value in np.linspace(1, 10, 5):
+                session.set(w, type(w.value)(value))
+        elif isinstance(w, (widgets.Text, widgets.Textarea)) and id(w) not in inner_texts:
+            if w.description in TEXT_INPUTS:
+                session.type(w, TEXT_INPUTS[w.description], submit=isinstance(w, widgets.Text))
+        elif isinstance(w, (widgets.Dropdown, widgets.ToggleButtons)):
+            start = w.value
+            for option in [*w._options_values, start]:
+                session.set(w, option)
+        elif isinstance(w, widgets.Checkbox):
+            for _ in range(2):
+                session.set(w, not w.value)
+        elif isinstance(w, widgets.Button):
+            session.click(w)
+
+
+def run(names=None, steps=20):
+    """Benchmark the registry entries (all, or those in `names`); returns the summary DataFrame."""
+    from fysisk_biokemi.widgets import widgets as entries
+
+    errors = {}
+    with HeadlessSession() as session:
+        for name, entry_point in entries.items():
+            if names and name not in names:
+                continue
+            try:
+                entry = session.open(name, entry_point)
+                explore(session, entry, steps=steps)
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+
+    summary = session.summary()
+    summary["error"] = summary["entry"].map(errors).fillna("")
+    for name in set(errors) - set(summary["entry"]):
+        summary.loc[len(summary), ["entry", "action", "error"]] = [name, "open", errors[name]]
+    return summary
+
+
+def to_json(summary, path=None):
+    """Results with environment metadata, in a stable format for tracking over time."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {}
+    for package in ("fysisk-biokemi", "ipywidgets", "plotly", "numpy", "pandas"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": versions,
+        "results": json.loads(summary.to_json(orient="records")),
+    }
+    text = json.dumps(report, indent=1)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+def compare(baseline, summary, tolerance=2.0, min_ms=1.0, min_events=5):
+    """Rows where p50 latency grew by more than `tolerance` times (and `min_ms`) or more messages are sent.
+
+    Latency is only compared for actions with at least `min_events` events;
+    single events such as opening an entry include one-off warm-up costs.
+    """
+    import pandas as pd
+
+    if isinstance(baseline, str):
+        with open(baseline) as f:
+            baseline = json.load(f)
+    base = pd.DataFrame(baseline["results"])
+    merged = summary.merge(base, on=["entry", "action"], suffixes=("", "_baseline"))
+    slower = (
+        (merged["events"] >= min_events)
+        & (merged["p50_ms"] > tolerance * merged["p50_ms_baseline"])
+        & (merged["p50_ms"] - merged["p50_ms_baseline"] > min_ms)
+    )
+    chattier = merged["messages_per_event"] > merged["messages_per_event_baseline"] + 1e-9
+    columns = ["entry", "action", "p50_ms_baseline", "p50_ms", "messages_per_event_baseline", "messages_per_event"]
+    return merged.loc[slower | chattier, columns]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="*", help="registry entries to run (default: all)")
+    parser.add_argument("--steps", type=int, default=20, help="events per slider drag")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed p50 slowdown factor")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    summary = run(args.only, steps=args.steps)
+    with pd.option_context("display.max_rows", None, "display.width", 200, "display.float_format", "{:.3f}".format):
+        print(summary.drop(columns="error").to_string(index=False))
+    for row in summary[summary["error"] != ""].drop_duplicates("entry").itertuples():
+        print(f"ERROR {row.entry}: {row.error}", file=sys.stderr)
+
+    if args.output:
+        to_json(summary, args.output)
+    if args.baseline:
+        regressions = compare(args.baseline, summary, args.tolerance)
+        if len(regressions):
+            print("\nRegressions:\n" + regressions.to_string(index=False), file=sys.stderr)
+            return 1
+    return int((summary["error"] != "").any())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
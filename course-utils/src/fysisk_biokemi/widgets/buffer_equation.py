@@ -1,10 +1,21 @@
 import ipywidgets as widgets
-from IPython.display import display, Math
+from IPython.display import display
 import numpy as np
 from dataclasses import dataclass
+from functools import lru_cache
 import plotly.graph_objects as go
 
-from fysisk_biokemi.widgets.utils import molar_prefix_to_factor, number_to_scientific_latex, StrictFloatText
+from fysisk_biokemi.widgets.utils import (
+    molar_prefix_to_factor,
+    number_to_scientific_latex,
+    StrictFloatText,
+    MathView,
+    CoalescedCall,
+    FrameScheduler,
+    FigureState,
+    new_figure,
+    tracked,
+)
 
 
 def calculate_acid_base_concentrations(pH, pKa, total_conc):
@@ -14,12 +25,91 @@ def calculate_acid_base_concentrations(pH, pKa, total_conc):
     return acid_conc, base_conc, ratio
 
 
+KW = 1e-14
+
+
+@dataclass(frozen=True)
+class Speciation:
+    """Species distribution of an n-protic acid H_nA over a pH grid.
+
+    Row j of `fractions` is the species that has lost j protons, so row 0 is
+    the fully protonated acid and row n the fully deprotonated base.
+    """
+    ph: np.ndarray
+    pkas: tuple
+    total_conc: float
+    fractions: np.ndarray       # (n + 1, len(ph))
+    titration: np.ndarray       # equivalents of strong base added per mol acid
+    buffer_capacity: np.ndarray  # β = dC_base/dpH in M
+
+    @property
+    def concentrations(self) -> np.ndarray:
+        return self.total_conc * self.fractions
+
+    def species_labels(self, latex=False) -> list[str]:
+        """Labels like H2A, HA-, A2- (or LaTeX versions with sub/superscripts)."""
+        n = len(self.pkas)
+        labels = []
+        for j in range(n + 1):
+            protons = n - j
+            hydrogen = "" if protons == 0 else ("H" if protons == 1 else (f"H_{{{protons}}}" if latex else f"H{protons}"))
+            charge = "" if j == 0 else ("-" if j == 1 else f"{j}-")
+            if latex:
+                labels.append(rf"\mathrm{{{hydrogen}A}}" + (f"^{{{charge}}}" if charge else ""))
+            else:
+                labels.append(f"{hydrogen}A{charge}")
+        return labels
+
+
+def polyprotic_speciation(pkas, total_conc, ph_min=0.0, ph_max=14.0, n_points=400) -> Speciation:
+    """Fractions, titration curve and buffer capacity for an n-protic acid.
+
+    All species are computed at once: log10 of the unnormalized fraction of
+    species j is j * pH - (pKa_1 + ... + pKa_j), so the whole table is one
+    outer product followed by a normalization. Results are cached on
+    (pKa tuple, total concentration, pH grid).
+    """
+    pkas = tuple(float(p) for p in np.atleast_1d(pkas))
+    return _polyprotic_speciation(pkas, float(total_conc), float(ph_min), float(ph_max), int(n_points))
+
+
+@lru_cache(maxsize=64)
+def _polyprotic_speciation(pkas, total_conc, ph_min, ph_max, n_points) -> Speciation:
+    ph = np.linspace(ph_min, ph_max, n_points)
+    j = np.arange(len(pkas) + 1)
+    cumulative_pka = np.concatenate([[0.0], np.cumsum(pkas)])
+
+    log_terms = j[:, None] * ph[None, :] - cumulative_pka[:, None]
+    log_terms -= log_terms.max(axis=0)  # avoid overflow
+    terms = 10.0**log_terms
+    fractions = terms / terms.sum(axis=0)
+
+    # Mean number of protons removed and its variance give both curves.
+    mean_j = j @ fractions
+    var_j = (j**2) @ fractions - mean_j**2
+    h = 10.0**-ph
+    oh = KW / h
+    titration = mean_j + (oh - h) / total_conc if total_conc > 0 else mean_j
+    buffer_capacity = np.log(10) * (total_conc * var_j + h + oh)
+
+    for array in (ph, fractions, titration, buffer_capacity):
+        array.flags.writeable = False
+    return Speciation(
+        ph=ph,
+        pkas=pkas,
+        total_conc=total_conc,
+        fractions=fractions,
+        titration=titration,
+        buffer_capacity=buffer_capacity,
+    )
+
+
 class BufferEquation:
     def __init__(self):
-        self.pH_input = StrictFloatText(description="pH:", value="7.0", style={"description_width": "initial"})
-        self.pKa_input = StrictFloatText(description="pKa:", value="7.0", style={"description_width": "initial"})
+        self.pH_input = StrictFloatText(description="pH:", value="7.0", update_mode="idle", style={"description_width": "initial"})
+        self.pKa_input = StrictFloatText(description="pKa:", value="7.0", update_mode="idle", style={"description_width": "initial"})
         self.total_conc_input = StrictFloatText(
-            description="Total koncentration (M):", value="0.1", style={"description_width": "initial"}
+            description="Total koncentration (M):", value="0.1", update_mode="idle", style={"description_width": "initial"}
         )
 
         self.concentration_unit = widgets.Dropdown(
@@ -28,12 +118,14 @@ class BufferEquation:
             description="Konc. enhed:",
         )
 
-        self.output_field = widgets.Output()
+        self.output_field = MathView()
+
+        self.recompute = CoalescedCall(self._render)
 
-        self.pH_input.observe(self._on_change)
-        self.pKa_input.observe(self._on_change)
-        self.total_conc_input.observe(self._on_change)
-        self.concentration_unit.observe(self._on_change)
+        self.pH_input.observe(self._on_change, names="value")
+        self.pKa_input.observe(self._on_change, names="value")
+        self.total_conc_input.observe(self._on_change, names="value")
+        self.concentration_unit.observe(self._on_change, names="value")
 
     def display(self):
         widget = widgets.HBox(
@@ -52,6 +144,9 @@ class BufferEquation:
         display(widget)
 
     def _on_change(self, change):
+        self.recompute()
+
+    def _render(self):
 
         # Check that there are no None:
         if None in (self.pH_input.value, self.pKa_input.value, self.total_conc_input.value):
@@ -59,61 +154,65 @@ class BufferEquation:
         else:
             valid = True
 
-         # Only update on value changes (not focus, etc)
-        if change["type"] == "change" and change["name"] == "value":
-
-            if not valid:
-                with self.output_field:
-                    self.output_field.clear_output()
-                    display("Indtast gyldige numeriske værdier for alle parametre.")
-                return
-
-            pH = self.pH_input.value
-            pKa = self.pKa_input.value
-            total_conc = self.total_conc_input.value * molar_prefix_to_factor[self.concentration_unit.value]
-
-            acid_conc, base_conc, ratio = calculate_acid_base_concentrations(pH, pKa, total_conc)
-
-            with self.output_field:
-                self.output_field.clear_output()
-                try: 
-                    derivation = []
-
-                    derivation += [r"\frac{[\text{base}]}{[\text{acid}]} = 10^{\text{pH} - \text{pKa}} = " + f"{number_to_scientific_latex(ratio)}"]
-                    derivation += [
-                        r"[\text{base}] + [\text{acid}] = C_{\text{total}} = " + rf"{number_to_scientific_latex(total_conc)} \, \text{{M}}" + r"\\"
-                    ]
-                    derivation += [
-                        r"[\text{base}] = \frac{C_{\text{total}} \cdot 10^{\text{pH} - \text{pKa}}}{1 + 10^{\text{pH} - \text{pKa}}} = "
-                        + rf"\underline{{{number_to_scientific_latex(base_conc)}}} \, \text{{M}}"
-                        + r"\\"
-                    ]
-                    derivation += [
-                        r"[\text{acid}] = C_{\text{total}} - [\text{base}] = "
-                        + rf"\underline{{{number_to_scientific_latex(acid_conc)}}} \, \text{{M}}"
-                    ]
-                except Exception as e:
-                    derivation = ["\mathrm{Fejl}"]
+        if not valid:
+            self.output_field.show_text("Indtast gyldige numeriske værdier for alle parametre.")
+            return
 
-                for line in derivation:
-                    display(Math(line))
+        total_conc = self.total_conc_input.value * molar_prefix_to_factor[self.concentration_unit.value]
+        self.output_field.show(*buffer_derivation_latex(self.pH_input.value, self.pKa_input.value, total_conc))
+
+
+@lru_cache(maxsize=256)
+def buffer_derivation_latex(pH, pKa, total_conc):
+    """LaTeX lines of the Henderson-Hasselbalch derivation, cached on the inputs."""
+    acid_conc, base_conc, ratio = calculate_acid_base_concentrations(pH, pKa, total_conc)
+    try:
+        derivation = []
+
+        derivation += [r"\frac{[\text{base}]}{[\text{acid}]} = 10^{\text{pH} - \text{pKa}} = " + f"{number_to_scientific_latex(ratio)}"]
+        derivation += [
+            r"[\text{base}] + [\text{acid}] = C_{\text{total}} = " + rf"{number_to_scientific_latex(total_conc)} \, \text{{M}}" + r"\\"
+        ]
+        derivation += [
+            r"[\text{base}] = \frac{C_{\text{total}} \cdot 10^{\text{pH} - \text{pKa}}}{1 + 10^{\text{pH} - \text{pKa}}} = "
+            + rf"\underline{{{number_to_scientific_latex(base_conc)}}} \, \text{{M}}"
+            + r"\\"
+        ]
+        derivation += [
+            r"[\text{acid}] = C_{\text{total}} - [\text{base}] = "
+            + rf"\underline{{{number_to_scientific_latex(acid_conc)}}} \, \text{{M}}"
+        ]
+    except Exception as e:
+        derivation = ["\mathrm{Fejl}"]
+    return tuple(derivation)
 
 
 @dataclass
 class FigureAttrs:
     fig: go.FigureWidget
-    acid_idx: int
-    base_idx: int
-    pka_shape_idx: int  # index in fig.layout.shapes
+    species_idx: list[int]  # trace index per species, most protonated first
+    pka_shape_idx: list[int]  # index in fig.layout.shapes per pKa
+    pka_annotation_idx: list[int]  # index in fig.layout.annotations per pKa label
+    state: FigureState
 
 class BufferVisualization:
-    def __init__(self, continuous_update: bool = True):
+    def __init__(self, continuous_update: bool = True, pka=7.0, max_fps: float = 30.0, backend=None):
+        self.backend = backend
         self.continuous_update = continuous_update
-
-        self.pka_input = widgets.FloatSlider(
-            value=7.0, min=0.0, max=14.0, step=0.1, description="pKa:", style={"description_width": "initial"},
-            continuous_update=continuous_update,
-        )
+        self.frame_scheduler = FrameScheduler(self._render, max_fps=max_fps)
+
+        # One slider per pKa; a single float gives the classic acid/base buffer.
+        pkas = np.atleast_1d(pka).tolist()
+        self.pka_inputs = [
+            widgets.FloatSlider(
+                value=value, min=0.0, max=14.0, step=0.1,
+                description="pKa:" if len(pkas) == 1 else f"pKa{i + 1}:",
+                style={"description_width": "initial"},
+                continuous_update=continuous_update,
+            )
+            for i, value in enumerate(pkas)
+        ]
+        self.pka_input = self.pka_inputs[0]
         self.total_conc_input = widgets.FloatSlider(
             value=0.1,
             min=0.01,
@@ -125,7 +224,7 @@ class BufferVisualization:
         )
 
         self.ph_range_input = widgets.FloatRangeSlider(
-            value=[5.0, 9.0],
+            value=[5.0, 9.0] if len(pkas) == 1 else [0.0, 14.0],
             min=0.0,
             max=14.0,
             step=0.1,
@@ -139,25 +238,33 @@ class BufferVisualization:
     def display(self):
         controls = widgets.VBox(
             [
-                self.pka_input,
+                *self.pka_inputs,
                 self.total_conc_input,
                 self.ph_range_input,
             ]
         )
 
-        self.pka_input.observe(self._on_change)
-        self.total_conc_input.observe(self._on_change)
-        self.ph_range_input.observe(self._on_change)
+        for pka_input in self.pka_inputs:
+            pka_input.observe(self._on_change, names="value")
+        self.total_conc_input.observe(self._on_change, names="value")
+        self.ph_range_input.observe(self._on_change, names="value")
         widget = widgets.HBox([controls, self.plot_output])
         display(widget)
 
-    def make_plot(self, ph, acid, base, pka_value) -> FigureAttrs:
-        fig = go.FigureWidget(layout=go.Layout(width=600, height=400))
+    def _species_names(self, speciation):
+        if len(speciation.pkas) == 1:
+            return ["Syre [M]", "Base [M]"]
+        return [f"{label} [M]" for label in speciation.species_labels()]
 
-        acid_trace = go.Scatter(x=ph, y=acid, mode="lines", name="Syre [M]", line=dict(width=4))
-        base_trace = go.Scatter(x=ph, y=base, mode="lines", name="Base [M]", line=dict(width=4))
+    def make_plot(self, speciation: Speciation) -> FigureAttrs:
+        fig = new_figure(width=600, height=400, backend=self.backend)
 
-        fig.add_traces([acid_trace, base_trace])
+        concentrations = speciation.concentrations
+        traces = [
+            go.Scatter(x=speciation.ph, y=conc, mode="lines", name=name, line=dict(width=4))
+            for name, conc in zip(self._species_names(speciation), concentrations)
+        ]
+        fig.add_traces(traces)
 
         # Vertical pKa line as a shape (dragging-safe and efficient)
         fig.update_layout(
@@ -168,63 +275,85 @@ class BufferVisualization:
             legend=dict(orientation="v", yanchor="bottom", y=0.9, xanchor="right", x=0.95),
             margin=dict(l=60, r=20, t=50, b=40),
         )
-        fig.add_vline(x=pka_value, line_dash="dash", line_color="green", annotation_text="pKa", annotation_position="top")
+        pka_shape_idx = []
+        pka_annotation_idx = []
+        for pka_value, pka_input in zip(speciation.pkas, self.pka_inputs):
+            pka_shape_idx.append(len(fig.layout.shapes))
+            pka_annotation_idx.append(len(fig.layout.annotations))
+            label = pka_input.description.rstrip(":")
+            fig.add_vline(x=pka_value, line_dash="dash", line_color="green", annotation_text=label, annotation_position="top")
 
         with self.plot_output:
             self.plot_output.clear_output(wait=True)
             display(fig)
 
         # Store indices for fast updates
-        acid_idx = 0
-        base_idx = 1
-        pka_shape_idx = len(fig.layout.shapes) - 1 if fig.layout.shapes else 0
-
-        return FigureAttrs(fig=fig, acid_idx=acid_idx, base_idx=base_idx, pka_shape_idx=pka_shape_idx)
+        species_idx = list(range(len(traces)))
+
+        return FigureAttrs(
+            fig=fig,
+            species_idx=species_idx,
+            pka_shape_idx=pka_shape_idx,
+            pka_annotation_idx=pka_annotation_idx,
+            state=FigureState(fig),
+        )
 
-    def update_plot(self, ph, acid, base, pka_value):
+    def update_plot(self, speciation: Speciation):
         fa = self.plot_attrs
-        # Update data
-        fa.fig.data[fa.acid_idx].x = ph
-        fa.fig.data[fa.acid_idx].y = acid
-        fa.fig.data[fa.base_idx].x = ph
-        fa.fig.data[fa.base_idx].y = base
-
-        # Update vertical pKa line (shape)
-        shp = fa.fig.layout.shapes[fa.pka_shape_idx]
-        shp.update(x0=pka_value, x1=pka_value)
+        concentrations = speciation.concentrations
 
         # Optionally tighten y-range around current data
         # (Plotly autoscale is automatic on first draw; for dynamic:
-        y_min = float(np.nanmin([acid.min(), base.min(), 0]))
-        y_max = float(np.nanmax([acid.max(), base.max()])) * 1.05 if np.isfinite([acid.max(), base.max()]).all() else 1
-        fa.fig.update_yaxes(range=[y_min, y_max])
+        y_min = float(np.nanmin([concentrations.min(), 0]))
+        y_max = float(np.nanmax(concentrations)) * 1.05 if np.isfinite(concentrations).all() else 1
+
+        with fa.state.update() as state:
+            for idx, conc in zip(fa.species_idx, concentrations):
+                state.trace(idx, x=speciation.ph, y=conc)
+
+            # Vertical pKa lines (shapes) and their labels
+            for idx, pka_value in zip(fa.pka_shape_idx, speciation.pkas):
+                state.shape(idx, x0=pka_value, x1=pka_value)
+            for idx, pka_value in zip(fa.pka_annotation_idx, speciation.pkas):
+                state.annotation(idx, x=pka_value)
+
+            state.layout(yaxis_range=[y_min, y_max])
 
     def _on_change(self, change):
-        pka_value = self.pka_input.value
+        self.frame_scheduler()
+
+    def _render(self):
+        pkas = tuple(pka_input.value for pka_input in self.pka_inputs)
         total_conc_value = self.total_conc_input.value
         pH_range = self.ph_range_input.value
 
-        ph = np.linspace(pH_range[0], pH_range[1], 400)
-        acid, base, ratio = calculate_acid_base_concentrations(ph, pka_value, total_conc_value)
+        speciation = polyprotic_speciation(pkas, total_conc_value, pH_range[0], pH_range[1], 400)
 
         # Initialize the plot if it hasn't been created yet
         if not hasattr(self, "plot_attrs"):
-            self.plot_attrs = self.make_plot(ph, acid, base, pka_value)
+            self.plot_attrs = self.make_plot(speciation)
             return
 
         # Update
-        self.update_plot(ph, acid, base, pka_value)
+        self.update_plot(speciation)
 
 
+@tracked
 def buffer_equation():
     be = BufferEquation()
-    be._on_change({"type": "change", "name": "value", "new": None})
+    be._render()
     be.display()
 
 
-def buffer_visualization(continuous_update: bool = True):
-    bv = BufferVisualization(continuous_update=continuous_update)
-    bv._on_change({"type": "change", "name": "value", "new": None})
+@tracked
+def buffer_visualization(continuous_update: bool = True, pka=7.0, client_side=False):
+    if client_side:
+        from fysisk_biokemi.widgets.client_models import buffer_model
+
+        display(buffer_model(pka=pka))
+        return
+    bv = BufferVisualization(continuous_update=continuous_update, pka=pka)
+    bv._render()
     bv.display()
 
 if __name__ == "__main__":
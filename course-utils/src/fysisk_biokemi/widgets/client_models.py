@@ -0,0 +1,122 @@
+from pathlib import Path
+
+import anywidget
+import numpy as np
+import traitlets
+
+from fysisk_biokemi.widgets.buffer_equation import polyprotic_speciation
+from fysisk_biokemi.widgets.uvis_eyeballing import quadratic_fraction_bound
+
+
+STATIC = Path(__file__).parent / "static"
+
+
+class ClientModelWidget(anywidget.AnyWidget):
+    """Slider demo for a closed-form model that is evaluated in the browser.
+
+    Moving a slider redraws the plot in JavaScript without contacting the
+    kernel; `params` is synced back when the slider is released. `evaluate()`
+    computes the same curves with numpy from the current `params`.
+
+    Models: "michaelis_menten", "buffer" and "binding" (see static/client_models.js).
+    """
+
+    _esm = (STATIC / "canvas_plot.js").read_text() + (STATIC / "client_models.js").read_text()
+
+    model = traitlets.Unicode().tag(sync=True)
+    params = traitlets.Dict().tag(sync=True)
+    sliders = traitlets.List().tag(sync=True)  # [{name, label, min, max, step}]
+    labels = traitlets.List().tag(sync=True)  # legend label per curve
+    markers = traitlets.List().tag(sync=True)  # labels of marker lines to show, "*" for all
+    x_range = traitlets.List([0.0, 1.0]).tag(sync=True)
+    y_range = traitlets.List(None, allow_none=True).tag(sync=True)  # None: fit to data
+    log_x = traitlets.Bool(False).tag(sync=True)
+    n_points = traitlets.Int(200).tag(sync=True)
+    xlabel = traitlets.Unicode("").tag(sync=True)
+    ylabel = traitlets.Unicode("").tag(sync=True)
+    title = traitlets.Unicode("").tag(sync=True)
+    width = traitlets.Int(600).tag(sync=True)
+    height = traitlets.Int(400).tag(sync=True)
+
+    def _x(self):
+        if self.model == "binding":
+            x_min, x_max = 0.0, 10 * self.params["K_D"]
+        else:
+            x_min, x_max = self.x_range
+        if self.log_x:
+            return np.geomspace(x_min, x_max, self.n_points)
+        return np.linspace(x_min, x_max, self.n_points)
+
+    def evaluate(self):
+        """Return x and a dict of curves {label: y} for the current parameters."""
+        x = self._x()
+        p = self.params
+        if self.model == "michaelis_menten":
+            curves = [p["Vmax"] * x / (p["Km"] + x)]
+        elif self.model == "buffer":
+            pkas = [p[name] for name in sorted(p) if name.startswith("pKa")]
+            speciation = polyprotic_speciation(tuple(pkas), p["total"], x[0], x[-1], len(x))
+            curves = list(speciation.concentrations)
+        elif self.model == "binding":
+            curves = [x / (p["K_D"] + x), quadratic_fraction_bound(p["K_D"], p["P_total"], x)]
+        else:
+            raise ValueError(f"Unknown model: {self.model}")
+        return x, dict(zip(self.labels, curves))
+
+
+def michaelis_menten_model(Km=5.0, Vmax=30.0, show_lines=("Km", "Vmax")):
+    return ClientModelWidget(
+        model="michaelis_menten",
+        params={"Km": Km, "Vmax": Vmax},
+        sliders=[
+            {"name": "Km", "label": "Km:", "min": 0.1, "max": 100.0, "step": 0.1},
+            {"name": "Vmax", "label": "Vmax:", "min": 1.0, "max": 1000.0, "step": 1.0},
+        ],
+        labels=["v"],
+        markers=list(show_lines),
+        x_range=[0.0, 100.0],
+        title="Michaelis-Menten Kinetics",
+        xlabel="[S] (Substrate Concentration)",
+        ylabel="v (Reaction Velocity)",
+    )
+
+
+def buffer_model(pka=7.0, total_conc=0.1):
+    pkas = np.atleast_1d(pka).tolist()
+    names = ["pKa"] if len(pkas) == 1 else [f"pKa{i + 1}" for i in range(len(pkas))]
+    if len(pkas) == 1:
+        labels = ["Syre [M]", "Base [M]"]
+    else:
+        labels = [f"{label} [M]" for label in polyprotic_speciation(tuple(pkas), total_conc).species_labels()]
+
+    return ClientModelWidget(
+        model="buffer",
+        params={"total": total_conc, **dict(zip(names, pkas))},
+        sliders=[
+            *[{"name": name, "label": f"{name}:", "min": 0.0, "max": 14.0, "step": 0.1} for name in names],
+            {"name": "total", "label": "Total koncentration (M):", "min": 0.01, "max": 1.0, "step": 0.01},
+        ],
+        labels=labels,
+        markers=["*"],
+        x_range=[5.0, 9.0] if len(pkas) == 1 else [0.0, 14.0],
+        title="Buffer Sammensætning vs pH",
+        xlabel="pH",
+        ylabel="Koncentration [M]",
+    )
+
+
+def binding_model(K_D=10.0, P_total=10.0):
+    return ClientModelWidget(
+        model="binding",
+        params={"K_D": K_D, "P_total": P_total},
+        sliders=[
+            {"name": "K_D", "label": "K_D (µM):", "min": 0.1, "max": 100.0, "step": 0.1},
+            {"name": "P_total", "label": "P_total (µM):", "min": 0.1, "max": 1000.0, "step": 0.1},
+        ],
+        labels=["Simple Binding", "Quadratic Binding"],
+        y_range=[-0.05, 1.05],
+        n_points=100,
+        title="Fraction Bound vs Ligand Concentration",
+        xlabel="Ligand Concentration [µM]",
+        ylabel="Fraction Bound (θ)",
+    )
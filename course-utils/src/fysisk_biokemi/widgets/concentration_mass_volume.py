@@ -27,13 +27,13 @@ def molarity_from_mass_volume(mass_value, mass_unit, volume_value, volume_unit,
 
 def concentration_mass_volume():
 
-    mass_value = StrictFloatText(description="Masse:", value="70.0")
+    mass_value = StrictFloatText(description="Masse:", value="70.0", update_mode="idle")
     mass_unit  = widgets.Dropdown(description="Enhed:", options=["µg","ng","mg","g"], value="µg")
 
-    volume_value = StrictFloatText(description="Volumen:", value="1.0")
+    volume_value = StrictFloatText(description="Volumen:", value="1.0", update_mode="idle")
     volume_unit  = widgets.Dropdown(description="Enhed:", options=["mL","µL","L"], value="mL")
 
-    mw_value = StrictFloatText(description="Mol.vægt (g/mol):", value="190000.0", style={'description_width': 'initial'})
+    mw_value = StrictFloatText(description="Mol.vægt (g/mol):", value="190000.0", update_mode="idle", style={'description_width': 'initial'})
 
     out = widgets.Output()
 
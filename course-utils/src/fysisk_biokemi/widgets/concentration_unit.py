@@ -2,9 +2,10 @@ import ipywidgets as widgets
 from IPython.display import display
 
 from fysisk_biokemi.widgets.utils import molar_prefix_to_factor
-from fysisk_biokemi.widgets.utils import StrictFloatText
+from fysisk_biokemi.widgets.utils import StrictFloatText, tracked
 
 
+@tracked
 def concentration_unit():
     # Map SI prefix to power of ten
     prefix_to_factor = molar_prefix_to_factor
@@ -14,7 +15,7 @@ def concentration_unit():
         return value * factor
 
     # Input widgets
-    value_box = StrictFloatText(description="Værdi:", value="1.0")
+    value_box = StrictFloatText(description="Værdi:", value="1.0", update_mode="idle")
     unit_box = widgets.Dropdown(
         description="Enhed:",
         options=list(prefix_to_factor.keys()),
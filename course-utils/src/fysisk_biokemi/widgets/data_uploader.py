@@ -6,6 +6,9 @@ import io
 import pandas as pd
 from dataclasses import dataclass
 from fysisk_biokemi.widgets.utils.colab import disable_custom_widget_colab
+from fysisk_biokemi.widgets.utils.jobs import JobRunner
+from fysisk_biokemi.widgets.utils.lifecycle import tracked
+from fysisk_biokemi.widgets.utils.misc import uploaded_files
 
 @dataclass
 class Reader:
@@ -22,6 +25,7 @@ SUFFIX_TO_FUNC = {
 }
 
 
+@tracked
 class DataUploader:
 
     def __init__(self):
@@ -29,11 +33,16 @@ class DataUploader:
         self.uploader = widgets.FileUpload(accept='', multiple=False)
         self.uploader.observe(self._on_upload_change, names='value')
         self.output = widgets.Output()
+        self.df = None
+        self.error = None
+        # Large files are parsed in the background.
+        self.jobs = JobRunner(description="Indlæser:")
 
     def _on_upload_change(self, change):
         self.output.clear_output()
-        for filename, file_info in self.uploader.value.items():
-            content = file_info['content']
+        self.df = None  # never hand out the previous file while the new one is read
+        self.error = None
+        for filename, content in uploaded_files(self.uploader.value):
             with self.output:
                 print(f"Uploaded file: {filename}")
                 print(f"File extension: {Path(filename).suffix}")
@@ -41,19 +50,34 @@ class DataUploader:
                 suffix = Path(filename).suffix
                 if suffix in SUFFIX_TO_FUNC:
                     print("Using function:", SUFFIX_TO_FUNC[suffix].name)
-                    content = io.BytesIO(content)
-                    self.df = SUFFIX_TO_FUNC[suffix].func(content)
-                    print("DataFrame shape:", self.df.shape)
+                    self.jobs.submit(
+                        SUFFIX_TO_FUNC[suffix].func,
+                        io.BytesIO(content),
+                        on_done=self._on_read,
+                        on_error=self._on_read_error,
+                    )
+
+    def _on_read(self, df):
+        self.df = df
+        with self.output:
+            print("DataFrame shape:", self.df.shape)
+
+    def _on_read_error(self, error):
+        self.error = error
+        with self.output:
+            print(f"Could not read file: {error}")
 
     def get_dataframe(self):
-        if hasattr(self, 'df'):
-            return self.df
-        else:
+        self.jobs.wait()  # e.g. the next cell is run while the file is still being read
+        if self.error is not None:
+            raise ValueError(f"Could not read file: {self.error}") from self.error
+        elif self.df is None:
             raise ValueError("No file has been uploaded yet.")
+        return self.df
 
 
     def display(self):
-        display(self.uploader, self.output)
+        display(self.uploader, self.jobs.progress, self.output)
 
 
     
@@ -1,6 +1,7 @@
 import ipywidgets as widgets
-from IPython.display import display, Math
-from fysisk_biokemi.widgets.utils import StrictFloatText, number_to_scientific_latex
+from functools import lru_cache
+from IPython.display import display
+from fysisk_biokemi.widgets.utils import StrictFloatText, CoalescedCall, MathView, number_to_scientific_latex, tracked
 from .solution_helper import ValueWithUnit
 
 VOLUME_FACTORS = {
@@ -18,11 +19,51 @@ CONCENTRATION_FACTORS = {
 }
 
 
+@lru_cache(maxsize=128)
+def dilution_latex(stock_conc, stock_conc_unit, final_conc, final_conc_unit, final_vol, final_vol_unit, volume_output_unit):
+    """LaTeX for the stock and diluent volumes (C1 V1 = C2 V2) of a dilution, as two aligned blocks."""
+    stock_conc = ValueWithUnit(stock_conc * CONCENTRATION_FACTORS[stock_conc_unit], "M")
+    final_conc = ValueWithUnit(final_conc * CONCENTRATION_FACTORS[final_conc_unit], "M")
+    final_vol = ValueWithUnit(final_vol * VOLUME_FACTORS[final_vol_unit], "L")
+
+    vol_stock = ValueWithUnit((final_conc.value * final_vol.value) / stock_conc.value, "L")
+    vol_stock_in_unit = ValueWithUnit(vol_stock.value / VOLUME_FACTORS[volume_output_unit], volume_output_unit)
+
+    vol_diluent = ValueWithUnit(final_vol.value - vol_stock.value, "L")
+    vol_diluent_in_unit = ValueWithUnit(vol_diluent.value / VOLUME_FACTORS[volume_output_unit], volume_output_unit)
+
+    # C1 V1 = C2 V2
+    # V1 = (C2 V2) / C1
+
+    line1 = r"\mathrm{{V}}_\mathrm{{stock}} &= \frac{{\mathrm{{C}}_\mathrm{{final}} \cdot \mathrm{{V}}_\mathrm{{final}}}}{{\mathrm{{C}}_\mathrm{{stock}}}}"
+    line2 = rf"&= \frac{{{final_conc.repru} \cdot {final_vol.repru}}}{{{stock_conc.repru}}}"
+    line3 = rf"&= \left(\frac{{{final_conc.repr} \cdot {final_vol.repr}}}{{{stock_conc.repr}}}\right) \ \frac{{{final_conc.unit_repr} \cdot {final_vol.unit_repr}}}{{{stock_conc.unit_repr}}}"
+    raw = fr"""
+    \begin{{aligned}}
+    {line1} \\
+    {line2} \\
+    {line3} \\
+    & = {vol_stock.repru} = {vol_stock_in_unit.repru} \\
+    \end{{aligned}}
+    """
+
+    line1 = r"\mathrm{{V}}_\mathrm{{diluent}} &= \mathrm{{V}}_\mathrm{{final}} - \mathrm{{V}}_\mathrm{{stock}}"
+    raw2 = fr"""
+    \begin{{aligned}}
+    {line1} \\
+    & = {vol_diluent.repru} = {vol_diluent_in_unit.repru} \\
+    \end{{aligned}}
+    """
+
+    return raw, raw2
+
+
 class DilutionHelper:
     def __init__(self):
         self.stock_conc = StrictFloatText(
             description="Stock concentration",
             value="1.0",
+            update_mode="idle",
         )
 
         self.stock_conc_unit = widgets.Dropdown(
@@ -34,6 +75,7 @@ class DilutionHelper:
         self.final_conc = StrictFloatText(
             description="Final concentration",
             value="0.1",
+            update_mode="idle",
         )
         self.final_conc_unit = widgets.Dropdown(
             description="Unit",
@@ -43,6 +85,7 @@ class DilutionHelper:
         self.final_vol = StrictFloatText(
             description="Final volume",
             value="1.0",
+            update_mode="idle",
         )
         self.final_vol_unit = widgets.Dropdown(
             description="Unit",
@@ -56,7 +99,10 @@ class DilutionHelper:
             value="mL",
         )
 
-        self.output = widgets.Output()
+        self.output = MathView()
+
+        # Collapse a burst of input changes into a single recompute.
+        self.recompute = CoalescedCall(self._render)
 
         _widgets = [
             self.stock_conc,
@@ -70,7 +116,7 @@ class DilutionHelper:
         for w in _widgets:
             w.observe(self._on_change, names="value")
 
-        self._on_change(None)
+        self._render()
 
     def display(self):
         input_widgets = widgets.VBox(
@@ -86,53 +132,31 @@ class DilutionHelper:
         display(widget)
 
     def _on_change(self, change):
-        with self.output:
-            self.output.clear_output()
+        self.recompute()
+
+    def _render(self):
         try:
-            self._calculate()
+            self.output.show(*dilution_latex(*self._state()))
         except Exception as e:
-            with self.output:
-                print(f"Error: {e}")
-
-    def _calculate(self):
-        stock_conc = ValueWithUnit(self.stock_conc.value * CONCENTRATION_FACTORS[self.stock_conc_unit.value], "M")
-        final_conc = ValueWithUnit(self.final_conc.value * CONCENTRATION_FACTORS[self.final_conc_unit.value], "M")
-        final_vol = ValueWithUnit(self.final_vol.value * VOLUME_FACTORS[self.final_vol_unit.value], "L")
-
-        vol_stock = ValueWithUnit((final_conc.value * final_vol.value) / stock_conc.value, "L")
-        vol_stock_in_unit = ValueWithUnit(vol_stock.value / VOLUME_FACTORS[self.volume_output_unit.value], self.volume_output_unit.value)
-
-        vol_diluent = ValueWithUnit(final_vol.value - vol_stock.value, "L")
-        vol_diluent_in_unit = ValueWithUnit(vol_diluent.value / VOLUME_FACTORS[self.volume_output_unit.value], self.volume_output_unit.value)
-
-        # C1 V1 = C2 V2
-        # V1 = (C2 V2) / C1
-
-        line1 = r"\mathrm{{V}}_\mathrm{{stock}} &= \frac{{\mathrm{{C}}_\mathrm{{final}} \cdot \mathrm{{V}}_\mathrm{{final}}}}{{\mathrm{{C}}_\mathrm{{stock}}}}"
-        line2 = rf"&= \frac{{{final_conc.repru} \cdot {final_vol.repru}}}{{{stock_conc.repru}}}"
-        line3 = rf"&= \left(\frac{{{final_conc.repr} \cdot {final_vol.repr}}}{{{stock_conc.repr}}}\right) \ \frac{{{final_conc.unit_repr} \cdot {final_vol.unit_repr}}}{{{stock_conc.unit_repr}}}"
-        raw = fr"""
-        \begin{{aligned}}
-        {line1} \\
-        {line2} \\
-        {line3} \\
-        & = {vol_stock.repru} = {vol_stock_in_unit.repru} \\
-        \end{{aligned}}
-        """
-
-        line1 = r"\mathrm{{V}}_\mathrm{{diluent}} &= \mathrm{{V}}_\mathrm{{final}} - \mathrm{{V}}_\mathrm{{stock}}"
-        raw2 = fr"""
-        \begin{{aligned}}
-        {line1} \\
-        & = {vol_diluent.repru} = {vol_diluent_in_unit.repru} \\
-        \end{{aligned}}
-        """
-
-        with self.output:
-            display(Math(raw))
-            display(Math(raw2))
+            self.output.show_text(f"Error: {e}")
+
+    def _state(self):
+        """Everything the calculation depends on, in the argument order of `dilution_latex`."""
+        return tuple(
+            w.value
+            for w in (
+                self.stock_conc,
+                self.stock_conc_unit,
+                self.final_conc,
+                self.final_conc_unit,
+                self.final_vol,
+                self.final_vol_unit,
+                self.volume_output_unit,
+            )
+        )
 
 
+@tracked
 def dilution_helper():
     dh = DilutionHelper()
     dh.display()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import ipywidgets as widgets
+from IPython.display import display, Math
+
+from fysisk_biokemi.widgets.utils import (
+    Reaction,
+    StrictFloatText,
+    CoalescedCall,
+    molar_prefix_to_factor,
+    number_to_scientific_latex,
+    chemical_formula_to_latex,
+    tracked,
+)
+
+
+class EquilibriumComposition:
+    """Equilibrium concentrations from K_eq and initial concentrations.
+
+    Uses `Reaction.solve_equilibrium`, which is cheap enough to rerun on
+    every change of the inputs.
+    """
+
+    def __init__(self, default_reaction="A + B = C", default_K="1000.0"):
+        self.reaction_input = widgets.Text(
+            description="Reaktion:", value=default_reaction, style={"description_width": "initial"}
+        )
+        self.k_input = StrictFloatText(description="K_eq:", value=default_K, update_mode="idle", style={"description_width": "initial"})
+
+        self.inputs_box = widgets.VBox([])
+        self.output = widgets.Output()
+
+        # Rows of (box, concentration input, unit dropdown) keyed by species formula.
+        self._rows = {}
+        self.reaction = None
+
+        self.recompute = CoalescedCall(self._render)
+
+        self.reaction_input.observe(self._on_reaction_change, names="value")
+        self.k_input.observe(self._on_change, names="value")
+
+        self._on_reaction_change(None)
+
+    def display(self):
+        widget = widgets.HBox(
+            [
+                widgets.VBox([self.reaction_input, self.k_input, widgets.Label("Startkoncentrationer"), self.inputs_box]),
+                self.output,
+            ]
+        )
+        display(widget)
+
+    def _make_row(self, formula):
+        conc_input = StrictFloatText(
+            description=f"[{formula}]₀:", value="1.0", update_mode="idle", style={"description_width": "initial"}
+        )
+        unit_input = widgets.Dropdown(
+            options=molar_prefix_to_factor.keys(), value="mM", description="Enhed:", style={"description_width": "initial"}
+        )
+        conc_input.observe(self._on_change, names="value")
+        unit_input.observe(self._on_change, names="value")
+        return widgets.HBox([conc_input, unit_input]), conc_input, unit_input
+
+    def _on_reaction_change(self, change):
+        reaction = Reaction(self.reaction_input.value)
+        if not reaction.proper:
+            return
+        self.reaction = reaction
+
+        species, _ = reaction.get_stoichiometry()
+        for formula in species:
+            if formula not in self._rows:
+                self._rows[formula] = self._make_row(formula)
+        self.inputs_box.children = [self._rows[formula][0] for formula in species]
+        self._on_change(None)
+
+    def _on_change(self, change):
+        self.recompute()
+
+    def _render(self):
+        with self.output:
+            self.output.clear_output()
+
+            species, _ = self.reaction.get_stoichiometry()
+            K_eq = self.k_input.value
+            initial = {}
+            for formula in species:
+                _, conc_input, unit_input = self._rows[formula]
+                initial[formula] = conc_input.value * molar_prefix_to_factor[unit_input.value]
+
+            if not all(value == value and value >= 0 for value in [K_eq, *initial.values()]) or K_eq <= 0:
+                display(Math(r"\text{Indtast gyldige, ikke-negative værdier og } K_{eq} > 0."))
+                return
+
+            equilibrium = self.reaction.solve_equilibrium(K_eq, initial)
+
+            display(Math(self.reaction.get_equation_latex()))
+            display(Math(self.reaction.get_equilibrium_equation(with_values=False)))
+            lines = [
+                rf"[{chemical_formula_to_latex(formula)}] &= {number_to_scientific_latex(float(conc))} \, \mathrm{{M}}"
+                for formula, conc in equilibrium.items()
+            ]
+            display(Math(r"\begin{aligned}" + r" \\ ".join(lines) + r"\end{aligned}"))
+
+
+@tracked
+def equilibrium_composition(default_reaction="A + B = C"):
+    widget = EquilibriumComposition(default_reaction=default_reaction)
+    widget.display()
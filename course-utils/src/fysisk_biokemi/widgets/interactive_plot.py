@@ -4,6 +4,15 @@ import plotly.graph_objects as go
 from dataclasses import dataclass
 from IPython.display import display, Math
 
+from fysisk_biokemi.widgets.utils import (
+    FrameScheduler,
+    LRUResultCache,
+    adaptive_sample,
+    FigureState,
+    new_figure,
+    as_widget,
+)
+
 
 @dataclass
 class PlotConfig:
@@ -16,6 +25,22 @@ class PlotConfig:
     title: str = "Interactive Plot"
     latex_str: str | None = None
     parameters_latex: dict | None = None
+    sampling: str = "adaptive"  # or "uniform"
+    n_points: int = 500  # point budget for adaptive sampling
+    log_sampling: bool = False  # space points in log10(x), for concentration axes
+    cache_size: int = 256  # evaluated curves kept while scrubbing sliders
+    cache_max_bytes: int = 64 * 2**20
+
+
+def _quantize(value, step):
+    """Cache-key form of a slider value, so float noise maps to the same entry.
+
+    Values are counted in slider steps; sliders without a step (0 or None)
+    round to 12 significant digits instead.
+    """
+    if step:
+        return round(value / step)
+    return float(f"{value:.12g}")
 
 
 class ParameterControl:
@@ -56,8 +81,11 @@ class InteractivePlotter:
 
     FLOAT_TEXT_WIDTH = "150px"
 
-    def __init__(self, plot_config: PlotConfig):
+    def __init__(self, plot_config: PlotConfig, max_fps: float = 30.0, backend=None):
         self.config = plot_config
+        self.backend = backend
+        self.frame_scheduler = FrameScheduler(self._update_plot, max_fps=max_fps)
+        self.cache = LRUResultCache(max_entries=plot_config.cache_size, max_bytes=plot_config.cache_max_bytes)
 
         self.latex_out = widgets.Output()
         if self.config.latex_str:
@@ -74,8 +102,8 @@ class InteractivePlotter:
         self.independent_max = widgets.FloatText(
             value=self.config.independent_range[1], description="Max x:", layout=widgets.Layout(width=self.FLOAT_TEXT_WIDTH)
         )
-        self.independent_min.observe(self._update_plot, names="value")
-        self.independent_max.observe(self._update_plot, names="value")
+        self.independent_min.observe(self.frame_scheduler, names="value")
+        self.independent_max.observe(self.frame_scheduler, names="value")
 
         control_widgets.append(widgets.HBox([self.independent_min, self.independent_max]))
 
@@ -86,16 +114,16 @@ class InteractivePlotter:
         self.xaxis_max = widgets.FloatText(
             value=self.config.independent_range[1], description="X-axis max:", layout=widgets.Layout(width=self.FLOAT_TEXT_WIDTH)
         )
-        self.xaxis_min.observe(self._update_plot, names="value")
-        self.xaxis_max.observe(self._update_plot, names="value")
+        self.xaxis_min.observe(self.frame_scheduler, names="value")
+        self.xaxis_max.observe(self.frame_scheduler, names="value")
 
         control_widgets.append(widgets.HBox([self.xaxis_min, self.xaxis_max]))
 
         # Y-axis limits:
         self.yaxis_min = widgets.FloatText(value=0.0, description="Y-axis min:", layout=widgets.Layout(width=self.FLOAT_TEXT_WIDTH))
         self.yaxis_max = widgets.FloatText(value=1.0, description="Y-axis max:", layout=widgets.Layout(width=self.FLOAT_TEXT_WIDTH))
-        self.yaxis_min.observe(self._update_plot, names="value")
-        self.yaxis_max.observe(self._update_plot, names="value")
+        self.yaxis_min.observe(self.frame_scheduler, names="value")
+        self.yaxis_max.observe(self.frame_scheduler, names="value")
         control_widgets.append(widgets.HBox([self.yaxis_min, self.yaxis_max]))
 
         # Parameters:
@@ -110,7 +138,7 @@ class InteractivePlotter:
                 latex_label=self.config.parameters_latex.get(param, None) if self.config.parameters_latex else None,
             )
 
-            widget = control.create_control_widget(self._update_plot)
+            widget = control.create_control_widget(self.frame_scheduler)
             slider = widget.children[0]
             self.controls[param] = slider
             control_widgets.append(widget)
@@ -131,19 +159,41 @@ class InteractivePlotter:
             ),
         )
 
-        app = widgets.HBox([left_box, self.fig])  
+        app = widgets.HBox([left_box, as_widget(self.fig)])  
         display(app)
 
+    def _cache_key(self, params, x_range):
+        quantized = tuple((param, _quantize(value, self.controls[param].step)) for param, value in params.items())
+        return quantized, x_range, self.config.sampling, self.config.n_points, self.config.log_sampling
+
     def _evaluate_function(self):
         params = {param: ctrl.value for param, ctrl in self.controls.items()}
         x_range = (self.independent_min.value, self.independent_max.value)
-        x = np.linspace(x_range[0], x_range[1], 500)
-        y = self.config.function(x, **params)
+
+        key = self._cache_key(params, x_range)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        if self.config.sampling == "adaptive":
+            x, y = adaptive_sample(
+                lambda x: self.config.function(x, **params),
+                *x_range,
+                max_points=self.config.n_points,
+                log=self.config.log_sampling and x_range[0] > 0,
+            )
+        elif self.config.log_sampling and x_range[0] > 0:
+            x = np.geomspace(x_range[0], x_range[1], self.config.n_points)
+            y = self.config.function(x, **params)
+        else:
+            x = np.linspace(x_range[0], x_range[1], self.config.n_points)
+            y = self.config.function(x, **params)
+        self.cache.put(key, (x, y))
         return x, y
 
     def _make_plot(self):
         # Initialize figure
-        self.fig = go.FigureWidget(layout=go.Layout(width=600, height=400))
+        self.fig = new_figure(width=600, height=400, backend=self.backend)
         self.fig.update_layout(
             title=self.config.title,
             xaxis_title=self.config.xlabel,
@@ -156,11 +206,13 @@ class InteractivePlotter:
         # Calculate the function
         x, y = self._evaluate_function()
         main_trace = self.fig.add_trace(go.Scatter(x=x, y=y, mode="lines", line=dict(width=4)))
+        self.figure_state = FigureState(self.fig)
 
     def _update_plot(self, *args, **kwargs):
         x, y = self._evaluate_function()
-        self.fig.data[0].x = x
-        self.fig.data[0].y = y
-
-        self.fig.update_xaxes(range=[self.xaxis_min.value, self.xaxis_max.value])
-        self.fig.update_yaxes(range=[self.yaxis_min.value, self.yaxis_max.value])
+        with self.figure_state.update() as state:
+            state.trace(0, x=x, y=y)
+            state.layout(
+                xaxis_range=[self.xaxis_min.value, self.xaxis_max.value],
+                yaxis_range=[self.yaxis_min.value, self.yaxis_max.value],
+            )
@@ -5,9 +5,13 @@ from dataclasses import dataclass
 
 import plotly.graph_objects as go
 
+from fysisk_biokemi.widgets.utils import FrameScheduler, FigureState, new_figure, tracked
+
 
 class MichaelisMenten:
-    def __init__(self):
+    def __init__(self, max_fps: float = 30.0, backend=None):
+        self.backend = backend
+
         # Inputs:
         self.km_input = widgets.FloatSlider(value=5, min=0.1, max=100.0, step=0.1, description="Km:", disabled=False)
 
@@ -35,6 +39,9 @@ class MichaelisMenten:
         self.plot_output = widgets.Output()
         self.text_output = widgets.Output()
 
+        # Slider events are folded into frames rendered at most max_fps times per second
+        self.frame_scheduler = FrameScheduler(self._render, max_fps=max_fps)
+
         # Observe changes
         self.km_input.observe(self._on_change, names="value")
         self.vmax_input.observe(self._on_change, names="value")
@@ -63,7 +70,7 @@ class MichaelisMenten:
 
     def _make_plot(self):
         s_values, v_values = self.calculate()
-        fig = go.FigureWidget(layout=go.Layout(width=800, height=600))
+        fig = new_figure(width=800, height=600, backend=self.backend)
         # Data trace
         fig.add_trace(go.Scatter(x=s_values, y=v_values, mode="lines+markers", name="Data"))
 
@@ -117,45 +124,40 @@ class MichaelisMenten:
 
     def _update_plot(self):
         s, v = self.calculate()
-        with self.fig.batch_update():
-            self.fig.data[0].x = s.tolist()
-            self.fig.data[0].y = v.tolist()
-
-            if self.plot_lines.value:
-                self.fig.data[0].mode = "lines+markers"
-            else:
-                self.fig.data[0].mode = "markers"
-
-            # # Km line
-            km = self.km_input.value
-            show = self.show_km.value
-            sh = self.fig.layout.shapes[self._km_shape_idx]
-            sh.update(x0=km, x1=km, visible=show, yref="paper", y0=0, y1=1)
-
-            # # Vmax line
-            vmax = self.vmax_input.value
-            show = self.show_vmax.value
-            sh = self.fig.layout.shapes[self._vm_shape_idx]
-            sh.update(y0=vmax, y1=vmax, visible=show, xref="paper", x0=0, x1=1)
-
-
-            # Update kcat and kcat/Km
-            km = self.km_input.value
-            vmax = self.vmax_input.value
-            etot = self.enzyme_conc.value
-            kcat = vmax / etot
-            kcat_km = kcat / km 
-
-            k_cat_str = "k_cat: {:.1f}".format(kcat)
-            k_cat_km_str = "k_cat/Km: {:.1f}".format(kcat_km)
-            self.fig.layout.annotations[1].text = k_cat_str
-            self.fig.layout.annotations[0].text = k_cat_km_str
+        km = self.km_input.value
+        vmax = self.vmax_input.value
+
+        # Update kcat and kcat/Km
+        etot = self.enzyme_conc.value
+        kcat = vmax / etot
+        kcat_km = kcat / km
+
+        with self.figure_state.update() as state:
+            state.trace(0, x=s, y=v, mode="lines+markers" if self.plot_lines.value else "markers")
+
+            # Km line
+            state.shape(self._km_shape_idx, x0=km, x1=km, visible=self.show_km.value, yref="paper", y0=0, y1=1)
+
+            # Vmax line
+            state.shape(self._vm_shape_idx, y0=vmax, y1=vmax, visible=self.show_vmax.value, xref="paper", x0=0, x1=1)
+
+            state.annotation(1, text="k_cat: {:.1f}".format(kcat))
+            state.annotation(0, text="k_cat/Km: {:.1f}".format(kcat_km))
 
     def _on_change(self, change):
+        self.frame_scheduler()
+
+    def _render(self):
+        # Renders run from the scheduler, where an exception would only reach
+        # the kernel log; show it under the plot instead (e.g. [Etot] = 0).
         try:
             self._update_plot()
         except Exception as e:
-            pass
+            self.text_output.outputs = ()
+            self.text_output.append_stdout(f"Could not update the plot: {type(e).__name__}: {e}\n")
+            return
+        if self.text_output.outputs:
+            self.text_output.outputs = ()
 
     def display(self):
         # Controls
@@ -184,13 +186,21 @@ class MichaelisMenten:
         with self.plot_output:
             self.plot_output.clear_output(wait=True)
             self.fig = self._make_plot()
+            self.figure_state = FigureState(self.fig)
             display(self.fig)
 
-        widget = widgets.HBox([controls, self.plot_output]) #self.text_output])
+        widget = widgets.HBox([controls, widgets.VBox([self.plot_output, self.text_output])])
         display(widget)
 
         self._on_change(None)
 
-def michaelis_menten_demo():
+@tracked
+def michaelis_menten_demo(client_side=False):
+    if client_side:
+        # Evaluated in the browser; no kernel round trip per slider move.
+        from fysisk_biokemi.widgets.client_models import michaelis_menten_model
+
+        display(michaelis_menten_model())
+        return
     widget = MichaelisMenten()
     widget.display()
\ No newline at end of file
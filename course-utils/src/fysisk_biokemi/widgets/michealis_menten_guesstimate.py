@@ -5,6 +5,8 @@ from dataclasses import dataclass
 
 import plotly.graph_objects as go
 
+from fysisk_biokemi.widgets.utils import FigureState, new_figure, tracked
+
 @dataclass
 class MichealisMentenParameters:
     Vmax: float
@@ -23,7 +25,8 @@ class MichealisMentenParameters:
 
 class MichealisMentenGuesstimateWidget:
 
-    def __init__(self, correct_threshold=10.0, debug=False):
+    def __init__(self, correct_threshold=10.0, debug=False, backend=None):
+        self.backend = backend
         self.plot_output = widgets.Output()
         self.error_output = widgets.Output()
 
@@ -88,7 +91,8 @@ class MichealisMentenGuesstimateWidget:
         return L, V0
 
     def _make_plot(self):
-        self.fig = go.FigureWidget(layout=go.Layout(width=600, height=400))
+        self.fig = new_figure(width=600, height=400, backend=self.backend)
+        self.figure_state = FigureState(self.fig)
 
         x, y = self._get_data()
 
@@ -112,13 +116,9 @@ class MichealisMentenGuesstimateWidget:
 
         L, theta = self._get_data()
 
-        self.fig.data[0].x = L
-        self.fig.data[0].y = theta
-
-        if self.parameters.log:
-            self.fig.update_xaxes(type="log")
-        else:
-            self.fig.update_xaxes(type="linear")
+        with self.figure_state.update() as state:
+            state.trace(0, x=L, y=theta)
+            state.layout(xaxis_type="log" if self.parameters.log else "linear")
 
     def _on_generate_button_clicked(self, b):
         self.parameters = MichealisMentenParameters.get_random()
@@ -153,6 +153,7 @@ class MichealisMentenGuesstimateWidget:
         if error < self.correct_threshold:
             self.guess_vmax_error.value += " 🎉 Correct!"
 
+@tracked
 def michealis_menten_guess(debug=False):
     widget = MichealisMentenGuesstimateWidget(debug=debug)
     widget.display()
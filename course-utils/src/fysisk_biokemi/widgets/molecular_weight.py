@@ -1,6 +1,6 @@
 import ipywidgets as widgets
 from IPython.display import display, Math
-from fysisk_biokemi.widgets.utils import ATOMIC_WEIGHTS
+from fysisk_biokemi.widgets.utils import ATOMIC_WEIGHTS, tracked
 
 
 def formula_to_weight(formula: str) -> float:
@@ -18,6 +18,7 @@ def formula_to_weight(formula: str) -> float:
     return weight
 
 
+@tracked
 def molecular_weight():
     formula_input = widgets.Text(description="Formel:", value="C6H12O6", style={"description_width": "initial"})
     weight_output = widgets.FloatText(
@@ -6,10 +6,20 @@ import re
 import numpy as np
 import pandas as pd
 import ipywidgets as widgets
-from IPython.display import display, Math
-import matplotlib.pyplot as plt
-
-from fysisk_biokemi.widgets.utils import Reaction
+from IPython.display import display
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+
+from fysisk_biokemi.widgets.utils import (
+    JobRunner,
+    MathView,
+    Reaction,
+    close_widget_tree,
+    downsample,
+    tracked,
+    uploaded_files,
+)
 
 
 class ReactionKeqWidget:
@@ -35,10 +45,13 @@ class ReactionKeqWidget:
     HEADER_UNIT_REGEX = re.compile(r"^(.*?)[\(\[\{]\s*([fpnµu]M|mM|M)\s*[\)\]\}]\s*$")
 
     # -------------------- Construction --------------------
-    def __init__(self, default_reaction="A + B = X + Y"):
+    def __init__(self, default_reaction="A + B = X + Y", max_plot_points=4000):
+        self.max_plot_points = max_plot_points  # long instrument series are downsampled for plotting
+
         # state
         self._df = None  # original DataFrame
         self._species_rows = []  # rows in mapping box
+        self._converted = None  # (df, key, (t_s, species, conc_M)) for the current data and mapping
 
         # widgets (left pane)
         self.header_html = widgets.HTML("<h3>Data & reaktion</h3>")
@@ -53,9 +66,12 @@ class ReactionKeqWidget:
         self.species_map_box = widgets.VBox([])
         self.process_btn = widgets.Button(description="Beregn og plot", button_style="primary")
         self.status_out = widgets.Output(layout={"border": "1px solid #ddd"})
-        self.latex_out = widgets.Output()
-        self.plot_out = widgets.Output()
-        self.table_out = widgets.Output()
+        # Reading the CSV and computing Keq run in the background; new input cancels them.
+        self.jobs = JobRunner(description="Beregner:")
+        # Results are updated in place rather than re-displayed into Outputs.
+        self.latex_html = MathView()
+        self.table_html = widgets.HTML()
+        self._make_plot()
 
         # layout
         self.left = widgets.VBox(
@@ -70,14 +86,15 @@ class ReactionKeqWidget:
         self.right = widgets.VBox(
             [
                 self.species_map_box,
+                self.jobs.progress,
                 self.status_out,
             ]
         )
 
         self.bottom = widgets.HBox(
             [
-                self.plot_out,
-                widgets.VBox([widgets.HTML("<h3>Reaktionsligning</h3>"), self.latex_out]),
+                self.plot_image,
+                widgets.VBox([widgets.HTML("<h3>Reaktionsligning</h3>"), self.latex_html, self.table_html]),
             ]
         )
 
@@ -97,6 +114,53 @@ class ReactionKeqWidget:
         )
         display(full_widget)
 
+    def close(self):
+        """Release the figure and close the widgets of this UI."""
+        self.jobs.cancel()
+        self.fig.clear()
+        self._background = None
+        for w in (self.left, self.right, self.bottom):
+            close_widget_tree(w)
+
+    # -------------------- Plot --------------------
+    def _make_plot(self):
+        """Create the one figure the widget redraws for every analysis.
+
+        The figure is not registered with pyplot, so repeated analyses never
+        accumulate open figures; it is rendered with Agg into an Image widget.
+        """
+        self.fig = Figure(figsize=(6, 4))
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        # Animated: left out of full draws and blitted on top of the background.
+        (self.line,) = self.ax.plot([], [], color="mediumpurple", animated=True)
+        self.ax.set_xlabel("Tid (s)")
+        self.ax.set_ylabel(r"$K_{eq}$")
+        self.ax.grid(True, which="both", ls="--", lw=0.5)
+        self.fig.tight_layout()
+        self._background = None  # (axis limits, saved background without the line)
+        self.plot_image = widgets.Image(format="png", layout={"display": "none"})
+
+    def _draw_plot(self, t, keq):
+        """Update the line data and redraw, re-rendering the axes only if the limits changed."""
+        self.line.set_data(t, keq)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+        canvas = self.fig.canvas
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        if self._background is None or self._background[0] != limits:
+            canvas.draw()
+            self._background = (limits, canvas.copy_from_bbox(self.fig.bbox))
+        else:
+            canvas.restore_region(self._background[1])
+        self.ax.draw_artist(self.line)
+
+        png = io.BytesIO()
+        imsave(png, np.asarray(canvas.buffer_rgba()), format="png")
+        self.plot_image.value = png.getvalue()
+        self.plot_image.layout.display = None
+
     # -------------------- Parsing helpers --------------------
     @staticmethod
     def _unit_from_header(name):
@@ -170,15 +234,17 @@ class ReactionKeqWidget:
             return
 
         # Read CSV
-        content = self.uploader.value[list(self.uploader.value.keys())[0]]['content']
-        try:
-            df = pd.read_csv(io.BytesIO(content))
-        except Exception as e:
-            with self.status_out:
-                print(f"Kunne ikke læse CSV: {e}")
-            return
+        _, content = uploaded_files(self.uploader.value)[0]
+        self.jobs.submit(_read_csv, content, on_done=self._on_csv_read, on_error=self._on_csv_error)
+
+    def _on_csv_error(self, e):
+        with self.status_out:
+            print(f"Kunne ikke læse CSV: {e}")
 
+    def _on_csv_read(self, df):
         self._df = df
+        self._converted = None
+        self._reset_results()
         cols = list(df.columns)
 
         # Time column guess: first column
@@ -216,16 +282,45 @@ class ReactionKeqWidget:
         return self.time_col_dd.value, self.time_unit_dd.value, mapping
 
     @staticmethod
-    def _keq_series(reactants, products, df_M):
-        """Compute Keq = Π products [S]^v / Π reactants [S]^v for each row."""
-        num = pd.Series(1.0, index=df_M.index, dtype=float)
-        den = pd.Series(1.0, index=df_M.index, dtype=float)
-        for s, nu in products.items():
-            num *= np.power(df_M[s], nu)
-        for s, nu in reactants.items():
-            den *= np.power(df_M[s], nu)
+    def _log_keq(species, conc_M, reactants, products):
+        """ln Keq = Σ ν_i ln[S_i] for each row, as one matrix-vector product.
+
+        ν_i > 0 for products and < 0 for reactants. Working in log space avoids
+        overflow/underflow of the individual powers for large coefficients.
+        """
+        nu = np.zeros(len(species))
+        for s, coefficient in products.items():
+            nu[species.index(s)] += coefficient
+        for s, coefficient in reactants.items():
+            nu[species.index(s)] -= coefficient
+
+        # Species with zero net coefficient would give 0 * log(0) = nan.
+        active = np.flatnonzero(nu)
         with np.errstate(divide="ignore", invalid="ignore"):
-            return num / den
+            return np.log(conc_M[:, active]) @ nu[active]
+
+    def _converted_data(self, df, time_col, time_unit, mapping, cached=None):
+        """Return (df, key, (t_s, species, conc_M)) with time in s and concentrations in M.
+
+        conc_M is a contiguous (rows, species) array. `cached` (a previous
+        return value) is reused while the data and the column/unit mapping
+        are unchanged. Runs in a worker thread, so it does not touch `self`'s
+        state; the caller stores the result on the loop thread.
+        """
+        key = (time_col, time_unit, tuple(mapping.items()))
+        if cached is not None and cached[0] is df and cached[1] == key:
+            return cached
+
+        t_s = pd.to_numeric(df[time_col], errors="coerce").to_numpy(dtype=float) * self.TIME_MAP.get(time_unit, 1.0)
+
+        species = list(mapping)
+        columns = [col for col, _ in mapping.values()]
+        # normalize uM -> µM
+        factors = np.array([self.UNIT_MAP["µM" if unit == "uM" else unit] for _, unit in mapping.values()])
+        values = df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        conc_M = np.ascontiguousarray(values * factors)
+
+        return df, key, (t_s, species, conc_M)
 
     def _process(self, _):
         self._clear_outputs()
@@ -251,59 +346,56 @@ class ReactionKeqWidget:
                 print(f"Manglende kolonnetilknytning for: {', '.join(missing)}")
             return
 
-        df = self._df.copy()
-
         # Time vector in seconds
-        if time_col not in df.columns:
+        if time_col not in self._df.columns:
             with self.status_out:
                 print(f"Tid kolonne '{time_col}' findes ikke.")
             return
-        try:
-            t_raw = pd.to_numeric(df[time_col], errors="coerce").to_numpy(dtype=float)
-        except Exception:
-            with self.status_out:
-                print("Kunne ikke konvertere tidskolonnen til tal.")
-            return
-        t_s = t_raw * self.TIME_MAP.get(time_unit, 1.0)
-
-        # Concentrations in M
-        conc_M = {}
         for s, (col, unit) in mapping.items():
-            if col not in df.columns:
+            if col not in self._df.columns:
                 with self.status_out:
                     print(f"Valgt kolonne '{col}' findes ikke for {s}.")
                 return
-            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
-            # normalize uM -> µM
-            unit_norm = "µM" if unit == "uM" else unit
-            factor = self.UNIT_MAP[unit_norm]
-            conc_M[s] = values * factor
 
-        df_M = pd.DataFrame(conc_M)
-        reactants, products = reaction.get_reaction_dicts()
-        keq = self._keq_series(reactants, products, df_M)
+        self.jobs.submit(
+            self._compute,
+            self._df,
+            time_col,
+            time_unit,
+            mapping,
+            reaction.get_reaction_dicts(),
+            self._converted,
+            on_done=lambda result: self._show_results(reaction, result),
+            on_error=self._on_compute_error,
+        )
+
+    def _compute(self, df, time_col, time_unit, mapping, reaction_dicts, cached):
+        """Converted data, Keq(t) and the downsampled plot series (runs in a worker thread)."""
+        converted = self._converted_data(df, time_col, time_unit, mapping, cached)
+        t_s, species, conc_M = converted[2]
+        reactants, products = reaction_dicts
+        keq = np.exp(self._log_keq(species, conc_M, reactants, products))
+        return converted, keq, downsample(t_s, keq, self.max_plot_points)
+
+    def _on_compute_error(self, e):
+        with self.status_out:
+            print(f"Fejl under beregning: {e}")
+
+    def _show_results(self, reaction, result):
+        self._converted, keq, plot_data = result
+        t_s, species, conc_M = self._converted[2]
 
         # LaTeX expression
-        with self.latex_out:
-            eq = reaction.get_equation_latex()
-            expr = reaction.get_equilibrium_equation(with_values=False)
-            display(Math(eq))
-            display(Math(expr))
+        eq = reaction.get_equation_latex()
+        expr = reaction.get_equilibrium_equation(with_values=False)
+        self.latex_html.show(eq, expr)
 
         # Plot Keq vs time
-        with self.plot_out:
-            fig, ax = plt.subplots(figsize=(6, 4))
-            ax.plot(t_s, keq, color="mediumpurple")
-            ax.set_xlabel("Tid (s)")
-            ax.set_ylabel(r"$K_{eq}$")
-            ax.grid(True, which="both", ls="--", lw=0.5)
-            plt.tight_layout()
-            plt.show()
+        self._draw_plot(*plot_data)
 
         # Preview table (first 6 rows)
-        with self.table_out:
-            preview = pd.DataFrame({"time_s": t_s, **df_M, "Keq": keq}).head(6)
-            display(preview)
+        preview = pd.DataFrame({"time_s": t_s[:6], **dict(zip(species, conc_M[:6].T)), "Keq": keq[:6]})
+        self.table_html.value = preview.to_html(index=False)
 
         with self.status_out:
             print(
@@ -314,11 +406,18 @@ class ReactionKeqWidget:
     # -------------------- Utilities --------------------
     def _clear_outputs(self):
         self.status_out.clear_output()
-        self.latex_out.clear_output()
-        self.plot_out.clear_output()
-        self.table_out.clear_output()
+
+    def _reset_results(self):
+        """Hide results from previously uploaded data."""
+        self.latex_html.clear()
+        self.table_html.value = ""
+        self.plot_image.layout.display = "none"
+
+def _read_csv(content):
+    return pd.read_csv(io.BytesIO(content))
 
 
+@tracked
 def reaction_data_analysis(default_reaction="A + B = X + Y"):
     """Helper to quickly create and display the ReactionKeqWidget."""
     app = ReactionKeqWidget(default_reaction=default_reaction)
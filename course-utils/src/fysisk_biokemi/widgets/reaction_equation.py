@@ -1,15 +1,16 @@
 import ipywidgets as widgets
-from IPython.display import display, Math
+from functools import lru_cache
+from IPython.display import display
 from fysisk_biokemi.widgets.utils.equilibrium_reaction import Reaction, ReactionTerm
-from fysisk_biokemi.widgets.utils.misc import molar_prefix_to_factor
-from fysisk_biokemi.widgets.utils import StrictFloatText
+from fysisk_biokemi.widgets.utils.misc import molar_prefix_to_factor, close_widget_tree
+from fysisk_biokemi.widgets.utils import StrictFloatText, MathView, tracked
 
 
 
 
 def add_term_input(term: ReactionTerm):
     conc_input = StrictFloatText(
-        description=f"[{term.formula}]:", value=f"{term.concentration}", style={"description_width": "initial"}
+        description=f"[{term.formula}]:", value=f"{term.concentration}", update_mode="idle", style={"description_width": "initial"}
     )
     unit_input = widgets.Dropdown(
         options=molar_prefix_to_factor.keys(), value=term.unit, description="Enhed:", style={"description_width": "initial"}
@@ -18,60 +19,116 @@ def add_term_input(term: ReactionTerm):
     return box, conc_input, unit_input
 
 
+class TermRows:
+    """Concentration/unit input rows for the species of a reaction, keyed by formula.
+
+    When the reaction changes, rows for species that are still present are
+    kept together with their values; only rows for new species are created
+    and rows for removed species are detached and closed. Every row has a
+    single observer for its lifetime, which writes the inputs into the
+    current reaction.
+    """
+
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self.rows = {}  # formula -> (box, conc_input, unit_input)
+        self.reaction = None
+        self.reactants_label = widgets.Label("Reaktanter")
+        self.products_label = widgets.Label("Produkter")
+        self.box = widgets.VBox([])
+
+    def _add_row(self, term):
+        box, conc_input, unit_input = add_term_input(term)
+        conc_input.observe(self._on_input, names="value")
+        unit_input.observe(self._on_input, names="value")
+        self.rows[term.formula] = (box, conc_input, unit_input)
+
+    def _remove_row(self, formula):
+        box, conc_input, unit_input = self.rows.pop(formula)
+        conc_input.unobserve(self._on_input, names="value")
+        unit_input.unobserve(self._on_input, names="value")
+        conc_input.close()
+        close_widget_tree(box)
+
+    def _sync_terms(self):
+        """Copy the values of the input rows into the terms of the current reaction."""
+        for term in self.reaction.reactants + self.reaction.products:
+            _, conc_input, unit_input = self.rows[term.formula]
+            term.set_concentration(conc_input.value, unit_input.value)
+
+    def _on_input(self, change):
+        self._sync_terms()
+        self.on_change()
+
+    def set_reaction(self, reaction: Reaction):
+        formulas = list(dict.fromkeys(reaction.get_terms()))
+        for formula in [f for f in self.rows if f not in formulas]:
+            self._remove_row(formula)
+        for term in reaction.reactants + reaction.products:
+            if term.formula not in self.rows:
+                self._add_row(term)
+
+        self.reaction = reaction
+        self._sync_terms()
+
+        # A species on both sides only gets one row, under the side it first appears.
+        reactants = list(dict.fromkeys(t.formula for t in reaction.reactants))
+        products = [f for f in dict.fromkeys(t.formula for t in reaction.products) if f not in reactants]
+        children = (
+            self.reactants_label,
+            *[self.rows[f][0] for f in reactants],
+            self.products_label,
+            *[self.rows[f][0] for f in products],
+        )
+        if children != self.box.children:
+            self.box.children = children
+
+
+def _signature(reaction: Reaction):
+    return tuple(tuple((t.coefficient, t.formula) for t in side) for side in (reaction.reactants, reaction.products))
+
+
+@lru_cache(maxsize=128)
+def equilibrium_latex(signature, concentrations):
+    """Reaction and equilibrium-constant LaTeX for a reaction `_signature` and its concentrations in M."""
+    reactants, products = (" + ".join(f"{coefficient} {formula}" for coefficient, formula in side) for side in signature)
+    reaction = Reaction(f"{reactants} = {products}")
+    for term, concentration in zip(reaction.reactants + reaction.products, concentrations):
+        term.concentration = concentration
+    return reaction.get_equation_latex(), reaction.get_equilibrium_equation()
+
+
+@tracked
 def reaction_equation():
     reaction_input = widgets.Text(
         description="Reaktion:", value="A + B = C", style={"description_width": "initial"}
     )
 
-    inputs_box = widgets.VBox([])
-
-    output = widgets.Output()
+    output = MathView()
     output_label = widgets.Label("Resultat")
     outputs_box = widgets.VBox([output_label, output])
 
+    def update_equilibrium():
+        reaction = term_rows.reaction
+        concentrations = tuple(t.concentration for t in reaction.reactants + reaction.products)
+        output.show(*equilibrium_latex(_signature(reaction), concentrations))
+
+    term_rows = TermRows(update_equilibrium)
+
     def on_reaction_change(change):
-        output.clear_output()
-
-        reaction_str = change["new"]
-        reaction = Reaction(reaction_str)
-        if reaction.proper:
-            # Clear previous inputs
-            inputs_box.children = [widgets.Label("Reaktanter")]
-
-            widgets_list = []
-
-            # Add new inputs for reactants
-            for r in reaction.reactants:
-                box, conc_input, unit_input = add_term_input(r)
-                inputs_box.children += (box,)
-                conc_input.observe(r.on_change_concentration, names="value")
-                unit_input.observe(r.on_change_unit, names="value")
-                widgets_list += [conc_input, unit_input]
-
-            # Add new inputs for products
-            inputs_box.children += (widgets.Label("Produkter"),)
-            for p in reaction.products:
-                box, conc_input, unit_input = add_term_input(p)
-                inputs_box.children += (box,)
-                conc_input.observe(p.on_change_concentration, names="value")
-                unit_input.observe(p.on_change_unit, names="value")
-                widgets_list += [conc_input, unit_input]
-
-            def update_equilibrium(*args):
-                output.clear_output()
-                with output:
-                    display(Math(reaction.get_equation_latex()))
-                    display(Math(reaction.get_equilibrium_equation()))
-
-            for widget in widgets_list:
-                widget.observe(update_equilibrium, names="value")
-
-            update_equilibrium()
-
-    on_reaction_change({"new": "A + B = C"})
+        reaction = Reaction(change["new"])
+        if not reaction.proper:
+            return
+        # Whitespace edits and the like give the same reaction again.
+        if term_rows.reaction is not None and _signature(reaction) == _signature(term_rows.reaction):
+            return
+        term_rows.set_reaction(reaction)
+        update_equilibrium()
+
+    on_reaction_change({"new": reaction_input.value})
 
     reaction_input.observe(on_reaction_change, names="value")
-    widget = widgets.VBox([reaction_input, inputs_box, outputs_box])
+    widget = widgets.VBox([reaction_input, term_rows.box, outputs_box])
     display(widget)
 
 
@@ -1,70 +1,10 @@
-import io
 import ipywidgets as widgets
 from IPython.display import display, Math
 import numpy as np
 
-from dataclasses import dataclass
-
-@dataclass
-class SequencePropertiesData:
-    valid: bool = False
-    sequence: str = ""
-    molecular_weight: float = 0.0
-    extinction_coefficient: float = 0.0
-    isoelectric_point: float = 0.0
-    charge_at_ph: float = 0.0
-
-def calculate_properties(sequence: str, ph: float = 7.0) -> SequencePropertiesData:
-    from Bio.SeqUtils.ProtParam import ProteinAnalysis
-    try:
-        analysis = ProteinAnalysis(sequence)
-        mw = analysis.molecular_weight()
-        ec = analysis.molar_extinction_coefficient()
-        pi = analysis.isoelectric_point()
-        return SequencePropertiesData(
-            valid=True,
-            sequence=sequence,
-            molecular_weight=mw,
-            extinction_coefficient=ec[0],  # assuming reduced form
-            isoelectric_point=pi,
-            charge_at_ph=analysis.charge_at_pH(ph)
-        )
-    except Exception as e:
-        return SequencePropertiesData(sequence=sequence)
-
-
-def sequences_to_df(file: str = None, sequences: list[str] = None, ph: float = 7.0):
-    import pandas as pd
-    from Bio.SeqIO.FastaIO import SimpleFastaParser
-
-    if file is None and sequences is None:
-        raise ValueError("Either file or sequences must be provided.")
-    
-    if sequences is None and file is not None:
-        sequences = []
-        with open(file) as handle:
-            for _, seq in SimpleFastaParser(handle):
-                sequences.append(seq)
-    mw = []
-    ec = []
-    pi = []
-    charge = []
-    for seq in sequences:
-        prop = calculate_properties(seq, ph)
-        if prop.valid:
-            mw.append(prop.molecular_weight)
-            ec.append(prop.extinction_coefficient)
-            pi.append(prop.isoelectric_point)
-            charge.append(prop.charge_at_ph)
-
-    data = {
-        "Sequence": sequences,
-        "Molecular Weight": mw,
-        "Extinction Coefficient": ec,
-        "Isoelectric Point": pi,
-        "Charge": charge,
-    }
-    return pd.DataFrame(data)
+from fysisk_biokemi.sequences import SequencePropertiesData, calculate_properties, parse_fasta, sequences_to_df
+from fysisk_biokemi.widgets.utils import JobRunner, tracked, uploaded_files
+
 
 class SequenceProperties:
 
@@ -130,35 +70,47 @@ class FastaToDataFrame:
             style={"description_width": "initial"}
         )
         self.output_area = widgets.Output()
+        # Parsing and the property table run in the background; a new upload
+        # or pH value cancels the table that is being computed.
+        self.jobs = JobRunner(description="Beregner:")
 
         self.uploader.observe(self._on_upload, names="value")
         self.ph_slider.observe(self._on_change, names="value")
 
     def display(self):
-        input_box = widgets.VBox([self.uploader, self.ph_slider, self.output_area])
+        input_box = widgets.VBox([self.uploader, self.ph_slider, self.jobs.progress, self.output_area])
         display(input_box)
 
     def _on_upload(self, change):
-        from Bio.SeqIO.FastaIO import SimpleFastaParser
-
-        sequences = []
-        raw_content = next(iter(self.uploader.value.values()))['content']
-        raw_content = io.StringIO(raw_content.decode('utf-8'))
-
-        for _, seq in SimpleFastaParser(raw_content):
-            sequences.append(seq)
+        _, raw_content = uploaded_files(self.uploader.value)[0]
+        self.jobs.submit(parse_fasta, raw_content, on_done=self._on_parsed, on_error=self._show_error)
 
+    def _on_parsed(self, sequences):
         self.sequences = sequences
         self._on_change(None)
 
     def _on_change(self, change):
         if not hasattr(self, 'sequences'):
-            return        
-        df = self.get_dataframe()
+            return
+        self.jobs.submit(
+            sequences_to_df,
+            sequences=self.sequences,
+            ph=self.ph_slider.value,
+            progress=True,
+            on_done=self._show_table,
+            on_error=self._show_error,
+        )
+
+    def _show_table(self, df):
         with self.output_area:
             self.output_area.clear_output()
             display(df)
 
+    def _show_error(self, error):
+        with self.output_area:
+            self.output_area.clear_output()
+            print(f"Fejl: {error}")
+
     def get_dataframe(self):
         if hasattr(self, 'sequences'):
             ph = self.ph_slider.value
@@ -167,10 +119,12 @@ class FastaToDataFrame:
             raise ValueError("No sequences have been uploaded yet.")
 
 
+@tracked
 def sequence_properties():
     widget = SequenceProperties()
     widget.display()
 
+@tracked
 def sequence_dataframe():
     widget = FastaToDataFrame()
     widget.display()
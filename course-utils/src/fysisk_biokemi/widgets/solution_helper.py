@@ -1,6 +1,7 @@
 import ipywidgets as widgets
-from IPython.display import display, Math
-from fysisk_biokemi.widgets.utils import StrictFloatText, number_to_scientific_latex
+from functools import lru_cache
+from IPython.display import display
+from fysisk_biokemi.widgets.utils import StrictFloatText, CoalescedCall, MathView, number_to_scientific_latex, tracked
 
 # --- unit factors ---
 MASS_FACTORS = {
@@ -62,6 +63,89 @@ class ValueWithUnit:
         raise NotImplementedError("Can only multiply ValueWithUnit by int or float")
 
 
+def _mass_latex(concentration, volume, mol_weight, mass_unit, volume_unit, concentration_unit, mol_weight_unit):
+    # m = c * V * MW
+    c = ValueWithUnit(concentration * CONCENTRATION_FACTORS[concentration_unit], "M")
+    V = ValueWithUnit(volume * VOLUME_FACTORS[volume_unit], "L")
+    MW = ValueWithUnit(mol_weight * MOLECULAR_WEIGHT_FACTORS[mol_weight_unit], "g/mol")
+    m = c.value * V.value * MW.value  # g
+    m = m / MASS_FACTORS[mass_unit]
+    m = ValueWithUnit(m, mass_unit)
+    unit_calc = r"\frac{\cancel{\mathrm{mol}}\cdot \cancel{\mathrm{L}}\cdot \mathrm{g}}{\cancel{\mathrm{L}}\cdot\cancel{\mathrm{mol}}}"
+
+    # LateX
+    raw = fr"""
+    \begin{{aligned}}
+    m & = c \cdot V \cdot M_W \\
+    & = {c.repru} \cdot {V.repru} \cdot {MW.repru} \\
+    & = {c.repr} \cdot {V.repr} \cdot {MW.repr} \ {c.unit_repr}\cdot{V.unit_repr}\cdot{MW.unit_repr} \\
+    & = {m.repr} \ {unit_calc} \\
+    & = {m.repru}
+    \end{{aligned}}
+    """
+    return raw
+
+
+def _concentration_latex(mass, volume, mol_weight, mass_unit, volume_unit, concentration_unit, mol_weight_unit):
+    # c = m / (V * MW)
+    m = ValueWithUnit(mass * MASS_FACTORS[mass_unit], "g")
+    V = ValueWithUnit(volume * VOLUME_FACTORS[volume_unit], "L")
+    MW = ValueWithUnit(mol_weight * MOLECULAR_WEIGHT_FACTORS[mol_weight_unit], "g/mol")
+    c = m.value / (V.value * MW.value)  # M
+    c = c / CONCENTRATION_FACTORS[concentration_unit]
+    c = ValueWithUnit(c, concentration_unit)
+
+    unit_calc = r"\frac{\cancel{\mathrm{g}}\cdot\mathrm{mol}}{\mathrm{L}\cdot\cancel{\mathrm{g}}}"
+
+    # LateX
+    raw = fr"""
+    \begin{{aligned}}
+    c & = \frac{{m}}{{V \cdot M_W}} \\
+    & = \frac{{{m.repru}}}{{{V.repru} \cdot {MW.repru}}} \\
+    & = \frac{{{m.repr}}}{{{V.repr} \cdot {MW.repr}}} \cdot \frac{{{m.unit_repr}}}{{{V.unit_repr} \cdot {MW.unit_repr}}} \\
+    & = {c.repr} \ {unit_calc} \\
+    & = {c.repru}
+    \end{{aligned}}
+    """
+    return raw
+
+
+def _volume_latex(mass, concentration, mol_weight, mass_unit, volume_unit, concentration_unit, mol_weight_unit):
+    # V = m / (c * MW)
+    m = ValueWithUnit(mass * MASS_FACTORS[mass_unit], "g")
+    c = ValueWithUnit(concentration * CONCENTRATION_FACTORS[concentration_unit], "M")
+    MW = ValueWithUnit(mol_weight * MOLECULAR_WEIGHT_FACTORS[mol_weight_unit], "g/mol")
+    V = m.value / (c.value * MW.value)  # L
+    V = V / VOLUME_FACTORS[volume_unit]
+    V = ValueWithUnit(V, volume_unit)
+
+    unit_calc = r"\frac{\cancel{\mathrm{g}} \cdot \mathrm{L} \cdot \cancel{\mathrm{mol}}}{\cancel{\mathrm{mol}} \cdot \cancel{\mathrm{g}}}"
+
+    # LateX
+    raw = fr"""
+    \begin{{aligned}}
+    V & = \frac{{m}}{{c \cdot M_W}} \\
+    & = \frac{{{m.repru}}}{{{c.repru} \cdot {MW.repru}}} \\
+    & = \frac{{{m.repr}}}{{{c.repr} \cdot {MW.repr}}} \cdot \frac{{{m.unit_repr}}}{{{c.unit_repr} \cdot {MW.unit_repr}}} \\
+    & = {V.repr} \ {unit_calc} \\
+    & = {V.repru}
+    \end{{aligned}}
+    """
+    return raw
+
+
+@lru_cache(maxsize=128)
+def solution_latex(mode, mass, concentration, volume, mol_weight, mass_unit, volume_unit, concentration_unit, mol_weight_unit):
+    """LaTeX derivation of the quantity `mode` ("Masse", "Koncentration" or "Volumen") from the other inputs."""
+    units = (mass_unit, volume_unit, concentration_unit, mol_weight_unit)
+    if mode == "Masse":
+        return _mass_latex(concentration, volume, mol_weight, *units)
+    elif mode == "Koncentration":
+        return _concentration_latex(mass, volume, mol_weight, *units)
+    elif mode == "Volumen":
+        return _volume_latex(mass, concentration, mol_weight, *units)
+
+
 class SolutionHelper:
     def __init__(self, options=None, shown_options=None):
 
@@ -83,11 +167,11 @@ class SolutionHelper:
                 raise ValueError(f"Unknown shown_option: {opt}")
 
         # Input widgets:
-        self.mass_value = StrictFloatText(description="Masse:", value="70.0")
-        self.concentration_value = StrictFloatText(description="Koncentration (M):", value="1.0")
-        self.volume_value = StrictFloatText(description="Volumen:", value="1.0")
+        self.mass_value = StrictFloatText(description="Masse:", value="70.0", update_mode="idle")
+        self.concentration_value = StrictFloatText(description="Koncentration (M):", value="1.0", update_mode="idle")
+        self.volume_value = StrictFloatText(description="Volumen:", value="1.0", update_mode="idle")
         self.mol_weight_value = StrictFloatText(
-            description="Mol.vægt:", value="190000.0", style={"description_width": "initial"}
+            description="Mol.vægt:", value="190000.0", update_mode="idle", style={"description_width": "initial"}
         )
 
         # Buttons to select which is active:
@@ -111,7 +195,10 @@ class SolutionHelper:
         )
 
         # Output widget - Justify center
-        self.output = widgets.Output()
+        self.output = MathView()
+
+        # Bursts of changes (e.g. unit + value) are collapsed into one recompute.
+        self.recompute = CoalescedCall(self._render)
 
         # Observe changes:
         _widgets = [
@@ -128,7 +215,7 @@ class SolutionHelper:
         for w in _widgets:
             w.observe(self._on_change, names="value")
 
-        self._on_change(None)  # Initialize state
+        self._render()  # Initialize state
 
     def display(self):
 
@@ -147,27 +234,32 @@ class SolutionHelper:
             inputs.children = inputs.children + (self.buttons,)
 
 
-        widget = widgets.VBox([inputs, self.output])
+        widget = widgets.VBox([inputs, widgets.HTML(value="<b>Udregning:</b>"), self.output])
         display(widget)
 
     def _on_change(self, change):
+        self.recompute()
+
+    def _render(self):
         # Which is active button?
         mode = self.buttons.value
         self._deactivate(mode)
 
-        with self.output:
-            self.output.clear_output()
-
-            display(widgets.HTML(value="<b>Udregning:</b>"))
-
-            if mode == "Masse":
-                latex = self._calculate_mass()
-            elif mode == "Koncentration":
-                latex = self._calculate_concentration()
-            elif mode == "Volumen":
-                latex = self._calculate_volume()
-
-            display(latex)
+        self.output.show(solution_latex(*self._state()))
+
+    def _state(self):
+        """Everything the calculation depends on, in the argument order of `solution_latex`."""
+        return (
+            self.buttons.value,
+            self.mass_value.value,
+            self.concentration_value.value,
+            self.volume_value.value,
+            self.mol_weight_value.value,
+            self.mass_unit.value,
+            self.volume_unit.value,
+            self.concentration_unit.value,
+            self.mol_weight_unit.value,
+        )
 
     def _deactivate(self, to_calculate):
         # Deactivate the input for the one to calculate:
@@ -176,88 +268,18 @@ class SolutionHelper:
         self.volume_value.disabled = to_calculate == "Volumen"
         self.mol_weight_value.disabled = to_calculate == "Mol.vægt"
 
-    def _calculate_mass(self):
-        # m = c * V * MW
-        c = ValueWithUnit(self.concentration_value.value * CONCENTRATION_FACTORS[self.concentration_unit.value], "M")
-        V = ValueWithUnit(self.volume_value.value * VOLUME_FACTORS[self.volume_unit.value], "L")
-        MW = ValueWithUnit(self.mol_weight_value.value * MOLECULAR_WEIGHT_FACTORS[self.mol_weight_unit.value], "g/mol")
-        m = c.value * V.value * MW.value  # g
-        m = m / MASS_FACTORS[self.mass_unit.value]
-        m = ValueWithUnit(m, self.mass_unit.value)
-        unit_calc = r"\frac{\cancel{\mathrm{mol}}\cdot \cancel{\mathrm{L}}\cdot \mathrm{g}}{\cancel{\mathrm{L}}\cdot\cancel{\mathrm{mol}}}"
-
-        # LateX
-        raw = fr"""
-        \begin{{aligned}}
-        m & = c \cdot V \cdot M_W \\ 
-        & = {c.repru} \cdot {V.repru} \cdot {MW.repru} \\
-        & = {c.repr} \cdot {V.repr} \cdot {MW.repr} \ {c.unit_repr}\cdot{V.unit_repr}\cdot{MW.unit_repr} \\
-        & = {m.repr} \ {unit_calc} \\
-        & = {m.repru}
-        \end{{aligned}}
-        """
-        latex = Math(raw)
-
-        return latex
-    
-    def _calculate_concentration(self):
-        # c = m / (V * MW)
-        m = ValueWithUnit(self.mass_value.value * MASS_FACTORS[self.mass_unit.value], "g")
-        V = ValueWithUnit(self.volume_value.value * VOLUME_FACTORS[self.volume_unit.value], "L")
-        MW = ValueWithUnit(self.mol_weight_value.value * MOLECULAR_WEIGHT_FACTORS[self.mol_weight_unit.value], "g/mol")
-        c = m.value / (V.value * MW.value)  # M
-        c = c / CONCENTRATION_FACTORS[self.concentration_unit.value]
-        c = ValueWithUnit(c, self.concentration_unit.value)
-
-        unit_calc = r"\frac{\cancel{\mathrm{g}}\cdot\mathrm{mol}}{\mathrm{L}\cdot\cancel{\mathrm{g}}}"
-
-        # LateX
-        raw = fr"""
-        \begin{{aligned}}
-        c & = \frac{{m}}{{V \cdot M_W}} \\ 
-        & = \frac{{{m.repru}}}{{{V.repru} \cdot {MW.repru}}} \\
-        & = \frac{{{m.repr}}}{{{V.repr} \cdot {MW.repr}}} \cdot \frac{{{m.unit_repr}}}{{{V.unit_repr} \cdot {MW.unit_repr}}} \\
-        & = {c.repr} \ {unit_calc} \\
-        & = {c.repru}
-        \end{{aligned}}
-        """
-        latex = Math(raw)
-
-        return latex
-    
-    def _calculate_volume(self):
-        # V = m / (c * MW)
-        m = ValueWithUnit(self.mass_value.value * MASS_FACTORS[self.mass_unit.value], "g")
-        c = ValueWithUnit(self.concentration_value.value * CONCENTRATION_FACTORS[self.concentration_unit.value], "M")
-        MW = ValueWithUnit(self.mol_weight_value.value * MOLECULAR_WEIGHT_FACTORS[self.mol_weight_unit.value], "g/mol")
-        V = m.value / (c.value * MW.value)  # L
-        V = V / VOLUME_FACTORS[self.volume_unit.value]
-        V = ValueWithUnit(V, self.volume_unit.value)
-
-        unit_calc = r"\frac{\cancel{\mathrm{g}} \cdot \mathrm{L} \cdot \cancel{\mathrm{mol}}}{\cancel{\mathrm{mol}} \cdot \cancel{\mathrm{g}}}"
-
-        # LateX
-        raw = fr"""
-        \begin{{aligned}}
-        V & = \frac{{m}}{{c \cdot M_W}} \\ 
-        & = \frac{{{m.repru}}}{{{c.repru} \cdot {MW.repru}}} \\
-        & = \frac{{{m.repr}}}{{{c.repr} \cdot {MW.repr}}} \cdot \frac{{{m.unit_repr}}}{{{c.unit_repr} \cdot {MW.unit_repr}}} \\
-        & = {V.repr} \ {unit_calc} \\
-        & = {V.repru}
-        \end{{aligned}}
-        """
-        latex = Math(raw)
-
-        return latex
 
+@tracked
 def solution_helper():
     sh = SolutionHelper()
     sh.display()
 
+@tracked
 def concentration_mass_volume():
     sh = SolutionHelper(options=["Koncentration"], shown_options=["Masse", "Volumen", "Mol.vægt"])
     sh.display()
 
+@tracked
 def mass_concentration_volume():
     sh = SolutionHelper(options=["Masse"], shown_options=["Koncentration", "Volumen", "Mol.vægt"])
     sh.display()
\ No newline at end of file
@@ -0,0 +1,230 @@
+// Minimal canvas renderer for plotly-like figure specs.
+//
+// Shared by the anywidget front ends (concatenated in front of them by the
+// Python side). drawPlot(canvas, spec) understands the subset of plotly the
+// course widgets use:
+//   spec.layout: {width, height, title, xaxis: {title, type, range}, yaxis: {...}}
+//   spec.traces: [{x, y, mode, name, line: {width, color, dash}, marker: {size, color, symbol}, showlegend, visible}]
+//   spec.shapes: [{type: "line", x0, x1, y0, y1, xref, yref, line: {color, dash, width}, visible}]
+//   spec.annotations: [{x, y, xref, yref, text, xanchor, yanchor, font: {size}, visible}]
+
+const COLORS = ["#636efa", "#EF553B", "#00cc96", "#ab63fa", "#FFA15A", "#19d3f3", "#FF6692", "#B6E880"];
+const DASHES = { dash: [6, 4], dot: [2, 3], dashdot: [6, 3, 2, 3], longdash: [10, 4] };
+
+function linspace(a, b, n) {
+  const out = new Float64Array(n);
+  const step = n > 1 ? (b - a) / (n - 1) : 0;
+  for (let i = 0; i < n; i++) out[i] = a + i * step;
+  return out;
+}
+
+function titleText(title) {
+  if (title == null) return "";
+  return typeof title === "string" ? title : title.text || "";
+}
+
+function niceTicks(lo, hi, count = 5) {
+  const span = hi - lo;
+  if (!(span > 0)) return [lo];
+  const raw = span / count;
+  const mag = Math.pow(10, Math.floor(Math.log10(raw)));
+  const step = [1, 2, 5, 10].map((m) => m * mag).find((s) => span / s <= count) || 10 * mag;
+  const ticks = [];
+  for (let t = Math.ceil(lo / step) * step; t <= hi + step * 1e-9; t += step) ticks.push(Number(t.toPrecision(12)));
+  return ticks;
+}
+
+function formatTick(t) {
+  const a = Math.abs(t);
+  return a !== 0 && (a >= 1e4 || a < 1e-2) ? t.toExponential(0) : String(Number(t.toPrecision(4)));
+}
+
+// Data range of one axis in plot units (log10 for log axes).
+function axisRange(axis, traces, key, pad) {
+  const log = axis.type === "log";
+  if (axis.range && axis.range.length === 2) {
+    // As in plotly, ranges of log axes are given in log10 units.
+    return axis.range.map(Number);
+  }
+  let lo = Infinity;
+  let hi = -Infinity;
+  for (const t of traces) {
+    if (t.visible === false || !t[key]) continue;
+    for (const v of t[key]) {
+      if (!Number.isFinite(v) || (log && v <= 0)) continue;
+      const u = log ? Math.log10(v) : v;
+      if (u < lo) lo = u;
+      if (u > hi) hi = u;
+    }
+  }
+  if (!Number.isFinite(lo)) return [0, 1];
+  if (hi === lo) return [lo - 0.5, hi + 0.5];
+  const margin = (hi - lo) * pad;
+  return [lo - margin, hi + margin];
+}
+
+function drawMarker(ctx, px, py, size, symbol) {
+  const r = size / 2;
+  ctx.beginPath();
+  if (symbol === "x") {
+    ctx.moveTo(px - r, py - r);
+    ctx.lineTo(px + r, py + r);
+    ctx.moveTo(px + r, py - r);
+    ctx.lineTo(px - r, py + r);
+    ctx.stroke();
+  } else if (symbol === "square") {
+    ctx.fillRect(px - r, py - r, size, size);
+  } else {
+    ctx.arc(px, py, r, 0, 2 * Math.PI);
+    ctx.fill();
+  }
+}
+
+function drawPlot(canvas, spec) {
+  const layout = spec.layout || {};
+  const traces = spec.traces || [];
+  const width = layout.width || 600;
+  const height = layout.height || 400;
+  const xaxis = layout.xaxis || {};
+  const yaxis = layout.yaxis || {};
+  const logX = xaxis.type === "log";
+  const logY = yaxis.type === "log";
+
+  const dpr = window.devicePixelRatio || 1;
+  canvas.width = width * dpr;
+  canvas.height = height * dpr;
+  canvas.style.width = `${width}px`;
+  canvas.style.height = `${height}px`;
+  const ctx = canvas.getContext("2d");
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+  ctx.clearRect(0, 0, width, height);
+  ctx.font = "12px sans-serif";
+
+  const [u0, u1] = axisRange(xaxis, traces, "x", 0);
+  const [v0, v1] = axisRange(yaxis, traces, "y", 0.05);
+  const m = { left: 65, right: 20, top: 45, bottom: 45 };
+  const pw = width - m.left - m.right;
+  const ph = height - m.top - m.bottom;
+  const tx = (x) => (logX ? Math.log10(x) : x);
+  const ty = (y) => (logY ? Math.log10(y) : y);
+  const sx = (u) => m.left + ((u - u0) / (u1 - u0)) * pw;
+  const sy = (v) => m.top + ph - ((v - v0) / (v1 - v0)) * ph;
+  // Pixel position for data or paper coordinates.
+  const px = (x, ref) => (ref === "paper" ? m.left + x * pw : sx(tx(x)));
+  const py = (y, ref) => (ref === "paper" ? m.top + ph - y * ph : sy(ty(y)));
+
+  // Grid, ticks and axis titles
+  ctx.strokeStyle = "#e5e5e5";
+  ctx.lineWidth = 1;
+  ctx.fillStyle = "#444";
+  ctx.textAlign = "center";
+  for (const t of niceTicks(u0, u1)) {
+    ctx.beginPath();
+    ctx.moveTo(sx(t), m.top);
+    ctx.lineTo(sx(t), m.top + ph);
+    ctx.stroke();
+    ctx.fillText(logX ? formatTick(Math.pow(10, t)) : formatTick(t), sx(t), m.top + ph + 16);
+  }
+  ctx.textAlign = "right";
+  for (const t of niceTicks(v0, v1)) {
+    ctx.beginPath();
+    ctx.moveTo(m.left, sy(t));
+    ctx.lineTo(m.left + pw, sy(t));
+    ctx.stroke();
+    ctx.fillText(logY ? formatTick(Math.pow(10, t)) : formatTick(t), m.left - 6, sy(t) + 4);
+  }
+  ctx.textAlign = "center";
+  ctx.fillText(titleText(xaxis.title), m.left + pw / 2, height - 8);
+  ctx.save();
+  ctx.translate(14, m.top + ph / 2);
+  ctx.rotate(-Math.PI / 2);
+  ctx.fillText(titleText(yaxis.title), 0, 0);
+  ctx.restore();
+  ctx.font = "16px sans-serif";
+  ctx.textAlign = "left";
+  ctx.fillText(titleText(layout.title), m.left, 24);
+  ctx.font = "12px sans-serif";
+
+  ctx.save();
+  ctx.beginPath();
+  ctx.rect(m.left, m.top, pw, ph);
+  ctx.clip();
+
+  // Traces
+  traces.forEach((t, i) => {
+    if (t.visible === false || !t.x || !t.y) return;
+    const color = (t.line && t.line.color) || (t.marker && t.marker.color) || COLORS[i % COLORS.length];
+    const mode = t.mode || "lines";
+    const n = Math.min(t.x.length, t.y.length);
+    ctx.strokeStyle = ctx.fillStyle = color;
+    if (mode.includes("lines")) {
+      ctx.lineWidth = (t.line && t.line.width) || 2;
+      ctx.setLineDash(DASHES[t.line && t.line.dash] || []);
+      ctx.beginPath();
+      let drawing = false;
+      for (let k = 0; k < n; k++) {
+        const u = tx(t.x[k]);
+        const v = ty(t.y[k]);
+        if (!Number.isFinite(u) || !Number.isFinite(v)) {
+          drawing = false;
+          continue;
+        }
+        drawing ? ctx.lineTo(sx(u), sy(v)) : ctx.moveTo(sx(u), sy(v));
+        drawing = true;
+      }
+      ctx.stroke();
+      ctx.setLineDash([]);
+    }
+    if (mode.includes("markers")) {
+      const size = (t.marker && t.marker.size) || 6;
+      ctx.lineWidth = 2;
+      for (let k = 0; k < n; k++) {
+        const u = tx(t.x[k]);
+        const v = ty(t.y[k]);
+        if (Number.isFinite(u) && Number.isFinite(v)) drawMarker(ctx, sx(u), sy(v), size, t.marker && t.marker.symbol);
+      }
+    }
+  });
+
+  // Line shapes (vlines/hlines)
+  for (const s of spec.shapes || []) {
+    if (s.visible === false || (s.type && s.type !== "line")) continue;
+    const line = s.line || {};
+    ctx.strokeStyle = line.color || "#444";
+    ctx.lineWidth = line.width || 2;
+    ctx.setLineDash(DASHES[line.dash] || []);
+    ctx.beginPath();
+    ctx.moveTo(px(s.x0, s.xref), py(s.y0, s.yref));
+    ctx.lineTo(px(s.x1, s.xref), py(s.y1, s.yref));
+    ctx.stroke();
+  }
+  ctx.setLineDash([]);
+  ctx.restore();
+
+  // Annotations
+  for (const a of spec.annotations || []) {
+    if (a.visible === false || !a.text) continue;
+    ctx.font = `${(a.font && a.font.size) || 12}px sans-serif`;
+    ctx.fillStyle = (a.font && a.font.color) || "#444";
+    ctx.textAlign = a.xanchor === "left" ? "left" : a.xanchor === "right" ? "right" : "center";
+    ctx.textBaseline = a.yanchor === "top" ? "top" : a.yanchor === "middle" ? "middle" : "bottom";
+    ctx.fillText(a.text, px(a.x, a.xref), py(a.y, a.yref));
+    ctx.textBaseline = "alphabetic";
+  }
+  ctx.font = "12px sans-serif";
+
+  // Legend
+  const legend = traces.filter((t) => t.visible !== false && t.name && t.showlegend !== false);
+  if (legend.length > 1 || (legend.length === 1 && layout.showlegend)) {
+    ctx.textAlign = "left";
+    traces.forEach((t, i) => {
+      const row = legend.indexOf(t);
+      if (row < 0) return;
+      const ly = m.top + 10 + 16 * row;
+      ctx.fillStyle = (t.line && t.line.color) || (t.marker && t.marker.color) || COLORS[i % COLORS.length];
+      ctx.fillRect(m.left + pw - 130, ly - 4, 16, 3);
+      ctx.fillStyle = "#444";
+      ctx.fillText(t.name, m.left + pw - 108, ly);
+    });
+  }
+}
@@ -0,0 +1,175 @@
+// Closed-form course models evaluated in the browser (needs canvas_plot.js).
+//
+// Slider moves redraw the canvas locally; the kernel only receives the final
+// parameter values when a slider is released (model.save_changes), so the
+// demo stays responsive even while the kernel is busy.
+
+function quadraticFractionBound(K, P, L) {
+  // theta = 2L / (b + sqrt(D)), the cancellation-free root of the binding quadratic.
+  const b = P + L + K;
+  const D = (P - L) * (P - L) + K * (K + 2 * P + 2 * L);
+  const denom = b + Math.sqrt(D);
+  return denom > 0 ? (2 * L) / denom : 0;
+}
+
+const MODELS = {
+  michaelis_menten: {
+    evaluate(x, p) {
+      return [{ y: x.map((s) => (p.Vmax * s) / (p.Km + s)) }];
+    },
+    markers(p) {
+      return { vlines: [{ x: p.Km, label: "Km", color: "red" }], hlines: [{ y: p.Vmax, label: "Vmax", color: "green" }] };
+    },
+  },
+  buffer: {
+    evaluate(x, p) {
+      const pkas = Object.keys(p)
+        .filter((k) => k.startsWith("pKa"))
+        .sort()
+        .map((k) => p[k]);
+      const n = pkas.length;
+      const curves = Array.from({ length: n + 1 }, () => ({ y: new Float64Array(x.length) }));
+      for (let i = 0; i < x.length; i++) {
+        // log10 of h^(n-j) * Ka_1 ... Ka_j for each species j, normalized in log space.
+        const logTerms = [];
+        let logKa = 0;
+        for (let j = 0; j <= n; j++) {
+          if (j > 0) logKa -= pkas[j - 1];
+          logTerms.push(-(n - j) * x[i] + logKa);
+        }
+        const top = Math.max(...logTerms);
+        const weights = logTerms.map((t) => Math.pow(10, t - top));
+        const total = weights.reduce((a, b) => a + b, 0);
+        for (let j = 0; j <= n; j++) curves[j].y[i] = (p.total * weights[j]) / total;
+      }
+      return curves;
+    },
+    markers(p) {
+      return {
+        vlines: Object.keys(p)
+          .filter((k) => k.startsWith("pKa"))
+          .sort()
+          .map((k) => ({ x: p[k], label: k, color: "green" })),
+      };
+    },
+  },
+  binding: {
+    xRange(p) {
+      return [0, 10 * p.K_D];
+    },
+    evaluate(x, p) {
+      return [
+        { y: x.map((L) => L / (p.K_D + L)) },
+        { y: x.map((L) => quadraticFractionBound(p.K_D, p.P_total, L)) },
+      ];
+    },
+  },
+};
+
+function draw(canvas, model, params) {
+  const spec = MODELS[model.get("model")];
+  const logX = model.get("log_x");
+  const [x0, x1] = spec.xRange ? spec.xRange(params) : model.get("x_range");
+  const n = model.get("n_points");
+  const x = logX ? linspace(Math.log10(x0), Math.log10(x1), n).map((v) => Math.pow(10, v)) : linspace(x0, x1, n);
+  const labels = model.get("labels");
+  const traces = spec.evaluate(x, params).map((c, i) => ({ x, y: c.y, mode: "lines", name: labels[i], line: { width: 3 } }));
+
+  // Marker lines as plotly-style shapes with a label at the top/left.
+  const shown = model.get("markers");
+  const markers = spec.markers ? spec.markers(params) : {};
+  const isShown = (label) => shown.includes("*") || shown.includes(label);
+  const shapes = [];
+  const annotations = [];
+  for (const v of (markers.vlines || []).filter((v) => isShown(v.label))) {
+    shapes.push({ type: "line", x0: v.x, x1: v.x, y0: 0, y1: 1, yref: "paper", line: { dash: "dash", color: v.color } });
+    annotations.push({ x: v.x, y: 1, yref: "paper", text: v.label, xanchor: "left", yanchor: "top", font: { color: v.color } });
+  }
+  for (const h of (markers.hlines || []).filter((h) => isShown(h.label))) {
+    shapes.push({ type: "line", x0: 0, x1: 1, xref: "paper", y0: h.y, y1: h.y, line: { dash: "dash", color: h.color } });
+    annotations.push({ x: 0, xref: "paper", y: h.y, text: h.label, xanchor: "left", font: { color: h.color } });
+  }
+
+  const yRange = model.get("y_range");
+  drawPlot(canvas, {
+    layout: {
+      width: model.get("width"),
+      height: model.get("height"),
+      title: model.get("title"),
+      xaxis: { title: model.get("xlabel"), type: logX ? "log" : "linear", range: logX ? [Math.log10(x0), Math.log10(x1)] : [x0, x1] },
+      yaxis: { title: model.get("ylabel"), range: yRange && yRange.length === 2 ? yRange : null },
+    },
+    traces,
+    shapes,
+    annotations,
+  });
+}
+
+function render({ model, el }) {
+  const root = document.createElement("div");
+  root.style.display = "flex";
+  root.style.gap = "12px";
+  root.style.alignItems = "flex-start";
+
+  const controls = document.createElement("div");
+  const canvas = document.createElement("canvas");
+  root.append(controls, canvas);
+  el.appendChild(root);
+
+  // Parameters live in the browser; the kernel copy is updated on release.
+  let params = { ...model.get("params") };
+  const inputs = {};
+
+  for (const s of model.get("sliders")) {
+    const row = document.createElement("label");
+    row.style.display = "flex";
+    row.style.alignItems = "center";
+    row.style.gap = "6px";
+    row.style.margin = "4px 0";
+
+    const name = document.createElement("span");
+    name.textContent = s.label || s.name;
+    name.style.minWidth = "110px";
+    const input = document.createElement("input");
+    Object.assign(input, { type: "range", min: s.min, max: s.max, step: s.step, value: params[s.name] });
+    const readout = document.createElement("span");
+    readout.style.minWidth = "50px";
+    readout.textContent = params[s.name];
+
+    input.addEventListener("input", () => {
+      params[s.name] = Number(input.value);
+      readout.textContent = input.value;
+      draw(canvas, model, params);
+    });
+    input.addEventListener("change", () => {
+      model.set("params", { ...params });
+      model.save_changes();
+    });
+
+    inputs[s.name] = { input, readout };
+    row.append(name, input, readout);
+    controls.appendChild(row);
+  }
+
+  const redrawFromModel = () => {
+    params = { ...model.get("params") };
+    for (const [key, { input, readout }] of Object.entries(inputs)) {
+      input.value = params[key];
+      readout.textContent = params[key];
+    }
+    draw(canvas, model, params);
+  };
+  const redraw = () => draw(canvas, model, params);
+  const handlers = [
+    ["change:params", redrawFromModel],
+    ...["x_range", "y_range", "log_x", "markers", "labels", "n_points"].map((trait) => [`change:${trait}`, redraw]),
+  ];
+  for (const [event, handler] of handlers) model.on(event, handler);
+
+  draw(canvas, model, params);
+  return () => {
+    for (const [event, handler] of handlers) model.off(event, handler);
+  };
+}
+
+export default { render };
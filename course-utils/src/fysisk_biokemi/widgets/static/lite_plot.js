@@ -0,0 +1,65 @@
+// Front end of LitePlot (needs canvas_plot.js).
+//
+// Trace arrays arrive as binary buffers ({dtype, shape, buffer: DataView})
+// and are wrapped in typed arrays without going through JSON.
+
+const TYPED_ARRAYS = {
+  float64: Float64Array,
+  float32: Float32Array,
+  int32: Int32Array,
+  int16: Int16Array,
+  int8: Int8Array,
+  uint32: Uint32Array,
+  uint16: Uint16Array,
+  uint8: Uint8Array,
+};
+
+function decode(value) {
+  if (value && value.buffer instanceof DataView && value.dtype in TYPED_ARRAYS) {
+    const view = value.buffer;
+    // Copy so the typed array is correctly aligned whatever the buffer offset.
+    const bytes = view.buffer.slice(view.byteOffset, view.byteOffset + view.byteLength);
+    return new TYPED_ARRAYS[value.dtype](bytes);
+  }
+  return value;
+}
+
+function decodeTraces(traces) {
+  return traces.map((trace) => Object.fromEntries(Object.entries(trace).map(([key, value]) => [key, decode(value)])));
+}
+
+function render({ model, el }) {
+  const canvas = document.createElement("canvas");
+  el.appendChild(canvas);
+
+  let traces = decodeTraces(model.get("traces"));
+  let frame = null;
+  const redraw = () => {
+    if (frame !== null) return;
+    frame = requestAnimationFrame(() => {
+      frame = null;
+      drawPlot(canvas, {
+        layout: model.get("figure_layout"),
+        traces,
+        shapes: model.get("shapes"),
+        annotations: model.get("annotations"),
+      });
+    });
+  };
+  const onTraces = () => {
+    traces = decodeTraces(model.get("traces"));
+    redraw();
+  };
+
+  model.on("change:traces", onTraces);
+  for (const trait of ["shapes", "annotations", "figure_layout"]) model.on(`change:${trait}`, redraw);
+  redraw();
+
+  return () => {
+    model.off("change:traces", onTraces);
+    for (const trait of ["shapes", "annotations", "figure_layout"]) model.off(`change:${trait}`, redraw);
+    if (frame !== null) cancelAnimationFrame(frame);
+  };
+}
+
+export default { render };
@@ -2,14 +2,40 @@ from fysisk_biokemi.widgets.utils.misc import (
     number_to_scientific_latex,
     chemical_formula_to_latex,
     molar_prefix_to_factor,
+    close_widget_tree,
+    iter_widget_tree,
+    uploaded_files,
 )
 from .atomic_weigets import ATOMIC_WEIGHTS
 
 from .equilibrium_reaction import Reaction, ReactionTerm
+from .mass_action import MassActionSystem
 
 from .colab import colab_context, enable_custom_widget_colab, disable_custom_widget_colab
 
 from .strict_float_text import StrictFloatText
 
+from .latex import MathView, math_html
+
+from .lifecycle import tracked, registry, memory_report, WidgetRegistry
+
+from .instrumentation import instrumentation, Instrumentation
+
+from .headless import HeadlessSession
+
+from .scheduling import CoalescedCall, DelayedCall, FrameScheduler
+
+from .jobs import JobRunner, JobCancelled
+
+from .result_cache import LRUResultCache
+
+from .sampling import adaptive_sample
+
+from .downsample import downsample, lttb, minmax
+
+from .figure import as_typed_array, set_trace_data, FigureState, new_figure, set_plot_backend, as_widget
+
+from .lite_plot import LitePlot
+
 
 
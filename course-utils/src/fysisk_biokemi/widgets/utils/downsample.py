@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling to `n_out` points.
+
+    Keeps the first and last point and, from each of the n_out - 2 buckets in
+    between, the point that forms the largest triangle with the previously
+    kept point and the mean of the next bucket. Preserves the visual shape
+    of a line plot far better than taking every k-th point.
+
+    Returns the indices of the kept points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Mean of each bucket, with the last point as the bucket after the last one.
+    starts = np.append(edges[:-1], n - 1)
+    counts = np.diff(np.append(starts, n))
+    mean_x = np.add.reduceat(x, starts) / counts
+    mean_y = np.add.reduceat(y, starts) / counts
+
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - mean_x[i + 1]) * (ys - y[a]) - (x[a] - xs) * (mean_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax(x, y, n_out):
+    """Min/max decimation: keep the lowest and highest point of n_out / 2 buckets.
+
+    Cheaper than LTTB and never hides spikes, at the cost of a less smooth
+    look for noisy data. Returns the sorted indices of the kept points.
+    """
+    n = len(x)
+    n_buckets = (n_out - 2) // 2  # leaves room for the two end points
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    # Equal-width buckets as rows of a padded 2D array.
+    width = -(-n // n_buckets)
+    n_buckets = -(-n // width)
+    pad = n_buckets * width - n
+    low = np.concatenate([y, np.full(pad, np.inf)]).reshape(n_buckets, width)
+    high = np.concatenate([y, np.full(pad, -np.inf)]).reshape(n_buckets, width)
+    offsets = np.arange(n_buckets) * width
+    kept = np.concatenate([[0, n - 1], offsets + low.argmin(axis=1), offsets + high.argmax(axis=1)])
+    return np.unique(kept)
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+
+def downsample(x, y, max_points=2000, method="lttb"):
+    """Reduce (x, y) to at most `max_points` points for plotting.
+
+    Non-finite points are dropped before downsampling. Data that already
+    fits is returned unchanged.
+
+    Example:
+        t_plot, keq_plot = downsample(t, keq, max_points=2000)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if max_points is None or len(x) <= max_points:
+        return x, y
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    kept = METHODS[method](x, y, max_points)
+    return x[kept], y[kept]
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 100, 500_000)
+    signal = np.exp(-t / 30) + 0.02 * rng.standard_normal(t.size)
+    signal[250_000] = 2.0  # a spike that must survive
+
+    for method in METHODS:
+        start = time.perf_counter()
+        x, y = downsample(t, signal, max_points=2000, method=method)
+        elapsed = time.perf_counter() - start
+        print(f"{method:<7} {len(x)} points in {elapsed * 1e3:.1f} ms, spike kept: {y.max() == 2.0}")
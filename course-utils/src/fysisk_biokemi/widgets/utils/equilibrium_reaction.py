@@ -43,8 +43,10 @@ class Reaction:
         # Split into reactants and products
         if "=" in self.reaction_string:
             reactants_str, products_str = self.reaction_string.split("=")
+            self.reversible = True
         elif "->" in self.reaction_string:
             reactants_str, products_str = self.reaction_string.split("->")
+            self.reversible = False
         else:
             return
 
@@ -158,3 +160,102 @@ class Reaction:
         reactant_dict = {term.formula: term.coefficient for term in self.reactants}
         product_dict = {term.formula: term.coefficient for term in self.products}
         return reactant_dict, product_dict
+
+    def get_stoichiometry(self):
+        """Return (species, nu) with nu > 0 for products and nu < 0 for reactants."""
+        species = list(dict.fromkeys(self.get_terms()))
+        nu = np.zeros(len(species))
+        for term in self.reactants:
+            nu[species.index(term.formula)] -= term.coefficient
+        for term in self.products:
+            nu[species.index(term.formula)] += term.coefficient
+        return species, nu
+
+    def solve_equilibrium(self, K_eq, initial, tol=1e-12, max_iter=200):
+        """Find the equilibrium composition from K_eq and initial concentrations.
+
+        Solves sum_i nu_i ln(c_i) = ln K_eq for the reaction extent with
+        Newton's method, falling back to bisection whenever a step would
+        leave the bracket where all concentrations are non-negative. The
+        extent is measured from the nearest physical bound, so species that
+        are almost used up keep full relative precision. Everything is
+        vectorized: K_eq and the initial concentrations may be arrays that
+        broadcast against each other.
+
+        Parameters:
+            K_eq: equilibrium constant (in M-based units), scalar or array.
+            initial: dict {formula: concentration(s) in M}; missing species start at 0.
+
+        Returns:
+            dict {formula: equilibrium concentration(s) in M}.
+        """
+        species, nu = self.get_stoichiometry()
+        unknown = [s for s in initial if s not in species]
+        if unknown:
+            raise ValueError(f"Unknown species: {', '.join(unknown)}")
+
+        arrays = np.broadcast_arrays(
+            np.asarray(K_eq, dtype=float), *[np.asarray(initial.get(s, 0.0), dtype=float) for s in species]
+        )
+        log_K = np.log(arrays[0])
+        c0_all = np.stack(arrays[1:], axis=-1)
+
+        # Species with zero net coefficient (on both sides) do not change and
+        # would give 0 / 0 bounds and 0 * log(0) = nan below.
+        changing = np.flatnonzero(nu)
+        if not len(changing):
+            return {s: c0_all[..., i] for i, s in enumerate(species)}
+        nu = nu[changing]
+        c0 = c0_all[..., changing]
+
+        # Physical bounds on the extent: no concentration may become negative.
+        with np.errstate(divide="ignore"):
+            limits = -c0 / nu
+        lo = np.max(np.where(nu > 0, limits, -np.inf), axis=-1)
+        hi = np.min(np.where(nu < 0, limits, np.inf), axis=-1)
+
+        # Compositions at each bound, with the limiting species exactly zero.
+        c_lo = np.where((nu > 0) & (limits == lo[..., None]), 0.0, c0 + nu * lo[..., None])
+        c_hi = np.where((nu < 0) & (limits == hi[..., None]), 0.0, c0 + nu * hi[..., None])
+
+        def residual(base, sign, d):
+            c = np.clip(base + sign[..., None] * nu * d[..., None], 0.0, None)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                f = np.sum(nu * np.log(c), axis=-1) - log_K
+                df = sign * np.sum(nu**2 / c, axis=-1)
+            return f, df
+
+        # Anchor each problem at the bound on the same side of the midpoint as the root.
+        width = 0.5 * (hi - lo)
+        f_mid, _ = residual(c_lo, np.ones_like(lo), width)
+        from_hi = f_mid < 0
+        sign = np.where(from_hi, -1.0, 1.0)
+        base = np.where(from_hi[..., None], c_hi, c_lo)
+
+        # f is monotonic in the extent, so it is negative near the lower bound.
+        d_lo = np.zeros_like(width)
+        d_hi = width.copy()
+        d = 0.5 * width
+        active = width > 0
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            f, df = residual(base, sign, d)
+            towards_root = (f * sign) < 0
+            d_lo = np.where(active & towards_root, d, d_lo)
+            d_hi = np.where(active & ~towards_root, d, d_hi)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                newton = d - f / df
+            inside = np.isfinite(newton) & (newton >= d_lo) & (newton <= d_hi)
+            d_new = np.where(inside, newton, 0.5 * (d_lo + d_hi))
+
+            converged = (f == 0) | (np.abs(d_new - d) <= tol * np.abs(d_new))
+            d = np.where(active, d_new, d)
+            active = active & ~converged
+
+        c = np.clip(base + sign[..., None] * nu * d[..., None], 0.0, None)
+        c = np.where((width > 0)[..., None], c, c_lo)
+        c_all = c0_all.copy()
+        c_all[..., changing] = c
+        return {s: c_all[..., i] for i, s in enumerate(species)}
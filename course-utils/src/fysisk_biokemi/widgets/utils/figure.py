@@ -0,0 +1,212 @@
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+from fysisk_biokemi.widgets.utils.downsample import downsample
+
+
+# "plotly" (FigureWidget) or "lite" (LitePlot); can be set per widget with backend=...
+PLOT_BACKEND = os.environ.get("FYSISK_BIOKEMI_PLOT_BACKEND", "plotly")
+
+
+def set_plot_backend(backend):
+    """Choose the default figure backend for the plotting widgets."""
+    global PLOT_BACKEND
+    if backend not in ("plotly", "lite"):
+        raise ValueError(f"Unknown plot backend: {backend}")
+    PLOT_BACKEND = backend
+
+
+def new_figure(width=600, height=400, backend=None):
+    """Create an empty figure of the given (or default) backend."""
+    backend = backend or PLOT_BACKEND
+    if backend == "lite":
+        from fysisk_biokemi.widgets.utils.lite_plot import LitePlot
+
+        return LitePlot(width=width, height=height)
+    if backend == "plotly":
+        import plotly.graph_objects as go
+
+        return go.FigureWidget(layout=go.Layout(width=width, height=height))
+    raise ValueError(f"Unknown plot backend: {backend}")
+
+
+def as_widget(fig):
+    """Return the ipywidget to embed `fig` in containers such as HBox."""
+    return getattr(fig, "widget", None) or fig
+
+
+def as_typed_array(values, dtype=np.float64):
+    """Return `values` as a contiguous 1D array of `dtype`.
+
+    Plotly's widget serializer sends such arrays to the browser as binary
+    typed arrays; Python lists and int64 arrays are JSON-encoded element by
+    element instead.
+    """
+    return np.ascontiguousarray(np.ravel(values), dtype=dtype)
+
+
+def set_trace_data(fig, index=0, dtype=np.float64, **data):
+    """Assign data arrays (x=..., y=..., z=...) to `fig.data[index]` in one message.
+
+    Shorthand for a one-off `FigureState(fig).trace(...)` followed by `commit()`.
+
+    Example:
+        set_trace_data(self.fig, 0, x=s, y=v)
+    """
+    state = FigureState(fig, dtype=dtype)
+    state.trace(index, **data)
+    state.commit()
+
+
+def _equal(current, value):
+    if isinstance(value, np.ndarray):
+        return (
+            isinstance(current, np.ndarray)
+            and current.shape == value.shape
+            and np.array_equal(current, value, equal_nan=value.dtype.kind == "f")
+        )
+    if isinstance(value, (list, tuple)):
+        return isinstance(current, (list, tuple)) and list(current) == list(value)
+    return current == value
+
+
+class FigureState:
+    """Batch and diff updates to a plotly FigureWidget.
+
+    Properties are staged with `trace`, `shape`, `annotation` and `layout`
+    and compared with the figure's current state (which also reflects zoom
+    and pan done in the browser) on `commit`. Only the properties that changed
+    are assigned, all inside one `batch_update`, so the frontend receives a
+    single message and relayouts once per event.
+
+    With `max_points`, traces staged with both x and y are downsampled
+    (`method` "lttb" or "minmax") before they are sent.
+
+    Example:
+        self.figure_state = FigureState(self.fig)
+        with self.figure_state.update() as state:
+            state.trace(0, x=s, y=v, mode="lines")
+            state.shape(0, x0=km, x1=km)
+            state.layout(xaxis_range=[0, 10])
+    """
+
+    DATA_PROPS = ("x", "y", "z")
+
+    def __init__(self, fig, dtype=np.float64, max_points=None, method="lttb"):
+        self.fig = fig
+        self.dtype = dtype
+        self.max_points = max_points
+        self.method = method
+        self.messages = 0
+        self.sent = 0
+        self.skipped = 0
+        self._pending = {}
+
+    def trace(self, index, **props):
+        if self.max_points is not None and "x" in props and "y" in props:
+            props["x"], props["y"] = downsample(props["x"], props["y"], self.max_points, self.method)
+        for prop, value in props.items():
+            if prop in self.DATA_PROPS:
+                value = as_typed_array(value, self.dtype)
+            self._pending[("trace", index, prop)] = value
+
+    def shape(self, index, **props):
+        for prop, value in props.items():
+            self._pending[("shape", index, prop)] = value
+
+    def annotation(self, index, **props):
+        for prop, value in props.items():
+            self._pending[("annotation", index, prop)] = value
+
+    def layout(self, **props):
+        """Stage layout properties, using plotly's underscore paths (e.g. yaxis_range)."""
+        for prop, value in props.items():
+            self._pending[("layout", None, prop)] = value
+
+    def _target(self, kind, index):
+        if kind == "trace":
+            return self.fig.data[index]
+        if kind == "shape":
+            return self.fig.layout.shapes[index]
+        if kind == "annotation":
+            return self.fig.layout.annotations[index]
+        return self.fig.layout
+
+    def changes(self):
+        """Return the staged properties that differ from the figure."""
+        changed = {}
+        for (kind, index, prop), value in self._pending.items():
+            if not _equal(self._target(kind, index)[prop], value):
+                changed[(kind, index, prop)] = value
+        return changed
+
+    def commit(self):
+        """Send all changed properties in one message and clear the staged state."""
+        changed = self.changes()
+        self.skipped += len(self._pending) - len(changed)
+        self._pending = {}
+        if not changed:
+            return
+
+        with self.fig.batch_update():
+            for (kind, index, prop), value in changed.items():
+                self._target(kind, index)[prop] = value
+        self.messages += 1
+        self.sent += len(changed)
+
+    @contextmanager
+    def update(self):
+        """Stage properties inside the block and commit them when it exits."""
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    @property
+    def stats(self) -> dict:
+        return {"messages": self.messages, "sent": self.sent, "skipped": self.skipped}
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    import ipywidgets
+    import plotly.graph_objects as go
+
+    def measure(fig, update, n=200):
+        """Time per update and bytes per update actually sent over the widget's comm."""
+        sent = []
+        send = ipywidgets.Widget._send
+
+        def counting_send(widget, msg, buffers=None):
+            if widget is fig:
+                sent.append(len(json.dumps(msg, default=str)) + sum(memoryview(b).nbytes for b in buffers or ()))
+            return send(widget, msg, buffers)
+
+        ipywidgets.Widget._send = counting_send
+        try:
+            x = np.linspace(0, 10, 500)
+            start = time.perf_counter()
+            for i in range(n):
+                update(x, x / (1 + i + x))
+            elapsed = (time.perf_counter() - start) / n
+        finally:
+            ipywidgets.Widget._send = send
+        return elapsed, sum(sent) / n
+
+    def with_lists(x, y):
+        with fig.batch_update():
+            fig.data[0].x = x.tolist()
+            fig.data[0].y = y.tolist()
+
+    for label, update in [
+        ("tolist()", with_lists),
+        ("set_trace_data float64", lambda x, y: set_trace_data(fig, 0, x=x, y=y)),
+        ("set_trace_data float32", lambda x, y: set_trace_data(fig, 0, dtype=np.float32, x=x, y=y)),
+    ]:
+        fig = go.FigureWidget(data=[go.Scatter(x=[0.0], y=[0.0])])
+        elapsed, payload = measure(fig, update)
+        print(f"{label:<24} {elapsed * 1e3:6.2f} ms/update {payload / 1024:7.1f} KiB")
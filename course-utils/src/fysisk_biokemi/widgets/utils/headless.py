@@ -0,0 +1,337 @@
+import asyncio
+import contextlib
+import io
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+import ipywidgets
+
+from fysisk_biokemi.widgets.utils.jobs import pending_jobs
+from fysisk_biokemi.widgets.utils.lifecycle import registry
+
+
+def _update(state, buffer_paths=(), buffers=()):
+    return {"content": {"data": {"method": "update", "state": state, "buffer_paths": list(buffer_paths)}}, "buffers": list(buffers)}
+
+
+def _custom(content):
+    return {"content": {"data": {"method": "custom", "content": content}}, "buffers": []}
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop that keeps track of its scheduled callbacks and skips idle waits.
+
+    `advance(seconds)` runs everything that becomes due within `seconds` of
+    loop time without sleeping: the clock jumps to the next timer instead.
+    Debounce/throttle delays and frame budgets therefore behave as in a
+    kernel, while only the actual work costs wall time.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.offset = 0.0
+        self.pending = set()
+        self.errors = []
+        self._lock = threading.Lock()  # jobs schedule their results from worker threads
+        self.set_exception_handler(lambda loop, context: self.errors.append(context))
+
+    def time(self):
+        return super().time() + self.offset
+
+    def _track(self, schedule, callback, args, context):
+        state = {"handle": None, "ran": False}
+
+        def run(*args):
+            with self._lock:
+                state["ran"] = True
+                self.pending.discard(state["handle"])
+            callback(*args)
+
+        handle = schedule(run, *args, context=context)
+        with self._lock:
+            state["handle"] = handle
+            if not state["ran"]:
+                self.pending.add(handle)
+        return handle
+
+    def _pending(self):
+        with self._lock:
+            self.pending = {h for h in self.pending if not h.cancelled()}
+            return list(self.pending)
+
+    def call_soon(self, callback, *args, context=None):
+        return self._track(super().call_soon, callback, args, context)
+
+    def call_soon_threadsafe(self, callback, *args, context=None):
+        return self._track(super().call_soon_threadsafe, callback, args, context)
+
+    def call_at(self, when, callback, *args, context=None):
+        return self._track(lambda *a, **k: super(VirtualTimeLoop, self).call_at(when, *a, **k), callback, args, context)
+
+    def _next_timer(self):
+        return min((h.when() for h in self._pending() if isinstance(h, asyncio.TimerHandle)), default=None)
+
+    def _run_ready(self):
+        for _ in range(10_000):
+            now = self.time()
+            if not any(not isinstance(h, asyncio.TimerHandle) or h.when() <= now for h in self._pending()):
+                return
+            self.run_until_complete(asyncio.sleep(0))
+        raise RuntimeError("Callbacks keep rescheduling themselves.")
+
+    def run(self, func):
+        """Call `func()` inside the running loop, as the kernel calls comm message handlers."""
+
+        async def call():
+            func()
+
+        self.run_until_complete(call())
+
+    def advance(self, seconds):
+        """Run the callbacks and timers that become due within `seconds` of loop time."""
+        deadline = self.time() + seconds
+        while True:
+            self._run_ready()
+            due = self._next_timer()
+            if due is None or due > deadline:
+                self.offset += max(0.0, deadline - self.time())
+                return
+            self.offset += max(0.0, due - self.time())
+
+    def drain(self, limit=600.0):
+        """Run until no callbacks, timers or background jobs are left (at most `limit` s of loop time)."""
+        deadline = self.time() + limit
+        while True:
+            self._run_ready()
+            jobs = pending_jobs()
+            if jobs:
+                running = [job.future for job in jobs if not job.future.done()]
+                if running:
+                    wait(running, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(1e-4)  # the result is on its way to the loop
+                continue
+            due = self._next_timer()
+            if due is None or due > deadline:
+                return
+            self.offset += max(0.0, due - self.time())
+
+
+class HeadlessEntry:
+    """The widgets created by one entry point, with lookup by type and description."""
+
+    def __init__(self, name, entry):
+        self.name = name
+        self.entry = entry
+
+    @property
+    def widgets(self):
+        return self.entry.live_widgets()
+
+    def find_all(self, cls=ipywidgets.Widget, description=None):
+        found = [w for w in self.widgets if isinstance(w, cls)]
+        if description is not None:
+            found = [w for w in found if getattr(w, "description", None) == description]
+        return found
+
+    def find(self, cls=ipywidgets.Widget, description=None):
+        found = self.find_all(cls, description)
+        if not found:
+            raise LookupError(f"{self.name}: no {cls.__name__} with description {description!r}")
+        return found[0]
+
+
+class HeadlessSession:
+    """Run widget entry points without a browser and drive them like the front end does.
+
+    Inputs are changed through the same comm messages a browser sends
+    (`update` for values, `custom` for clicks and submits), so the kernel
+    does exactly the work it would in a notebook. Messages are handled on an
+    event loop (`VirtualTimeLoop`) like the kernel's, so coalesced,
+    debounced and frame-scheduled updates and background jobs take the same
+    path as in a notebook. Events of a drag or of typing are spaced like a
+    user's (`drag_interval`, `key_interval`); the last event of an action
+    runs until everything it scheduled is done.
+
+    For every event the session records the kernel-side latency (the work
+    done until the next event, or until everything settled) and the widget
+    messages, display outputs and bytes sent back. Displayed output is
+    swallowed.
+
+    Example:
+        with HeadlessSession() as session:
+            mm = session.open("michaelis_menten_demo", michaelis_menten_demo)
+            session.drag(mm.find(widgets.FloatSlider, "Km:"), steps=50)
+        session.summary()
+    """
+
+    def __init__(self, drag_interval=1 / 60, key_interval=0.15):
+        self.drag_interval = drag_interval
+        self.key_interval = key_interval
+        self.loop = None
+        self.events = []  # (entry, action, ms, messages, bytes)
+        self._counter = [0, 0]
+        self._restore = []
+        self._entries = []
+        self._owners = {}  # id(widget) -> entry name
+        self._stdout = None
+
+    # ---------- Setup ----------
+    def __enter__(self):
+        from IPython.core.interactiveshell import InteractiveShell
+        from ipywidgets.widgets import widget_output
+
+        counter = self._counter
+        shell = InteractiveShell.instance()
+
+        def count(size):
+            counter[0] += 1
+            counter[1] += size
+
+        send = ipywidgets.Widget._send
+        publish = shell.display_pub.publish
+        clear_output = widget_output.clear_output
+
+        def patched_send(widget, msg, buffers=None):
+            count(len(json.dumps(msg, default=str)) + sum(memoryview(b).nbytes for b in buffers or ()))
+            return send(widget, msg, buffers)
+
+        def patched_publish(data, metadata=None, **kwargs):
+            count(len(json.dumps(data, default=str)))
+
+        ipywidgets.Widget._send = patched_send
+        shell.display_pub.publish = patched_publish
+        widget_output.clear_output = lambda *args, **kwargs: count(0)
+        self._restore = [
+            (ipywidgets.Widget, "_send", send),
+            (shell.display_pub, "publish", publish),
+            (widget_output, "clear_output", clear_output),
+        ]
+        # Entry points outside a kernel fall back to printing; keep that quiet.
+        self._stdout = contextlib.redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+        self.loop = VirtualTimeLoop()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            for entry in self._entries:
+                self.loop.run(lambda: registry.close(entry.entry))
+            self.loop.drain()
+        finally:
+            self._entries = []
+            self.loop.close()
+            self._stdout.__exit__(*exc)
+            for obj, name, original in self._restore:
+                setattr(obj, name, original)
+
+    def open(self, name, entry, *args, **kwargs):
+        """Call an entry point (function or class) and return its widgets."""
+        tracked = []
+
+        def call():
+            with registry.track(name) as record:
+                tracked.append(record)
+                entry(*args, **kwargs)
+
+        self.measure(name, "open", call)
+        opened = HeadlessEntry(name, tracked[0])
+        self._entries.append(opened)
+        return opened
+
+    # ---------- Measuring ----------
+    def measure(self, entry, action, func, interval=None):
+        """Handle one event `func()` on the loop and record its cost.
+
+        The work counted is everything that runs until the next event,
+        `interval` seconds later, or with interval=None until everything the
+        event scheduled (including background jobs) is done.
+        """
+        before = list(self._counter)
+        start = time.perf_counter()
+        self.loop.run(func)
+        if interval is None:
+            self.loop.drain()
+        else:
+            self.loop.advance(interval)
+        ms = (time.perf_counter() - start) * 1e3
+        self.events.append((entry, action, ms, self._counter[0] - before[0], self._counter[1] - before[1]))
+        if self.loop.errors:
+            context = self.loop.errors.pop(0)
+            self.loop.errors.clear()
+            raise context.get("exception") or RuntimeError(context["message"])
+
+    def _entry_of(self, widget):
+        name = self._owners.get(id(widget))
+        if name is None:
+            for entry in self._entries:
+                if any(w is widget for w in entry.widgets):
+                    name = self._owners[id(widget)] = entry.name
+        return name
+
+    # ---------- Front-end actions ----------
+    def set(self, widget, value, action=None, interval=None):
+        """Set a value as if the user changed it in the browser."""
+        if isinstance(widget, ipywidgets.widgets.widget_selection._Selection):
+            state = {"index": None if value is None else list(widget._options_values).index(value)}
+        else:
+            to_json = widget.trait_metadata("value", "to_json", widget._trait_to_json)
+            state = {"value": to_json(value, widget)}
+        action = action or f"set {widget.description or type(widget).__name__}"
+        self.measure(self._entry_of(widget), action, lambda: widget._handle_msg(_update(state)), interval)
+
+    def drag(self, slider, steps=30, action=None):
+        """Move a slider from its minimum to its maximum in `steps` events."""
+        action = action or f"drag {slider.description}"
+        if isinstance(slider, ipywidgets.FloatLogSlider):
+            values = np.logspace(slider.min, slider.max, steps, base=slider.base)
+        else:
+            values = np.linspace(slider.min, slider.max, steps)
+        if isinstance(slider.value, (tuple, list)):
+            # Range sliders: move the upper handle.
+            values = [(slider.value[0], max(v, slider.value[0])) for v in values]
+        for i, value in enumerate(values):
+            if isinstance(slider, ipywidgets.IntSlider):
+                value = int(round(value))
+            self.set(slider, value, action, interval=self.drag_interval if i < len(values) - 1 else None)
+
+    def type(self, widget, text, action=None, submit=True):
+        """Type `text` one character at a time into a Text-like widget, then press Enter."""
+        target = getattr(widget, "text_input", widget)  # StrictFloatText wraps a Text
+        action = action or f"type {target.description}"
+        submit = submit and isinstance(target, ipywidgets.Text)
+        for i in range(1, len(text) + 1):
+            interval = self.key_interval if i < len(text) or submit else None
+            self.measure(self._entry_of(widget), action, lambda: target._handle_msg(_update({"value": text[:i]})), interval)
+        if submit:
+            self.measure(self._entry_of(widget), action, lambda: target._handle_msg(_custom({"event": "submit"})))
+
+    def click(self, button, action=None):
+        action = action or f"click {button.description}"
+        self.measure(self._entry_of(button), action, lambda: button._handle_msg(_custom({"event": "click"})))
+
+    def upload(self, uploader, name, content, action=None):
+        """Upload a file (bytes) through a FileUpload widget."""
+        file = {"name": name, "type": "", "size": len(content), "last_modified": 0, "content": None}
+        msg = _update({"value": [file]}, [["value", 0, "content"]], [memoryview(content)])
+        self.measure(self._entry_of(uploader), action or f"upload {name}", lambda: uploader._handle_msg(msg))
+
+    # ---------- Results ----------
+    def summary(self):
+        """One row per (entry, action) with latency quantiles and traffic per event."""
+        import pandas as pd
+
+        events = pd.DataFrame(self.events, columns=["entry", "action", "ms", "messages", "bytes"])
+        grouped = events.groupby(["entry", "action"], sort=False)
+        return grouped.agg(
+            events=("ms", "size"),
+            mean_ms=("ms", "mean"),
+            p50_ms=("ms", "median"),
+            p95_ms=("ms", lambda ms: ms.quantile(0.95)),
+            max_ms=("ms", "max"),
+            messages_per_event=("messages", "mean"),
+            bytes_per_event=("bytes", "mean"),
+        ).reset_index()
@@ -0,0 +1,250 @@
+import atexit
+import bisect
+import inspect
+import json
+import os
+import socket
+import time
+
+from fysisk_biokemi.widgets.utils.result_cache import _nbytes
+
+
+ENV_VAR = "FYSISK_BIOKEMI_INSTRUMENT"
+# Upper bin edges of the latency histograms in ms; the last bin is open-ended.
+EDGES_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+COLUMNS = ["callback", "calls", "total_ms", "mean_ms", "p50_ms", "p95_ms", "max_ms", "messages", "bytes_sent", "bytes_in"]
+
+
+class CallbackStats:
+    """Latency histogram and traffic totals for one callback."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(EDGES_MS) + 1)
+        self.messages = 0  # widget messages sent to the front end while it ran
+        self.bytes_sent = 0
+        self.bytes_in = 0  # size of the new trait values it received
+
+    def add(self, ms, messages, bytes_sent, bytes_in):
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.histogram[bisect.bisect_left(EDGES_MS, ms)] += 1
+        self.messages += messages
+        self.bytes_sent += bytes_sent
+        self.bytes_in += bytes_in
+
+    def quantile(self, q):
+        """Upper edge of the histogram bin containing the q-quantile (in ms)."""
+        target = q * self.calls
+        cumulative = 0
+        for edge, count in zip(EDGES_MS + (self.max_ms,), self.histogram):
+            cumulative += count
+            if cumulative >= target and count:
+                return min(edge, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ms,
+            "max_ms": self.max_ms,
+            "histogram": list(self.histogram),
+            "messages": self.messages,
+            "bytes_sent": self.bytes_sent,
+            "bytes_in": self.bytes_in,
+        }
+
+
+class _Timed:
+    """Callable wrapper that records each call; compares equal to the wrapped callback
+    so `unobserve` and `on_click(..., remove=True)` keep working."""
+
+    __slots__ = ("func", "name", "instrumentation")
+
+    def __init__(self, func, name, instrumentation):
+        self.func = func
+        self.name = name
+        self.instrumentation = instrumentation
+
+    def __call__(self, *args, **kwargs):
+        instrumentation = self.instrumentation
+        if not instrumentation.enabled:
+            return self.func(*args, **kwargs)
+
+        frame = [0, 0]  # messages, bytes sent
+        instrumentation._frames.append(frame)
+        start = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            ms = (time.perf_counter() - start) * 1e3
+            instrumentation._frames.pop()
+            change = args[0] if args else None
+            bytes_in = _nbytes(change["new"]) if isinstance(change, dict) and "new" in change else 0
+            instrumentation.record(self.name, ms, frame[0], frame[1], bytes_in)
+
+    def __eq__(self, other):
+        return self.func == (other.func if isinstance(other, _Timed) else other)
+
+    def __hash__(self):
+        return hash(self.func)
+
+
+def callback_name(func):
+    module = getattr(func, "__module__", None) or ""
+    return f"{module.rsplit('.', 1)[-1]}.{getattr(func, '__qualname__', type(func).__qualname__)}"
+
+
+class Instrumentation:
+    """Opt-in latency recording for the callbacks of the course widgets.
+
+    When enabled, every observer and button callback that code in
+    `fysisk_biokemi` registers is wrapped, as are the functions run by
+    `CoalescedCall`, `DelayedCall` and `FrameScheduler` (the deferred
+    renders). Each call records its wall time in a histogram, together with
+    the widget messages and bytes sent to the front end while it ran and the
+    size of the trait value it received. Nothing is patched while disabled.
+
+    Set the environment variable FYSISK_BIOKEMI_INSTRUMENT=1 to enable it
+    on import, or to a directory to also write a JSON report there when the
+    kernel exits.
+
+    Example:
+        from fysisk_biokemi.widgets import instrumentation
+        instrumentation.enable()
+        ...
+        instrumentation.to_dataframe().sort_values("total_ms", ascending=False)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stats = {}
+        self._frames = []
+        self._originals = {}
+
+    # ---------- Recording ----------
+    def record(self, name, ms, messages=0, bytes_sent=0, bytes_in=0):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = CallbackStats(name)
+        stats.add(ms, messages, bytes_sent, bytes_in)
+
+    def wrap(self, func, name=None):
+        """Return `func` wrapped for recording (or `func` itself while disabled)."""
+        if not self.enabled or isinstance(func, _Timed):
+            return func
+        return _Timed(func, name or callback_name(func), self)
+
+    def _wrap_ours(self, handler):
+        # Only plain functions and methods; scheduler objects record the function they run.
+        if not (inspect.isfunction(handler) or inspect.ismethod(handler)):
+            return handler
+        if not (getattr(handler, "__module__", None) or "").startswith("fysisk_biokemi"):
+            return handler
+        return self.wrap(handler)
+
+    # ---------- Switching ----------
+    def enable(self):
+        if self.enabled:
+            return
+        import traitlets
+        import ipywidgets
+
+        instrumentation = self
+        observe = traitlets.HasTraits.observe
+        on_click = ipywidgets.Button.on_click
+        send = ipywidgets.Widget._send
+        self._originals = {
+            (traitlets.HasTraits, "observe"): observe,
+            (ipywidgets.Button, "on_click"): on_click,
+            (ipywidgets.Widget, "_send"): send,
+        }
+
+        def patched_observe(self, handler, names=traitlets.All, type="change"):
+            return observe(self, instrumentation._wrap_ours(handler), names=names, type=type)
+
+        def patched_on_click(self, callback, remove=False):
+            return on_click(self, instrumentation._wrap_ours(callback), remove=remove)
+
+        def patched_send(self, msg, buffers=None):
+            if instrumentation._frames:
+                size = len(json.dumps(msg, default=str)) + sum(memoryview(b).nbytes for b in buffers or ())
+                for frame in instrumentation._frames:
+                    frame[0] += 1
+                    frame[1] += size
+            return send(self, msg, buffers)
+
+        traitlets.HasTraits.observe = patched_observe
+        ipywidgets.Button.on_click = patched_on_click
+        ipywidgets.Widget._send = patched_send
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording. Callbacks wrapped so far call straight through."""
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals = {}
+        self.enabled = False
+
+    def reset(self):
+        self.stats.clear()
+
+    # ---------- Export ----------
+    def to_dict(self):
+        return {
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "time": time.time(),
+            "edges_ms": list(EDGES_MS),
+            "callbacks": {name: stats.to_dict() for name, stats in self.stats.items()},
+        }
+
+    def to_json(self, path=None):
+        """JSON report; also written to `path` if given."""
+        text = json.dumps(self.to_dict(), indent=1)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_dataframe(self):
+        """One row per callback with call counts, latency quantiles and traffic."""
+        import pandas as pd
+
+        rows = [
+            {
+                "callback": s.name,
+                "calls": s.calls,
+                "total_ms": s.total_ms,
+                "mean_ms": s.total_ms / s.calls,
+                "p50_ms": s.quantile(0.5),
+                "p95_ms": s.quantile(0.95),
+                "max_ms": s.max_ms,
+                "messages": s.messages,
+                "bytes_sent": s.bytes_sent,
+                "bytes_in": s.bytes_in,
+            }
+            for s in self.stats.values()
+        ]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+
+instrumentation = Instrumentation()
+
+
+def configure_from_env():
+    value = os.environ.get(ENV_VAR, "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return
+    instrumentation.enable()
+    if value.lower() not in ("1", "true", "yes", "on"):
+        os.makedirs(value, exist_ok=True)
+        path = os.path.join(value, f"instrument-{socket.gethostname()}-{os.getpid()}.json")
+        atexit.register(lambda: instrumentation.stats and instrumentation.to_json(path))
+
+
+configure_from_env()
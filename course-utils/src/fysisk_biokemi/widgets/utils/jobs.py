@@ -0,0 +1,226 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import ipywidgets as widgets
+
+from fysisk_biokemi.widgets.utils.instrumentation import callback_name, instrumentation
+from fysisk_biokemi.widgets.utils.scheduling import running_loop
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+_undelivered = set()  # jobs in a pool whose result has not reached the event loop yet
+
+
+def executor(kind="thread"):
+    """The shared thread or process pool that runs jobs of the given kind."""
+    with _executors_lock:
+        pool = _executors.get(kind)
+        if pool is None:
+            workers = min(4, os.cpu_count() or 1)
+            if kind == "thread":
+                pool = ThreadPoolExecutor(workers, thread_name_prefix="fysisk-biokemi-job")
+            elif kind == "process":
+                pool = ProcessPoolExecutor(workers)
+            else:
+                raise ValueError(f"Unknown job kind: {kind}")
+            _executors[kind] = pool
+        return pool
+
+
+def pending_jobs():
+    """Jobs running in a pool whose result has not been handed to the event loop yet.
+
+    Used by `HeadlessSession` to wait until everything an event started is done.
+    """
+    return [job for job in list(_undelivered) if not job.cancelled]
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by its progress callback once the job has been cancelled."""
+
+
+class Job:
+    """One submitted call; `cancelled` is set when newer input makes it stale."""
+
+    def __init__(self, func, on_done=None, on_error=None):
+        self.func = func
+        self.name = callback_name(func)
+        self.on_done = instrumentation.wrap(on_done) if on_done is not None else None
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None
+        self.started = time.perf_counter()
+
+    def cancel(self):
+        self.cancelled = True
+        _undelivered.discard(self)
+        if self.future is not None:
+            self.future.cancel()  # only succeeds if it has not started yet
+
+    @property
+    def done(self) -> bool:
+        return self.future is None or self.future.done()
+
+
+class JobRunner:
+    """Run a widget's expensive work in a thread or process pool.
+
+    The kernel's main thread stays free while the job runs, so the notebook's
+    widgets keep responding. Submitting a new job cancels the previous one:
+    its result is dropped, and a job that reports progress stops at its next
+    report. Results and errors are handed to `on_done`/`on_error` on the
+    kernel's event loop, so callbacks may update widgets and Outputs as usual.
+    `progress` is a progress bar that appears for jobs that take a while.
+
+    Without a running event loop (plain scripts) or threads (Pyodide/JupyterLite)
+    jobs run immediately.
+
+    Example:
+        self.jobs = JobRunner(description="Beregner:")
+        self.jobs.submit(sequences_to_df, sequences=seqs, ph=ph, progress=True, on_done=self._show_table)
+    """
+
+    def __init__(self, kind="thread", description="", show_after=0.25, update_interval=0.1):
+        self.kind = kind
+        self.show_after = show_after
+        self.update_interval = update_interval
+        self.progress = widgets.FloatProgress(
+            value=0, min=0, max=1, description=description, layout={"display": "none"}
+        )
+        # Closing the widgets (e.g. when their cell is re-run) cancels the job.
+        self.progress.observe(self._on_progress_closed, names="comm")
+        self._job = None
+        self._show_handle = None
+
+    def _on_progress_closed(self, change):
+        if change["new"] is None:
+            self.cancel()
+
+    # ---------- Submitting ----------
+    def submit(self, func, *args, on_done=None, on_error=None, progress=False, **kwargs):
+        """Run `func(*args, **kwargs)` in the background and pass the result to `on_done`.
+
+        With progress=True, `func` is also given `progress=report`, where
+        `report(done, total)` updates the progress bar (thread jobs only).
+        """
+        self.cancel()
+        job = self._job = Job(func, on_done, on_error)
+
+        loop = running_loop()
+        if progress:
+            if self.kind != "thread":
+                raise ValueError("Progress reporting needs kind='thread'.")
+            kwargs["progress"] = self._reporter(job, loop)
+
+        if loop is None or sys.platform == "emscripten":
+            return self._run_inline(job, func, args, kwargs)
+        try:
+            job.future = executor(self.kind).submit(func, *args, **kwargs)
+        except RuntimeError:  # no thread could be started
+            return self._run_inline(job, func, args, kwargs)
+        _undelivered.add(job)
+        job.future.add_done_callback(lambda future: loop.call_soon_threadsafe(self._on_future_done, job, future))
+        self._show_handle = loop.call_later(self.show_after, self._show, job)
+        return job
+
+    def _run_inline(self, job, func, args, kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._finish(job, None, e)
+        else:
+            self._finish(job, result, None)
+        return job
+
+    def _reporter(self, job, loop):
+        last = [0.0]
+
+        def report(done, total=None):
+            if job.cancelled:
+                raise JobCancelled()
+            now = time.monotonic()
+            if now - last[0] < self.update_interval and done != total:
+                return
+            last[0] = now
+            fraction = done / total if total else 0
+            if loop is None:
+                self._set_progress(job, fraction)
+            else:
+                loop.call_soon_threadsafe(self._set_progress, job, fraction)
+
+        return report
+
+    # ---------- On the event loop ----------
+    def _show(self, job):
+        self._show_handle = None
+        if job is self._job and not job.done:
+            self.progress.layout.display = None
+
+    def _set_progress(self, job, fraction):
+        if job is self._job:
+            self.progress.value = fraction
+
+    def _on_future_done(self, job, future):
+        _undelivered.discard(job)
+        if future.cancelled():
+            return
+        error = future.exception()
+        self._finish(job, None if error else future.result(), error)
+
+    def _finish(self, job, result, error):
+        if job is not self._job or job.cancelled:
+            return  # stale
+        self._job = None
+        self._hide()
+        if instrumentation.enabled:
+            instrumentation.record(f"job {job.name}", (time.perf_counter() - job.started) * 1e3)
+        if isinstance(error, JobCancelled):
+            return
+        if error is not None:
+            if job.on_error is None:
+                raise error
+            job.on_error(error)
+        elif job.on_done is not None:
+            job.on_done(result)
+
+    def _hide(self):
+        if self._show_handle is not None:
+            self._show_handle.cancel()
+            self._show_handle = None
+        if self.progress.layout.display != "none":
+            self.progress.layout.display = "none"
+            self.progress.value = 0
+
+    # ---------- Control ----------
+    @property
+    def running(self) -> bool:
+        return self._job is not None and not self._job.done
+
+    def wait(self, timeout=None):
+        """Block until the current job is done and hand its result to `on_done` right away.
+
+        For code that needs the result now, e.g. the next notebook cell after
+        an upload, without waiting for the event loop to deliver it.
+        """
+        job = self._job
+        if job is None or job.future is None:
+            return
+        wait([job.future], timeout)
+        if not job.future.done():
+            raise TimeoutError(f"{job.name} did not finish within {timeout} s.")
+        self._on_future_done(job, job.future)
+
+    def cancel(self):
+        """Cancel the current job, if any; its result will be ignored."""
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        self._hide()
+
+    def close(self):
+        self.cancel()
+        self.progress.close()
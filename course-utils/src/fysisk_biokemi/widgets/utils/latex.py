@@ -0,0 +1,58 @@
+import html
+
+import ipywidgets as widgets
+
+
+def math_html(*lines):
+    """Display-math HTML for `widgets.HTMLMath`, one `$$...$$` block per line.
+
+    The LaTeX is HTML-escaped (MathJax reads the decoded text), so `&` in
+    aligned environments and `<` in inequalities are safe.
+    """
+    return "".join(f"<div>$${html.escape(line, quote=False)}$$</div>" for line in lines)
+
+
+class MathView(widgets.HTMLMath):
+    """Persistent target for rendered LaTeX whose content is replaced in place.
+
+    Unlike `clear_output()` followed by `display(Math(...))`, the widget
+    stays in the page; setting the same content again sends nothing, so the
+    browser only re-typesets when the equations actually change.
+
+    Example:
+        self.result = MathView()
+        self.result.show(r"K_{eq} = 1.0", r"\\Delta G = 0")
+    """
+
+    def show(self, *lines):
+        self.value = math_html(*lines)
+
+    def show_text(self, text):
+        self.value = f"<div>{html.escape(text)}</div>"
+
+    def clear(self):
+        self.value = ""
+
+
+if __name__ == "__main__":
+    import time
+
+    from fysisk_biokemi.widgets.dilution_helper import DilutionHelper
+
+    helper = DilutionHelper()
+    sent = []
+    helper.output.comm.send = lambda *args, **kwargs: sent.append(args)
+
+    # Toggling between two volumes and units revisits the same four states.
+    steps = [(helper.final_vol, 2.0), (helper.final_vol_unit, "L"), (helper.final_vol, 1.0), (helper.final_vol_unit, "mL")]
+    n = 400
+    start = time.perf_counter()
+    for i in range(n):
+        widget, value = steps[i % len(steps)]
+        if widget is helper.final_vol:
+            widget.text_input.value = str(value)
+            widget._on_submit(None)
+        else:
+            widget.value = value
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed / n * 1e3:.2f} ms per change, {len(sent)} output updates for {n} changes")
@@ -0,0 +1,201 @@
+import hashlib
+import inspect
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+
+import ipywidgets
+from ipywidgets.widgets import widget as _widget_module
+
+from fysisk_biokemi.widgets.utils.misc import close_widget_tree, iter_widget_tree
+from fysisk_biokemi.widgets.utils.result_cache import _nbytes
+
+
+def current_cell():
+    """Return (cell key, execution count) of the running notebook cell, or (None, None).
+
+    The cell key is the cell id sent by the front end (JupyterLab, Notebook 7,
+    VS Code) or, where none is sent (e.g. Colab), a hash of the cell source.
+    """
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return None, None
+    ip = get_ipython()
+    if ip is None:
+        return None, None
+
+    execution = getattr(ip, "execution_count", None)
+    kernel = getattr(ip, "kernel", None)
+    if kernel is not None:
+        parent = kernel.get_parent() if hasattr(kernel, "get_parent") else getattr(kernel, "_parent_header", None)
+        cell_id = (parent or {}).get("metadata", {}).get("cellId")
+        if cell_id:
+            return cell_id, execution
+    history = ip.user_ns.get("In")
+    if history:
+        return hashlib.sha1(history[-1].encode()).hexdigest()[:12], execution
+    return None, execution
+
+
+# JavaScript/CSS sources of anywidget-based widgets are shared by all instances.
+SHARED_TRAITS = {"_esm", "_css"}
+
+
+def live_instances():
+    """All open widgets of the kernel (ipywidgets 8 keeps them in `_instances`, 7 in `Widget.widgets`)."""
+    return getattr(_widget_module, "_instances", getattr(ipywidgets.Widget, "widgets", {}))
+
+
+def widget_nbytes(widget):
+    """Approximate memory held by a widget's state (arrays, strings, figure data)."""
+    return sum(_nbytes(getattr(widget, name, None)) for name in set(widget.keys) - SHARED_TRAITS)
+
+
+@dataclass
+class TrackedEntry:
+    """Widgets created by one call of a widget entry point."""
+
+    name: str
+    cell: str | None
+    execution: int | None
+    widgets: list = field(default_factory=list)
+
+    def live_widgets(self):
+        """All open widgets of this entry, including ones added to its containers later."""
+        live = {}
+        for root in self.widgets:
+            for w in iter_widget_tree(root):
+                if w.comm is not None:
+                    live[id(w)] = w
+        return list(live.values())
+
+    def close(self):
+        for w in self.widgets:
+            close_widget_tree(w)
+        self.widgets.clear()
+
+
+class WidgetRegistry:
+    """Keeps track of the widgets each notebook cell created and closes stale ones.
+
+    Every widget constructed while an entry point runs (see `tracked`) is
+    recorded for the cell that called it. When the same cell is executed
+    again, everything it created the previous time is closed, so old widget
+    trees, figures and their comm channels do not pile up in the kernel.
+    Outside a notebook there is no cell to re-execute: those widgets are
+    never closed automatically, and only the latest call of each entry point
+    is kept (for `close_all()` and `memory_report()`), so the registry does
+    not hold on to every widget a script ever created.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._active = None
+
+    @contextmanager
+    def track(self, name):
+        if self._active is not None:
+            # An entry point called from another one belongs to the outer call.
+            yield self._active
+            return
+
+        cell, execution = current_cell()
+        if cell is not None:
+            stale = [e for e in self.entries if e.cell == cell and e.execution != execution]
+            for entry in stale:
+                self.close(entry)
+        else:
+            self.entries = [e for e in self.entries if not (e.cell is None and e.name == name)]
+
+        entry = TrackedEntry(name, cell, execution)
+        previous_callback = getattr(ipywidgets.Widget, "_widget_construction_callback", None)
+
+        def on_constructed(widget):
+            entry.widgets.append(widget)
+            if previous_callback is not None:
+                previous_callback(widget)
+
+        ipywidgets.Widget.on_widget_constructed(on_constructed)
+        self._active = entry
+        try:
+            yield entry
+        finally:
+            self._active = None
+            ipywidgets.Widget.on_widget_constructed(previous_callback)
+            self.entries.append(entry)
+
+    def close(self, entry):
+        entry.close()
+        if entry in self.entries:
+            self.entries.remove(entry)
+
+    def close_all(self):
+        for entry in list(self.entries):
+            self.close(entry)
+
+    def memory_report(self):
+        """DataFrame with the live widgets per tracked entry and their approximate size."""
+        import pandas as pd
+
+        rows = []
+        tracked = set()
+        for entry in self.entries:
+            live = entry.live_widgets()
+            tracked.update(id(w) for w in live)
+            rows.append(
+                {
+                    "entry": entry.name,
+                    "cell": entry.cell,
+                    "execution": entry.execution,
+                    "widgets": len(live),
+                    "nbytes": sum(widget_nbytes(w) for w in live),
+                }
+            )
+        untracked = [w for w in list(live_instances().values()) if id(w) not in tracked]
+        rows.append(
+            {
+                "entry": "(untracked)",
+                "cell": None,
+                "execution": None,
+                "widgets": len(untracked),
+                "nbytes": sum(widget_nbytes(w) for w in untracked),
+            }
+        )
+        return pd.DataFrame(rows)
+
+
+registry = WidgetRegistry()
+
+
+def tracked(entry):
+    """Register the widgets created by an entry point function or class with `registry`.
+
+    Example:
+        @tracked
+        def solution_helper():
+            sh = SolutionHelper()
+            sh.display()
+    """
+    if inspect.isclass(entry):
+        init = entry.__init__
+
+        @wraps(init)
+        def __init__(self, *args, **kwargs):
+            with registry.track(entry.__name__):
+                init(self, *args, **kwargs)
+
+        entry.__init__ = __init__
+        return entry
+
+    @wraps(entry)
+    def wrapper(*args, **kwargs):
+        with registry.track(entry.__name__):
+            return entry(*args, **kwargs)
+
+    return wrapper
+
+
+def memory_report():
+    """Live widgets per notebook cell and their approximate footprint (see `WidgetRegistry`)."""
+    return registry.memory_report()
@@ -0,0 +1,260 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+import anywidget
+import numpy as np
+import traitlets
+from IPython.display import display
+
+from fysisk_biokemi.widgets.utils.figure import as_typed_array
+
+
+STATIC = Path(__file__).parent.parent / "static"
+
+# Top-level keys whose sub-properties may be addressed with underscores,
+# as in plotly's "magic underscore" notation (xaxis_title, line_dash, ...).
+CONTAINERS = {"xaxis", "yaxis", "title", "legend", "margin", "font", "line", "marker"}
+DATA_PROPS = ("x", "y")
+
+
+def _path(key):
+    if "." in key:
+        return key.split(".")
+    if key.partition("_")[0] in CONTAINERS:
+        return key.split("_")
+    return [key]
+
+
+def _get(props, key):
+    value = props
+    for part in _path(key):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _set(props, key, value):
+    *parents, last = _path(key)
+    for part in parents:
+        if isinstance(props.get(part), str):
+            props[part] = {"text": props[part]}
+        elif not isinstance(props.get(part), dict):
+            props[part] = {}
+        props = props[part]
+    if isinstance(value, dict) and isinstance(props.get(last), dict):
+        for sub_key, sub_value in value.items():
+            _set(props[last], sub_key, sub_value)
+    else:
+        props[last] = value
+
+
+def _traces_to_json(traces, widget):
+    return [
+        {
+            key: {"dtype": str(value.dtype), "shape": list(value.shape), "buffer": memoryview(value)}
+            if isinstance(value, np.ndarray)
+            else value
+            for key, value in trace.items()
+        }
+        for trace in traces
+    ]
+
+
+class LitePlotWidget(anywidget.AnyWidget):
+    """Canvas front end of `LitePlot`; trace arrays are sent as binary buffers."""
+
+    _esm = (STATIC / "canvas_plot.js").read_text() + (STATIC / "lite_plot.js").read_text()
+
+    traces = traitlets.List().tag(sync=True, to_json=_traces_to_json)
+    shapes = traitlets.List().tag(sync=True)
+    annotations = traitlets.List().tag(sync=True)
+    figure_layout = traitlets.Dict().tag(sync=True)
+
+
+class _Props:
+    """Plotly-style access to one dict of figure properties."""
+
+    def __init__(self, props, on_change, data_props=()):
+        object.__setattr__(self, "_props", props)
+        object.__setattr__(self, "_on_change", on_change)
+        object.__setattr__(self, "_data_props", data_props)
+
+    def __getitem__(self, key):
+        value = _get(self._props, key)
+        return _Props(value, self._on_change) if isinstance(value, dict) else value
+
+    def __setitem__(self, key, value):
+        if key in self._data_props:
+            value = as_typed_array(value)
+        _set(self._props, key, value)
+        self._on_change()
+
+    def __getattr__(self, key):
+        if key.startswith("_"):
+            raise AttributeError(key)
+        return self[key]
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def update(self, props=None, **kwargs):
+        for key, value in {**(props or {}), **kwargs}.items():
+            if key in self._data_props:
+                value = as_typed_array(value)
+            _set(self._props, key, value)
+        self._on_change()
+        return self
+
+    def to_dict(self):
+        return self._props
+
+
+class _Layout(_Props):
+    def __init__(self, figure):
+        super().__init__(figure._layout, lambda: figure._changed("figure_layout"))
+        object.__setattr__(self, "_figure", figure)
+
+    @property
+    def shapes(self):
+        return tuple(_Props(s, lambda: self._figure._changed("shapes")) for s in self._figure._shapes)
+
+    @property
+    def annotations(self):
+        return tuple(_Props(a, lambda: self._figure._changed("annotations")) for a in self._figure._annotations)
+
+
+class LitePlot:
+    """Lightweight stand-in for `plotly.graph_objects.FigureWidget`.
+
+    Covers the subset the course widgets use: scatter traces (lines and/or
+    markers), vertical/horizontal lines, annotations, titles and linear/log
+    axes. Data is kept as numpy arrays and sent to a small canvas renderer
+    as binary buffers, so creating a plot does not load plotly.js and updates
+    are a few kilobytes. Property access follows plotly, so `FigureState`
+    works unchanged.
+
+    Use `fig.widget` to place the plot inside other ipywidgets containers
+    (or `as_widget(fig)`, which also accepts plotly figures).
+
+    Example:
+        fig = LitePlot(width=600, height=400)
+        fig.add_trace(go.Scatter(x=s, y=v, mode="lines"))
+        fig.add_vline(x=km, line_dash="dash", line_color="red")
+        fig.update_xaxes(type="log")
+    """
+
+    def __init__(self, width=600, height=400):
+        self.widget = LitePlotWidget()
+        self._traces = self.widget.traces
+        self._shapes = self.widget.shapes
+        self._annotations = self.widget.annotations
+        self._layout = self.widget.figure_layout
+        self._layout.update({"width": width, "height": height, "xaxis": {}, "yaxis": {}})
+        self._batch = None
+        self.layout = _Layout(self)
+
+    def _ipython_display_(self):
+        display(self.widget)
+
+    # ---------- Syncing ----------
+    def _changed(self, trait):
+        if self._batch is not None:
+            self._batch.add(trait)
+        else:
+            # The trait values are mutated in place, so push them explicitly.
+            self.widget.send_state(trait)
+
+    @contextmanager
+    def batch_update(self):
+        """Collect all changes made inside the block into one message."""
+        if self._batch is not None:
+            yield
+            return
+        self._batch = set()
+        try:
+            yield
+        finally:
+            changed, self._batch = self._batch, None
+            if changed:
+                self.widget.send_state(sorted(changed))
+
+    # ---------- Traces ----------
+    @property
+    def data(self):
+        return tuple(_Props(t, lambda: self._changed("traces"), DATA_PROPS) for t in self._traces)
+
+    def add_trace(self, trace):
+        props = trace.to_plotly_json() if hasattr(trace, "to_plotly_json") else dict(trace)
+        if props.pop("type", "scatter") != "scatter":
+            raise ValueError("LitePlot only supports scatter traces.")
+        props.pop("uid", None)
+        for key in DATA_PROPS:
+            if key in props:
+                props[key] = as_typed_array(props[key])
+        self._traces.append(props)
+        self._changed("traces")
+        return self
+
+    def add_traces(self, traces):
+        with self.batch_update():
+            for trace in traces:
+                self.add_trace(trace)
+        return self
+
+    # ---------- Shapes and annotations ----------
+    def _add_line(self, shape, line, kwargs, annotation):
+        line = dict(line or {})
+        for key in ("color", "dash", "width"):
+            if f"line_{key}" in kwargs:
+                line[key] = kwargs.pop(f"line_{key}")
+        shape["line"] = line
+        shape["visible"] = kwargs.pop("visible", True)
+        shape.update({k: v for k, v in kwargs.items() if not k.startswith("annotation")})
+        with self.batch_update():
+            self._shapes.append(shape)
+            self._changed("shapes")
+            if annotation is not None:
+                self.add_annotation(**annotation)
+        return self
+
+    def add_vline(self, x, line=None, annotation_text=None, annotation_position="top", **kwargs):
+        shape = {"type": "line", "x0": x, "x1": x, "y0": 0, "y1": 1, "xref": "x", "yref": "paper"}
+        annotation = None
+        if annotation_text is not None:
+            y, yanchor = (0, "top") if "bottom" in annotation_position else (1, "bottom")
+            xanchor = "left" if "right" in annotation_position else "right" if "left" in annotation_position else "center"
+            annotation = dict(x=x, y=y, yref="paper", text=annotation_text, xanchor=xanchor, yanchor=yanchor)
+        return self._add_line(shape, line, kwargs, annotation)
+
+    def add_hline(self, y, line=None, annotation_text=None, annotation_position="top right", **kwargs):
+        shape = {"type": "line", "x0": 0, "x1": 1, "y0": y, "y1": y, "xref": "paper", "yref": "y"}
+        annotation = None
+        if annotation_text is not None:
+            x, xanchor = (0, "left") if "left" in annotation_position else (1, "right")
+            yanchor = "top" if "bottom" in annotation_position else "bottom"
+            annotation = dict(x=x, xref="paper", y=y, text=annotation_text, xanchor=xanchor, yanchor=yanchor)
+        return self._add_line(shape, line, kwargs, annotation)
+
+    def add_annotation(self, **kwargs):
+        annotation = {}
+        for key, value in kwargs.items():
+            _set(annotation, key, value)
+        self._annotations.append(annotation)
+        self._changed("annotations")
+        return self
+
+    # ---------- Layout ----------
+    def update_layout(self, props=None, **kwargs):
+        for key, value in {**(props or {}), **kwargs}.items():
+            if key == "title" and isinstance(value, str):
+                value = {"text": value}
+            _set(self._layout, key, value)
+        self._changed("figure_layout")
+        return self
+
+    def update_xaxes(self, props=None, **kwargs):
+        return self.update_layout({"xaxis": {**(props or {}), **kwargs}})
+
+    def update_yaxes(self, props=None, **kwargs):
+        return self.update_layout({"yaxis": {**(props or {}), **kwargs}})
@@ -0,0 +1,183 @@
+import numpy as np
+
+from fysisk_biokemi.widgets.utils.equilibrium_reaction import Reaction
+
+
+class MassActionSystem:
+    """Mass-action kinetics compiled from one or more `Reaction` objects.
+
+    Each reaction `2 A + B = X` contributes a forward rate
+    k_f [A]^2 [B] and (if reversible) a backward rate k_b [X]. Rates,
+    right-hand side and Jacobian are evaluated for a whole batch of
+    concentrations and rate constants at once; leading axes are batch axes.
+
+    Example:
+        system = MassActionSystem("A = B")
+        c = system.simulate(t, {"A": 1.0, "B": 0.0}, k_forward=1.0, k_backward=0.5)
+    """
+
+    def __init__(self, reactions):
+        if isinstance(reactions, (str, Reaction)):
+            reactions = [reactions]
+        reactions = [Reaction(r) if isinstance(r, str) else r for r in reactions]
+        for reaction in reactions:
+            if not reaction.proper:
+                raise ValueError(f"Could not parse reaction: '{reaction.reaction_string}'")
+        self.reactions = reactions
+
+        species = []
+        for reaction in reactions:
+            for formula in reaction.get_terms():
+                if formula not in species:
+                    species.append(formula)
+        self.species = species
+
+        # Reaction orders, shape (n_reactions, n_species)
+        n_r, n_s = len(reactions), len(species)
+        self.reactant_orders = np.zeros((n_r, n_s))
+        self.product_orders = np.zeros((n_r, n_s))
+        for j, reaction in enumerate(reactions):
+            reactants, products = reaction.get_reaction_dicts()
+            for formula, coefficient in reactants.items():
+                self.reactant_orders[j, species.index(formula)] += coefficient
+            for formula, coefficient in products.items():
+                self.product_orders[j, species.index(formula)] += coefficient
+
+        # Stoichiometry matrix, shape (n_species, n_reactions)
+        self.stoichiometry = (self.product_orders - self.reactant_orders).T
+        self.reversible = np.array([getattr(r, "reversible", True) for r in reactions])
+
+    @property
+    def n_species(self):
+        return len(self.species)
+
+    @property
+    def n_reactions(self):
+        return len(self.reactions)
+
+    # ---------- Argument handling ----------
+    def _as_concentrations(self, concentrations):
+        if isinstance(concentrations, dict):
+            missing = [s for s in self.species if s not in concentrations]
+            if missing:
+                raise ValueError(f"Missing concentrations for: {', '.join(missing)}")
+            arrays = np.broadcast_arrays(*[np.asarray(concentrations[s], dtype=float) for s in self.species])
+            return np.stack(arrays, axis=-1)
+        concentrations = np.asarray(concentrations, dtype=float)
+        if concentrations.shape[-1] != self.n_species:
+            raise ValueError(f"Expected {self.n_species} species on the last axis, got {concentrations.shape[-1]}")
+        return concentrations
+
+    def _as_rate_constants(self, k):
+        """Rate constants with reactions on the last axis, shape (..., n_reactions).
+
+        A scalar applies to every reaction. Arrays must have the reactions on
+        the last axis (or a last axis of length 1 for "same for all"), so a
+        batch of scalar rate constants is written k[:, None]. A 1D array is
+        never guessed to be a batch: with as many entries as reactions it
+        would be ambiguous.
+        """
+        k = np.atleast_1d(np.asarray(k, dtype=float))
+        if k.shape[-1] == 1:
+            return k * np.ones(self.n_reactions)
+        if k.shape[-1] != self.n_reactions:
+            raise ValueError(
+                f"Expected rate constants with shape (..., {self.n_reactions}), got {k.shape}; "
+                "pass a batch of scalar rate constants as k[:, None]."
+            )
+        return k
+
+    def _rate_constants(self, k_forward, k_backward):
+        k_forward = self._as_rate_constants(k_forward)
+        k_backward = self._as_rate_constants(k_backward) * self.reversible
+        return k_forward, k_backward
+
+    # ---------- Kernel ----------
+    @staticmethod
+    def _monomials(c, orders):
+        """Return Π_i c_i^a_ij and its derivative with respect to c_i.
+
+        Shapes: c (..., n_s), orders (n_r, n_s) -> (..., n_r) and (..., n_r, n_s).
+        """
+        powers = c[..., None, :] ** orders
+        monomials = np.prod(powers, axis=-1)
+
+        # d/dc_i Π_k c_k^a_k = a_i c_i^(a_i - 1) Π_{k != i} c_k^a_k
+        n_s = orders.shape[-1]
+        others = np.repeat(powers[..., None, :], n_s, axis=-2)
+        others[..., np.arange(n_s), np.arange(n_s)] = 1.0
+        d_powers = np.where(orders > 0, orders * c[..., None, :] ** np.maximum(orders - 1, 0), 0.0)
+        derivatives = d_powers * np.prod(others, axis=-1)
+        return monomials, derivatives
+
+    def rates(self, concentrations, k_forward, k_backward=0.0):
+        """Net rate of each reaction, shape (..., n_reactions)."""
+        c = self._as_concentrations(concentrations)
+        k_forward, k_backward = self._rate_constants(k_forward, k_backward)
+        forward, _ = self._monomials(c, self.reactant_orders)
+        backward, _ = self._monomials(c, self.product_orders)
+        return k_forward * forward - k_backward * backward
+
+    def rhs(self, concentrations, k_forward, k_backward=0.0):
+        """Time derivative of all concentrations, shape (..., n_species)."""
+        return self.rates(concentrations, k_forward, k_backward) @ self.stoichiometry.T
+
+    def jacobian(self, concentrations, k_forward, k_backward=0.0):
+        """Analytic Jacobian d(dc/dt)/dc, shape (..., n_species, n_species)."""
+        c = self._as_concentrations(concentrations)
+        k_forward, k_backward = self._rate_constants(k_forward, k_backward)
+        _, d_forward = self._monomials(c, self.reactant_orders)
+        _, d_backward = self._monomials(c, self.product_orders)
+        d_rates = k_forward[..., None] * d_forward - k_backward[..., None] * d_backward
+        return self.stoichiometry @ d_rates
+
+    # ---------- Integration ----------
+    def simulate(self, t, initial, k_forward, k_backward=0.0, method="BDF", rtol=1e-6, atol=1e-12):
+        """Integrate the system for a batch of initial conditions and rate constants.
+
+        Parameters:
+            t: 1D array of output times (sorted, starting at the initial time).
+            initial: array (..., n_species) or dict {species: value(s)}.
+            k_forward, k_backward: scalar, (n_reactions,) or (..., n_reactions);
+                a batch of scalars that apply to every reaction is (..., 1).
+            method: any implicit `scipy.integrate.solve_ivp` method.
+
+        Returns:
+            Concentrations with shape (..., len(t), n_species), where the
+            leading axes are the broadcast batch shape of the inputs.
+        """
+        from scipy.integrate import solve_ivp
+        from scipy.sparse import csc_matrix
+
+        t = np.asarray(t, dtype=float)
+        c0 = self._as_concentrations(initial)
+        k_forward, k_backward = self._rate_constants(k_forward, k_backward)
+
+        batch_shape = np.broadcast_shapes(c0.shape[:-1], k_forward.shape[:-1], k_backward.shape[:-1])
+        n_batch = int(np.prod(batch_shape))
+        c0 = np.broadcast_to(c0, batch_shape + (self.n_species,)).reshape(n_batch, self.n_species)
+        k_forward = np.broadcast_to(k_forward, batch_shape + (self.n_reactions,)).reshape(n_batch, self.n_reactions)
+        k_backward = np.broadcast_to(k_backward, batch_shape + (self.n_reactions,)).reshape(n_batch, self.n_reactions)
+
+        # All batch members are integrated as one system with a block-diagonal Jacobian.
+        n = self.n_species
+        offsets = np.arange(n_batch)[:, None, None] * n
+        rows = np.broadcast_to(offsets + np.arange(n)[:, None], (n_batch, n, n)).ravel()
+        cols = np.broadcast_to(offsets + np.arange(n)[None, :], (n_batch, n, n)).ravel()
+        size = n_batch * n
+
+        def fun(_, y):
+            return self.rhs(y.reshape(n_batch, n), k_forward, k_backward).ravel()
+
+        def jac(_, y):
+            blocks = self.jacobian(y.reshape(n_batch, n), k_forward, k_backward)
+            return csc_matrix((blocks.ravel(), (rows, cols)), shape=(size, size))
+
+        solution = solve_ivp(
+            fun, (t[0], t[-1]), c0.ravel(), t_eval=t, method=method, jac=jac, rtol=rtol, atol=atol
+        )
+        if not solution.success:
+            raise RuntimeError(f"Integration failed: {solution.message}")
+
+        y = solution.y.reshape(n_batch, n, len(t)).transpose(0, 2, 1)
+        return y.reshape(batch_shape + (len(t), self.n_species))
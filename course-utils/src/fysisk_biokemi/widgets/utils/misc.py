@@ -37,3 +37,42 @@ def number_to_scientific_latex(num, precision=2):
     else:
         return f"{coefficient:.{precision}f} \\times 10^{{{exponent}}}"
 
+
+
+def iter_widget_tree(widget):
+    """Yield a widget and every widget it references (children, layout, style, ...)."""
+    from ipywidgets import Widget
+
+    seen = set()
+    stack = [widget]
+    while stack:
+        w = stack.pop()
+        if id(w) in seen:
+            continue
+        seen.add(id(w))
+        for name in w.keys:
+            value = getattr(w, name, None)
+            values = value if isinstance(value, (list, tuple)) else (value,)
+            stack.extend(v for v in values if isinstance(v, Widget))
+        yield w
+
+
+def close_widget_tree(widget):
+    """Close a widget and every widget it references (children, layout, style, ...).
+
+    `Widget.close()` only closes the widget itself, so e.g. a removed HBox
+    would otherwise leave its children and their Layout/Style models alive.
+    """
+    for w in list(iter_widget_tree(widget)):
+        w.close()
+
+
+def uploaded_files(value):
+    """[(name, content bytes)] from a FileUpload value.
+
+    ipywidgets 7 stores uploads as a dict keyed by file name, ipywidgets 8
+    as a tuple of dicts with a "name" key; both are accepted.
+    """
+    if isinstance(value, dict):
+        return [(name, bytes(info["content"])) for name, info in value.items()]
+    return [(info["name"], bytes(info["content"])) for info in value]
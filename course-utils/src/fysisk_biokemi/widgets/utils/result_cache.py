@@ -0,0 +1,69 @@
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _nbytes(value):
+    if isinstance(value, (np.ndarray, memoryview)):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(k) + _nbytes(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class LRUResultCache:
+    """Least-recently-used cache bounded by entry count and total size.
+
+    Sizes are measured with `ndarray.nbytes` for numpy results (and tuples of
+    them), so `max_bytes` is a real bound on the memory held by the cache.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][0]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        if key in self._data:
+            self.nbytes -= self._data.pop(key)[1]
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        self._data[key] = (value, size)
+        self.nbytes += size
+        while len(self._data) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.nbytes -= evicted
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+def adaptive_sample(func, x_min, x_max, max_points=500, n_initial=33, tol=1e-3, log=False, max_passes=12):
+    """Sample `func` on [x_min, x_max] with more points where the curve bends.
+
+    Starts from `n_initial` evenly spaced points and repeatedly bisects the
+    intervals around points that deviate from the straight line through their
+    neighbours by more than `tol` (relative to the y-range), until no interval
+    needs refinement or `max_points` is reached. `func` must be vectorized;
+    it is called once per refinement pass.
+
+    With `log=True` points are spaced and refined in log10(x), which suits
+    concentration axes spanning several decades (requires x_min > 0).
+
+    Returns:
+        (x, y) sorted by x.
+    """
+    if log:
+        if x_min <= 0 or x_max <= 0:
+            raise ValueError("Log sampling requires a positive range.")
+        to_x = lambda u: 10.0**u
+        u = np.linspace(np.log10(x_min), np.log10(x_max), min(n_initial, max_points))
+    else:
+        to_x = lambda u: u
+        u = np.linspace(x_min, x_max, min(n_initial, max_points))
+
+    y = np.asarray(func(to_x(u)), dtype=float)
+    min_width = abs(u[-1] - u[0]) * 1e-9
+
+    for _ in range(max_passes):
+        budget = max_points - len(u)
+        if budget <= 0 or len(u) < 3:
+            break
+
+        finite = np.isfinite(y)
+        y_scale = np.ptp(y[finite]) if finite.any() else 0.0
+        y_scale = y_scale if y_scale > 0 else 1.0
+
+        # Deviation of each interior point from linear interpolation of its neighbours.
+        weight = (u[1:-1] - u[:-2]) / (u[2:] - u[:-2])
+        linear = y[:-2] + weight * (y[2:] - y[:-2])
+        deviation = np.zeros_like(y)
+        deviation[1:-1] = np.nan_to_num(np.abs(y[1:-1] - linear), nan=np.inf) / y_scale
+
+        interval_error = np.maximum(deviation[:-1], deviation[1:])
+        interval_error[np.diff(u) < min_width] = 0.0
+        refine = np.flatnonzero(interval_error > tol)
+        if len(refine) == 0:
+            break
+        if len(refine) > budget:
+            refine = refine[np.argsort(interval_error[refine])[::-1][:budget]]
+
+        u_new = 0.5 * (u[refine] + u[refine + 1])
+        y_new = np.asarray(func(to_x(u_new)), dtype=float)
+        u = np.concatenate([u, u_new])
+        y = np.concatenate([y, y_new])
+        order = np.argsort(u, kind="stable")
+        u, y = u[order], y[order]
+
+    return to_x(u), y
+
+
+if __name__ == "__main__":
+    calls = []
+
+    def binding(x):
+        calls.append(len(x))
+        return x / (1e-6 + x)
+
+    x, y = adaptive_sample(binding, 1e-9, 1e-3, log=True)
+    print(f"log binding curve: {len(x)} points in {len(calls)} calls")
+
+    calls.clear()
+    x, y = adaptive_sample(binding, 0.0, 1e-3)
+    print(f"linear binding curve: {len(x)} points in {len(calls)} calls")
+
+    ph = np.linspace(0, 14, 10_000)
+    reference = 1 / (1 + 10.0 ** (7 - ph))
+    x, y = adaptive_sample(lambda p: 1 / (1 + 10.0 ** (7 - p)), 0, 14)
+    print(f"titration: {len(x)} points, max error {np.max(np.abs(np.interp(ph, x, y) - reference)):.1e}")
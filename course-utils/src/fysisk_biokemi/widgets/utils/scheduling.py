@@ -0,0 +1,213 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from fysisk_biokemi.widgets.utils.instrumentation import instrumentation
+
+
+def running_loop():
+    """Return the running asyncio loop (the kernel's loop in Jupyter) or None."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class CoalescedCall:
+    """Collapse bursts of calls into a single call of `func`.
+
+    Calling the object (e.g. as a traitlets observer) only marks `func` as
+    pending; it then runs once on the next tick of the event loop, no matter
+    how many trait changes arrived in between. Without a running loop (plain
+    scripts) the call happens immediately. `hold()` defers calls explicitly
+    and flushes once when the block exits.
+
+    Example:
+        self.recompute = CoalescedCall(self._render)
+        for w in inputs:
+            w.observe(self.recompute, names="value")
+    """
+
+    def __init__(self, func):
+        self.func = instrumentation.wrap(func)
+        self.requested = 0
+        self.executed = 0
+        self._pending = False
+        self._held = 0
+
+    def __call__(self, *args, **kwargs):
+        self.requested += 1
+        if self._pending:
+            return
+        self._pending = True
+        if not self._held:
+            self._schedule()
+
+    def _schedule(self):
+        loop = running_loop()
+        if loop is None:
+            self.flush()
+        else:
+            loop.call_soon(self.flush)
+
+    def flush(self):
+        """Run `func` now if a call is pending."""
+        if not self._pending:
+            return
+        self._pending = False
+        self.executed += 1
+        self.func()
+
+    @contextmanager
+    def hold(self):
+        """Defer all calls made inside the block and run `func` at most once at the end."""
+        self._held += 1
+        try:
+            yield self
+        finally:
+            self._held -= 1
+            if not self._held:
+                self.flush()
+
+    @property
+    def coalesced(self) -> int:
+        """Number of requested calls that were absorbed into another call."""
+        return self.requested - self.executed - int(self._pending)
+
+    @property
+    def stats(self) -> dict:
+        return {"requested": self.requested, "executed": self.executed, "coalesced": self.coalesced}
+
+
+class DelayedCall:
+    """Debounce or throttle calls of `func(*args)` in time.
+
+    mode="debounce": run `delay` seconds after the last call, with its arguments.
+    mode="throttle": run at most once per `delay` seconds; the first call runs
+    immediately and the latest of the following ones runs when the interval ends.
+
+    Without a running event loop every call runs immediately.
+    """
+
+    def __init__(self, func, delay=0.3, mode="debounce"):
+        if mode not in ("debounce", "throttle"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.func = instrumentation.wrap(func)
+        self.delay = delay
+        self.mode = mode
+        self._handle = None
+        self._args = None
+        self._last_run = None
+
+    def __call__(self, *args):
+        self._args = args
+        loop = running_loop()
+        if loop is None or self.delay <= 0:
+            self.flush()
+            return
+
+        now = loop.time()
+        if self.mode == "debounce":
+            self.cancel(keep_args=True)
+            self._handle = loop.call_later(self.delay, self.flush)
+        elif self._handle is None:
+            if self._last_run is None or now - self._last_run >= self.delay:
+                self.flush()
+            else:
+                self._handle = loop.call_at(self._last_run + self.delay, self.flush)
+
+    @property
+    def pending(self) -> bool:
+        return self._args is not None
+
+    def cancel(self, keep_args=False):
+        """Drop the scheduled call (and its arguments unless `keep_args`)."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not keep_args:
+            self._args = None
+
+    def flush(self):
+        """Run the pending call now."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._args is None:
+            return
+        args, self._args = self._args, None
+        loop = running_loop()
+        self._last_run = loop.time() if loop is not None else None
+        self.func(*args)
+
+
+class FrameScheduler(CoalescedCall):
+    """Render at most `max_fps` times per second, always from the latest state.
+
+    Slider events only mark a frame as pending; intermediate events that
+    arrive before the next frame is due are dropped, since the render
+    function reads the current widget state anyway. Achieved frame rate and
+    queue depth (events folded into one frame) are available from `stats`.
+
+    Example:
+        self.frame_scheduler = FrameScheduler(self._update_plot, max_fps=30)
+        slider.observe(self.frame_scheduler, names="value")
+    """
+
+    def __init__(self, func, max_fps=30.0, window=30):
+        super().__init__(func)
+        self.max_fps = max_fps
+        self.queue_depth = 0
+        self.last_queue_depth = 0
+        self.max_queue_depth = 0
+        self._handle = None
+        self._frame_times = deque(maxlen=window)
+
+    def __call__(self, *args, **kwargs):
+        self.queue_depth += 1
+        super().__call__(*args, **kwargs)
+
+    def _schedule(self):
+        loop = running_loop()
+        if loop is None or not self.max_fps:
+            self.flush()
+            return
+
+        now = time.monotonic()
+        due = self._frame_times[-1] + 1.0 / self.max_fps if self._frame_times else now
+        if due <= now:
+            self._handle = loop.call_soon(self.flush)
+        else:
+            self._handle = loop.call_later(due - now, self.flush)
+
+    def flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._pending:
+            return
+        self.last_queue_depth = self.queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        self.queue_depth = 0
+        self._frame_times.append(time.monotonic())
+        super().flush()
+
+    @property
+    def fps(self) -> float:
+        """Frame rate achieved over the last `window` frames."""
+        if len(self._frame_times) < 2:
+            return 0.0
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        return (len(self._frame_times) - 1) / elapsed if elapsed > 0 else float("inf")
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **super().stats,
+            "fps": self.fps,
+            "max_fps": self.max_fps,
+            "queue_depth": self.queue_depth,
+            "last_queue_depth": self.last_queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
@@ -4,6 +4,9 @@ import ipywidgets as widgets
 
 import numpy as np
 
+from fysisk_biokemi.widgets.utils.misc import close_widget_tree
+from fysisk_biokemi.widgets.utils.scheduling import DelayedCall
+
 _FLOAT_RE = re.compile(
     r"""^\s*                              # leading space
          [+-]?                            # optional sign
@@ -29,10 +32,20 @@ class StrictFloatText(widgets.VBox):
         layout: widgets.Layout = None
         style: widgets.WidgetStyle = None
         continuous_update: bool = True   # validate as the user types
+        update_mode: str = "continuous"  # when typed values reach `value`, see below
+        update_delay: float = 0.3        # seconds used by the delayed update modes
         required: bool = False           # if True, empty input is an error
         show_error: bool = True          # show HTML error line
         strict_dot: bool = True          # if True, any ',' triggers an error
 
+    Update modes (only used when continuous_update=True):
+        "continuous": validate and update `value` on every keystroke.
+        "debounce":   validate and update once typing has paused for `update_delay`.
+        "throttle":   validate and update at most once per `update_delay` while typing.
+        "idle":       show errors on every keystroke, but only commit `value` once
+                      typing has paused for `update_delay` (or on Enter), so
+                      observers never see partial inputs like "1." or "1.4".
+
     Public attributes:
         value: Optional[float]  (validated; None if empty/invalid)
         text: str               (raw text in the Text box)
@@ -57,6 +70,8 @@ class StrictFloatText(widgets.VBox):
         layout: widgets.Layout | None = None,
         style: dict | None = None,
         continuous_update: bool = True,
+        update_mode: str = "continuous",
+        update_delay: float = 0.3,
         required: bool = False,
         show_error: bool = True,
         strict_dot: bool = True,
@@ -67,6 +82,13 @@ class StrictFloatText(widgets.VBox):
         self._continuous_update = bool(continuous_update)
         self._suppress_value_events = False
 
+        if update_mode not in ("continuous", "debounce", "throttle", "idle"):
+            raise ValueError(f"Unknown update_mode: {update_mode}")
+        self._update_mode = update_mode
+        self._delayed_commit = DelayedCall(
+            self._commit_text, delay=update_delay, mode="throttle" if update_mode == "throttle" else "debounce"
+        )
+
         # Inner widgets
         self.text_input = widgets.Text(
             description=description,
@@ -108,14 +130,28 @@ class StrictFloatText(widgets.VBox):
         else:
             self.error_html.value = ""
 
+    def close(self):
+        """Close the input and its inner widgets; a pending delayed commit is dropped."""
+        delayed_commit = getattr(self, "_delayed_commit", None)
+        if delayed_commit is not None:
+            delayed_commit.cancel()
+        for child in getattr(self, "children", ()):
+            close_widget_tree(child)
+        super().close()
+
     # ---------- Event handlers ----------
     def _on_text_change(self, change):
         new_text = change["new"] or ""
         # Mirror raw text trait
         self.set_trait("text", new_text)
 
-        if self._continuous_update:
+        if self._continuous_update and self._update_mode == "continuous":
             self._validate_and_update(new_text, fire_change=True)
+        elif self._continuous_update:
+            if self._update_mode == "idle":
+                _, error = self._parse(new_text)
+                self.set_error(error)
+            self._delayed_commit(new_text)
         else:
             # Only enforce comma warning in non-continuous mode
             if self._strict_dot and "," in new_text:
@@ -124,10 +160,15 @@ class StrictFloatText(widgets.VBox):
                 self.set_error("")
 
     def _on_submit(self, _):
+        self._delayed_commit.cancel()
         self._validate_and_update(self.text_input.value or "", fire_change=True)
 
+    def _commit_text(self, txt: str):
+        self._validate_and_update(txt, fire_change=True)
+
     # ---------- Core validation ----------
-    def _validate_and_update(self, txt: str, fire_change: bool):
+    def _parse(self, txt: str):
+        """Return (value, error) for the raw text; value is NaN on error."""
         txt_stripped = txt.strip()
 
         error_value = np.nan
@@ -135,38 +176,26 @@ class StrictFloatText(widgets.VBox):
         # Empty handling
         if txt_stripped == "":
             if self._required:
-                self._assign_value(error_value, fire_change, error="Feltet må ikke være tomt.")
-            else:
-                self._assign_value(error_value, fire_change, error="")
-            return
+                return error_value, "Feltet må ikke være tomt."
+            return error_value, ""
 
         # Comma rule
         if self._strict_dot and "," in txt_stripped:
-            self._assign_value(
-                error_value,
-                fire_change,
-                error="Brug punktum (.) som decimalseparator — ikke komma (,).",
-            )
-            return
+            return error_value, "Brug punktum (.) som decimalseparator — ikke komma (,)."
 
         # Numeric format (dot as decimal, optional exponent)
         if not _FLOAT_RE.match(txt_stripped):
-            self._assign_value(
-                error_value,
-                fire_change,
-                error="Ugyldigt talformat. Brug f.eks. 1.43 eller -2.0e-3.",
-            )
-            return
+            return error_value, "Ugyldigt talformat. Brug f.eks. 1.43 eller -2.0e-3."
 
         # Safe float conversion
         try:
-            new_val = float(txt_stripped)
+            return float(txt_stripped), ""
         except Exception:
-            self._assign_value(error_value, fire_change, error="Kunne ikke fortolke tallet.")
-            return
+            return error_value, "Kunne ikke fortolke tallet."
 
-        # Success
-        self._assign_value(new_val, fire_change, error="")
+    def _validate_and_update(self, txt: str, fire_change: bool):
+        new_val, error = self._parse(txt)
+        self._assign_value(new_val, fire_change, error=error)
 
     def _assign_value(self, new_val, fire_change: bool, error: str):
         prev_val = getattr(self, "value", None)
@@ -4,7 +4,9 @@ import numpy as np
 from dataclasses import dataclass
 
 import plotly.graph_objects as go
-from functools import singledispatch
+
+from fysisk_biokemi.widgets.utils import FrameScheduler, FigureState, new_figure, tracked
+from functools import singledispatch, lru_cache
 
 
 
@@ -62,21 +64,79 @@ def quadratic(params: QuadraticBindingParameters, L_total=None) -> float:
     if L_total is None:
         L_total = params.L_total
 
-    K_D = params.K_D
-    P_total = params.P_total
-
-    theta = (
-        (P_total + L_total + K_D) / (2 * P_total)
-        - np.sqrt((
-            ((P_total + L_total + K_D) / (2 * P_total)) ** 2 
-            - L_total / P_total)
-        )
+    return quadratic_fraction_bound(params.K_D, params.P_total, L_total)
+
+
+def quadratic_fraction_bound(K_D, P_total, L_total):
+    """Fraction bound from the quadratic binding equation.
+
+    Uses the rationalized root 2 L / (b + sqrt(b^2 - 4 P L)) with
+    b = P + L + K_D, which avoids the subtractive cancellation of the
+    textbook form when P_total >> K_D. The discriminant is written as
+    (P - L)^2 + K_D (K_D + 2 P + 2 L) so it can never go negative.
+    Arguments broadcast against each other like regular numpy arrays.
+    """
+    K_D = np.asarray(K_D, dtype=float)
+    P_total = np.asarray(P_total, dtype=float)
+    L_total = np.asarray(L_total, dtype=float)
+
+    b = P_total + L_total + K_D
+    discriminant = (P_total - L_total) ** 2 + K_D * (K_D + 2 * P_total + 2 * L_total)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        theta = 2 * L_total / (b + np.sqrt(discriminant))
+    return np.where(b > 0, theta, 0.0)
+
+
+@dataclass(frozen=True)
+class BindingSweep:
+    """Fraction bound for both models on a K_D x P_total x L_total grid.
+
+    `theta_simple` has shape (n_K, 1, n_L) and `theta_quadratic` has shape
+    (n_K, n_P, n_L). Arrays are read-only since sweeps are cached.
+    """
+    K_D: np.ndarray
+    P_total: np.ndarray
+    L_total: np.ndarray
+    theta_simple: np.ndarray
+    theta_quadratic: np.ndarray
+
+    @property
+    def deviation(self) -> np.ndarray:
+        """Largest |theta_quadratic - theta_simple| over L, shape (n_K, n_P)."""
+        return np.max(np.abs(self.theta_quadratic - self.theta_simple), axis=-1)
+
+
+def fraction_bound_sweep(K_D, P_total, L_total) -> BindingSweep:
+    """Evaluate both binding models on the full grid spanned by 1D inputs.
+
+    Results are cached on the grid values, so repeated calls with the same
+    grids (e.g. from a widget redrawing) are free.
+    """
+    return _fraction_bound_sweep(
+        tuple(np.atleast_1d(np.asarray(K_D, dtype=float)).tolist()),
+        tuple(np.atleast_1d(np.asarray(P_total, dtype=float)).tolist()),
+        tuple(np.atleast_1d(np.asarray(L_total, dtype=float)).tolist()),
     )
-    return theta
+
+
+@lru_cache(maxsize=16)
+def _fraction_bound_sweep(K_D, P_total, L_total) -> BindingSweep:
+    K = np.array(K_D)[:, None, None]
+    P = np.array(P_total)[None, :, None]
+    L = np.array(L_total)[None, None, :]
+
+    theta_simple = L / (L + K)
+    theta_quadratic = quadratic_fraction_bound(K, P, L)
+
+    arrays = [np.array(K_D), np.array(P_total), np.array(L_total), theta_simple, theta_quadratic]
+    for array in arrays:
+        array.flags.writeable = False
+    return BindingSweep(*arrays)
 
 class EyeBallingWidget:
 
-    def __init__(self, correct_threshold=10.0):
+    def __init__(self, correct_threshold=10.0, backend=None):
+        self.backend = backend
         self.plot_output = widgets.Output()
         self.error_output = widgets.Output()
 
@@ -122,7 +182,8 @@ class EyeBallingWidget:
         return L, theta
 
     def _make_plot(self):
-        self.fig = go.FigureWidget(layout=go.Layout(width=600, height=400))
+        self.fig = new_figure(width=600, height=400, backend=self.backend)
+        self.figure_state = FigureState(self.fig)
 
         x, y = self._get_data()
 
@@ -146,15 +207,9 @@ class EyeBallingWidget:
 
         L, theta = self._get_data()
 
-        self.fig.data[0].x = L
-        self.fig.data[0].y = theta
-
-        if self.params.log:
-            self.fig.update_xaxes(type="log")
-        else:
-            self.fig.update_xaxes(type="linear")
-
-        #self.fig.update_traces()
+        with self.figure_state.update() as state:
+            state.trace(0, x=L, y=theta)
+            state.layout(xaxis_type="log" if self.params.log else "linear")
 
     def _on_generate_button_clicked(self, b):
         self.params = SingleBindingParameters.get_random()
@@ -190,7 +245,8 @@ class EyeBallingWidget:
             
 class CompareSimpleVSQuadraticWidget:
 
-    def __init__(self):
+    def __init__(self, max_fps=30.0, backend=None):
+        self.backend = backend
 
         # Controls: 
         self.k_d_input = widgets.FloatSlider(
@@ -209,8 +265,9 @@ class CompareSimpleVSQuadraticWidget:
         )
         self.plot_output = widgets.Output()
 
-        self.k_d_input.observe(self._update_plot, names='value')
-        self.p_total_input.observe(self._update_plot, names='value')
+        self.frame_scheduler = FrameScheduler(self._update_plot, max_fps=max_fps)
+        self.k_d_input.observe(self.frame_scheduler, names='value')
+        self.p_total_input.observe(self.frame_scheduler, names='value')
 
     def _calculate(self):
         L = np.linspace(0, 10 * self.k_d_input.value, 100)
@@ -228,7 +285,8 @@ class CompareSimpleVSQuadraticWidget:
 
 
     def _make_plot(self):
-        self.fig = go.FigureWidget(layout=go.Layout(width=700, height=500))
+        self.fig = new_figure(width=700, height=500, backend=self.backend)
+        self.figure_state = FigureState(self.fig)
 
         L, theta_simple, theta_quad = self._calculate()
 
@@ -256,10 +314,9 @@ class CompareSimpleVSQuadraticWidget:
     def _update_plot(self, change=None):
         L, theta_simple, theta_quad = self._calculate()
      
-        self.fig.data[0].x = L
-        self.fig.data[0].y = theta_simple
-        self.fig.data[1].x = L
-        self.fig.data[1].y = theta_quad
+        with self.figure_state.update() as state:
+            state.trace(0, x=L, y=theta_simple)
+            state.trace(1, x=L, y=theta_quad)
 
     def display(self):
         self._make_plot()
@@ -268,11 +325,119 @@ class CompareSimpleVSQuadraticWidget:
         widget = widgets.HBox([controls, plot])    
         display(widget)
 
+class BindingModelBreakdownWidget:
+    """Heatmap of where the simple binding model deviates from the quadratic one.
+
+    The map is computed once from a cached `fraction_bound_sweep`; moving the
+    sliders only moves the marker and the readout.
+    """
+
+    K_D_GRID = np.geomspace(0.1, 100.0, 60)
+    P_TOTAL_GRID = np.geomspace(0.1, 1000.0, 60)
+    L_TOTAL_GRID = np.concatenate([[0.0], np.geomspace(1e-3, 1e4, 200)])
+
+    def __init__(self, threshold=0.05, max_fps=30.0):
+        self.threshold = threshold
+
+        self.k_d_input = widgets.FloatLogSlider(
+            description="K_D (µM):",
+            value=10.0,
+            base=10, min=-1, max=2, step=0.01,
+            style={'description_width': 'initial'},
+        )
+        self.p_total_input = widgets.FloatLogSlider(
+            description="P_total (µM):",
+            value=10.0,
+            base=10, min=-1, max=3, step=0.01,
+            style={'description_width': 'initial'},
+        )
+        self.readout = widgets.HTML()
+
+        self.frame_scheduler = FrameScheduler(self._update_plot, max_fps=max_fps)
+        self.k_d_input.observe(self.frame_scheduler, names='value')
+        self.p_total_input.observe(self.frame_scheduler, names='value')
+
+        self.sweep = fraction_bound_sweep(self.K_D_GRID, self.P_TOTAL_GRID, self.L_TOTAL_GRID)
+
+    def _current_deviation(self):
+        K_D = self.k_d_input.value
+        P_total = self.p_total_input.value
+        L = self.L_TOTAL_GRID
+        theta_simple = L / (L + K_D)
+        theta_quad = quadratic_fraction_bound(K_D, P_total, L)
+        return np.max(np.abs(theta_quad - theta_simple))
+
+    def _make_plot(self):
+        self.fig = go.FigureWidget(layout=go.Layout(width=700, height=500))
+        self.figure_state = FigureState(self.fig)
+
+        self.fig.add_trace(go.Heatmap(
+            x=self.sweep.P_total,
+            y=self.sweep.K_D,
+            z=self.sweep.deviation,
+            zmin=0, zmax=1,
+            colorscale="Viridis",
+            colorbar=dict(title="max |Δθ|"),
+        ))
+        self.fig.add_trace(go.Contour(
+            x=self.sweep.P_total,
+            y=self.sweep.K_D,
+            z=self.sweep.deviation,
+            contours=dict(start=self.threshold, end=self.threshold, coloring="none", showlabels=True),
+            line=dict(color="white", width=2, dash="dash"),
+            showscale=False,
+            hoverinfo="skip",
+        ))
+        self.fig.add_trace(go.Scatter(
+            x=[self.p_total_input.value],
+            y=[self.k_d_input.value],
+            mode="markers",
+            marker=dict(size=14, color="red", symbol="x"),
+            showlegend=False,
+        ))
+
+        self.fig.update_layout(
+            xaxis_title="P_total (µM)",
+            yaxis_title="K_D (µM)",
+            title="Afvigelse mellem simpel og kvadratisk binding",
+        )
+        self.fig.update_xaxes(type="log")
+        self.fig.update_yaxes(type="log")
+        self._update_readout()
+
+    def _update_readout(self):
+        deviation = self._current_deviation()
+        self.readout.value = f"<b>max |Δθ|:</b> {deviation:.3f}"
+        if deviation > self.threshold:
+            self.readout.value += " (simpel model bryder sammen)"
+
+    def _update_plot(self, change=None):
+        with self.figure_state.update() as state:
+            state.trace(2, x=[self.p_total_input.value], y=[self.k_d_input.value])
+        self._update_readout()
+
+    def display(self):
+        self._make_plot()
+        controls = widgets.VBox([self.k_d_input, self.p_total_input, self.readout])
+        widget = widgets.HBox([controls, self.fig])
+        display(widget)
+
+@tracked
 def estimate_kd():
     widget = EyeBallingWidget()
     widget.display()
 
-def visualize_simple_vs_quadratic():
+@tracked
+def visualize_simple_vs_quadratic(client_side=False):
+    if client_side:
+        from fysisk_biokemi.widgets.client_models import binding_model
+
+        display(binding_model())
+        return
     widget = CompareSimpleVSQuadraticWidget()
     widget.display()
 
+@tracked
+def visualize_binding_model_breakdown():
+    widget = BindingModelBreakdownWidget()
+    widget.display()
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from fysisk_biokemi.widgets.buffer_equation import calculate_acid_base_concentrations, polyprotic_speciation
+
+
+def test_monoprotic_speciation_is_henderson_hasselbalch():
+    pka, total = 4.76, 0.1
+    speciation = polyprotic_speciation([pka], total, ph_min=2.0, ph_max=8.0, n_points=61)
+    acid, base, ratio = calculate_acid_base_concentrations(speciation.ph, pka, total)
+
+    np.testing.assert_allclose(speciation.concentrations[0], acid, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(speciation.concentrations[1], base, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(speciation.fractions[1] / speciation.fractions[0], ratio, rtol=1e-12)
+
+
+def test_polyprotic_fractions():
+    pkas = (2.15, 7.20, 12.35)  # phosphoric acid
+    speciation = polyprotic_speciation(pkas, 0.05, n_points=1401)
+    np.testing.assert_allclose(speciation.fractions.sum(axis=0), 1.0)
+
+    # Neighbouring species are equally abundant at each pKa.
+    for j, pka in enumerate(pkas):
+        i = np.argmin(np.abs(speciation.ph - pka))
+        assert speciation.fractions[j, i] == pytest.approx(speciation.fractions[j + 1, i], rel=1e-9)
+
+    assert speciation.species_labels() == ["H3A", "H2A-", "HA2-", "A3-"]
+
+
+def test_speciation_does_not_overflow_for_extreme_ph():
+    speciation = polyprotic_speciation([1.0, 3.0, 5.0, 7.0], 0.1, ph_min=-300.0, ph_max=300.0, n_points=7)
+    assert np.all(np.isfinite(speciation.fractions))
+    np.testing.assert_allclose(speciation.fractions[:, 0], [1, 0, 0, 0, 0], atol=1e-12)
+    np.testing.assert_allclose(speciation.fractions[:, -1], [0, 0, 0, 0, 1], atol=1e-12)
@@ -0,0 +1,98 @@
+import os
+import pickle
+import time
+
+import pytest
+
+from fysisk_biokemi import cache
+from fysisk_biokemi.cache import DirectoryCache, SQLiteCache, cache_key, cached
+
+
+@pytest.fixture(autouse=True)
+def no_configured_cache(monkeypatch):
+    monkeypatch.delenv(cache.ENV_PATH, raising=False)
+    monkeypatch.setattr(cache, "_backend", None)
+    monkeypatch.setattr(cache, "_configured", False)
+
+
+@pytest.fixture(params=["sqlite", "directory"])
+def location(request, tmp_path):
+    return str(tmp_path / ("cache.sqlite" if request.param == "sqlite" else "cache"))
+
+
+def backend_for(location, **kwargs):
+    backend = SQLiteCache if location.endswith(".sqlite") else DirectoryCache
+    return backend(location, **kwargs)
+
+
+def test_put_get(location):
+    backend = backend_for(location)
+    backend.put("a", b"value")
+    assert backend.get("a") == b"value"
+    assert backend.get("missing") is None
+    assert len(backend) == 1
+
+
+def test_evicts_least_recently_used(location):
+    backend = backend_for(location, max_bytes=250)
+    backend.put("a", b"a" * 100)
+    time.sleep(0.01)
+    backend.put("b", b"b" * 100)
+    time.sleep(0.01)
+    assert backend.get("a") is not None  # now more recently used than "b"
+    time.sleep(0.01)
+    backend.put("c", b"c" * 100)
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+    assert backend.get("c") is not None
+    assert backend.nbytes() <= 250
+
+
+def test_read_only(location):
+    backend_for(location).put("a", b"value")
+    reader = backend_for(location, read_only=True)
+    assert reader.get("a") == b"value"
+    reader.put("b", b"other")
+    assert reader.get("b") is None
+    assert len(reader) == 1
+
+
+def test_corrupt_entry_falls_back_to_calling(location):
+    backend = cache.configure(location)
+    calls = []
+
+    @cached
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert calls == [3]
+
+    backend.put(cache_key(f"{square.__module__}.{square.__qualname__}", (3,)), b"not a pickle")
+    assert square(3) == 9
+    assert calls == [3, 3]
+    assert backend.errors == 1
+    assert pickle.loads(backend.get(cache_key(f"{square.__module__}.{square.__qualname__}", (3,)))) == 9
+
+
+def test_refuses_location_writable_by_others(location, tmp_path):
+    os.chmod(tmp_path, 0o777)
+    with pytest.raises(ValueError, match="writable by others"):
+        backend_for(location)
+
+
+def test_untrusted_environment_cache_is_turned_off(location, tmp_path, monkeypatch):
+    os.chmod(tmp_path, 0o777)
+    monkeypatch.setenv(cache.ENV_PATH, location)
+    with pytest.warns(UserWarning, match="Shared cache disabled"):
+        assert cache.get_cache() is None
+
+
+def test_rejects_entries_writable_by_others(tmp_path):
+    backend = DirectoryCache(str(tmp_path / "cache"))
+    backend.put("a", pickle.dumps(1))
+    os.chmod(backend._file("a"), 0o666)
+    with pytest.raises(ValueError):
+        backend.get("a")
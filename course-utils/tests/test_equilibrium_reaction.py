@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from fysisk_biokemi.widgets.utils.equilibrium_reaction import Reaction
+
+
+def test_solve_equilibrium_satisfies_keq_and_mass_balance():
+    K_eq = np.array([1e-6, 1.0, 1e6])
+    c = Reaction("2 A + B = C").solve_equilibrium(K_eq, {"A": 1.0, "B": 0.3})
+    np.testing.assert_allclose(c["C"] / (c["A"] ** 2 * c["B"]), K_eq, rtol=1e-9)
+    np.testing.assert_allclose(c["A"] + 2 * c["C"], 1.0)
+    np.testing.assert_allclose(c["B"] + c["C"], 0.3)
+
+
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+@pytest.mark.parametrize("catalyst", [0.0, 0.3])
+def test_solve_equilibrium_species_on_both_sides(catalyst):
+    c = Reaction("A + E = B + E").solve_equilibrium(2.0, {"A": 1.0, "E": catalyst})
+    np.testing.assert_allclose(c["B"], 2 / 3)
+    np.testing.assert_allclose(c["A"], 1 / 3)
+    assert c["E"] == catalyst
+
+
+def test_solve_equilibrium_unknown_species():
+    with pytest.raises(ValueError, match="Unknown species"):
+        Reaction("A = B").solve_equilibrium(1.0, {"X": 1.0})
@@ -0,0 +1,93 @@
+import time
+
+import ipywidgets as widgets
+import pytest
+
+from fysisk_biokemi.widgets.utils import CoalescedCall, HeadlessSession, JobRunner, StrictFloatText
+from fysisk_biokemi.widgets.utils.scheduling import running_loop
+
+
+def test_events_are_handled_on_an_event_loop():
+    loops = []
+
+    def entry():
+        slider = widgets.IntSlider(value=1, min=0, max=10, description="n")
+        slider.observe(lambda change: loops.append(running_loop()), names="value")
+
+    with HeadlessSession() as session:
+        opened = session.open("loop_entry", entry)
+        session.drag(opened.find(widgets.IntSlider), steps=5)
+
+    assert len(loops) == 5
+    assert all(loop is not None for loop in loops)
+    summary = session.summary()
+    assert summary.set_index("action").loc["drag n", "events"] == 5
+
+
+def test_coalesced_call_renders_once_per_event():
+    renders = []
+
+    def entry():
+        a = widgets.IntText(description="a")
+        b = widgets.IntText(description="b")
+        recompute = CoalescedCall(lambda: renders.append((a.value, b.value)))
+        a.observe(recompute, names="value")
+        b.observe(recompute, names="value")
+        button = widgets.Button(description="both")
+        button.on_click(lambda _: (setattr(a, "value", 1), setattr(b, "value", 2)))
+
+    with HeadlessSession() as session:
+        opened = session.open("coalesce_entry", entry)
+        session.click(opened.find(widgets.Button))
+
+    assert renders == [(1, 2)]
+
+
+@pytest.mark.parametrize("key_interval, committed", [(0.05, [1.25]), (1.0, [1.0, 1.2, 1.25])])
+def test_typing_goes_through_the_debounce(key_interval, committed):
+    values = []
+
+    def entry():
+        field = StrictFloatText(description="x", update_mode="idle", update_delay=0.3)
+        field.observe(lambda change: values.append(change["new"]), names="value")
+
+    with HeadlessSession(key_interval=key_interval) as session:
+        opened = session.open("debounce_entry", entry)
+        session.type(opened.find(StrictFloatText), "1.25", submit=False)
+
+    assert values == committed
+
+
+def test_background_job_result_is_part_of_the_event():
+    def slow():
+        time.sleep(0.05)
+        return 42
+
+    def entry():
+        jobs = JobRunner()
+        label = widgets.Label()
+        button = widgets.Button(description="run")
+        button.on_click(lambda _: jobs.submit(slow, on_done=lambda result: setattr(label, "value", str(result))))
+
+    with HeadlessSession() as session:
+        opened = session.open("job_entry", entry)
+        session.click(opened.find(widgets.Button))
+        assert opened.find(widgets.Label).value == "42"
+
+    click = session.summary().set_index("action").loc["click run"]
+    assert click["p50_ms"] >= 50
+
+
+def test_errors_in_scheduled_callbacks_are_raised():
+    def fail():
+        raise ZeroDivisionError("render failed")
+
+    def entry():
+        recompute = CoalescedCall(fail)
+        button = widgets.Button(description="fail")
+        button.on_click(lambda _: recompute())
+
+    with HeadlessSession() as session:
+        opened = session.open("error_entry", entry)
+        with pytest.raises(ZeroDivisionError, match="render failed"):
+            session.click(opened.find(widgets.Button))
@@ -0,0 +1,11 @@
+from fysisk_biokemi.widgets.interactive_plot import _quantize
+
+
+def test_quantize_counts_slider_steps():
+    assert _quantize(0.1 + 0.2, 0.1) == _quantize(0.3, 0.1) == 3
+    assert _quantize(0.34, 0.1) == 3
+
+
+def test_quantize_without_step():
+    assert _quantize(0.1 + 0.2, 0) == _quantize(0.3, None) == 0.3
+    assert _quantize(1e-9, 0) != _quantize(2e-9, 0)
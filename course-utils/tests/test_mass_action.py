@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from fysisk_biokemi.widgets.utils import MassActionSystem
+
+
+def test_rate_constants_need_reactions_on_the_last_axis():
+    system = MassActionSystem(["A = B", "B = C"])
+    c = {"A": 1.0, "B": 0.5, "C": 0.0}
+    np.testing.assert_allclose(system.rates(c, [1.0, 2.0]), [1.0, 1.0])
+    np.testing.assert_allclose(system.rates(c, 2.0), [2.0, 1.0])
+
+    # Two scalar rate constants for two reactions is not a batch ...
+    assert system.rates(c, [1.0, 2.0]).shape == (2,)
+    # ... a batch is written explicitly.
+    np.testing.assert_allclose(system.rates(c, np.array([1.0, 2.0])[:, None]), [[1.0, 0.5], [2.0, 1.0]])
+    with pytest.raises(ValueError, match="k\\[:, None\\]"):
+        system.rates(c, [1.0, 2.0, 3.0])
+
+
+def test_jacobian_matches_finite_differences():
+    system = MassActionSystem(["2 A + B = X", "X = Y + A"])
+    rng = np.random.default_rng(0)
+    c = rng.uniform(0.1, 1.0, size=(3, system.n_species))
+    k_forward, k_backward = [2.0, 0.7], [0.3, 1.5]
+
+    jacobian = system.jacobian(c, k_forward, k_backward)
+    step = 1e-6
+    numeric = np.empty_like(jacobian)
+    for i in range(system.n_species):
+        dc = np.zeros(system.n_species)
+        dc[i] = step
+        numeric[..., i] = (system.rhs(c + dc, k_forward, k_backward) - system.rhs(c - dc, k_forward, k_backward)) / (2 * step)
+    np.testing.assert_allclose(jacobian, numeric, rtol=1e-6, atol=1e-9)
+
+
+def test_batch_simulate_matches_analytic_solution():
+    system = MassActionSystem("A = B")
+    t = np.linspace(0, 5, 11)
+    k_forward = np.array([0.5, 1.0, 2.0])[:, None]
+    k_backward = 0.5
+
+    c = system.simulate(t, {"A": 1.0, "B": 0.0}, k_forward, k_backward, rtol=1e-10, atol=1e-14)
+    assert c.shape == (3, len(t), 2)
+
+    k_sum = k_forward + k_backward
+    A = (k_backward + k_forward * np.exp(-k_sum * t)) / k_sum
+    np.testing.assert_allclose(c[..., 0], A, rtol=1e-6)
+    np.testing.assert_allclose(c.sum(axis=-1), 1.0, rtol=1e-9)
+
+
+def test_batch_simulate_matches_separate_runs():
+    system = MassActionSystem("2 A = B")
+    t = np.linspace(0, 2, 5)
+    initial = {"A": np.array([1.0, 0.5]), "B": 0.0}
+    batch = system.simulate(t, initial, 1.0, 0.2)
+    for i, a0 in enumerate(initial["A"]):
+        np.testing.assert_allclose(batch[i], system.simulate(t, {"A": a0, "B": 0.0}, 1.0, 0.2), rtol=1e-5, atol=1e-9)
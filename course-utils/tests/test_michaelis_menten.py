@@ -0,0 +1,23 @@
+import ipywidgets as widgets
+
+from fysisk_biokemi.widgets.michaelis_menten import MichaelisMenten
+from fysisk_biokemi.widgets.utils import HeadlessSession
+
+
+def test_render_errors_are_shown_under_the_plot():
+    apps = []
+
+    def entry():
+        apps.append(MichaelisMenten())
+        apps[-1].display()
+
+    with HeadlessSession() as session:
+        opened = session.open("mm_entry", entry)
+        etot = opened.find(widgets.FloatText, "[Etot]:")
+        session.set(etot, 0.0)
+        text = "".join(output["text"] for output in apps[0].text_output.outputs)
+        assert "ZeroDivisionError" in text
+
+        session.set(etot, 0.001)
+        assert apps[0].text_output.outputs == ()
+        assert apps[0].fig.layout.annotations[1].text == "k_cat: 30000.0"
@@ -0,0 +1,46 @@
+import threading
+
+import ipywidgets as widgets
+import numpy as np
+
+from fysisk_biokemi.widgets.reaction_data_analysis import ReactionKeqWidget
+from fysisk_biokemi.widgets.utils import HeadlessSession
+
+
+class RecordingWidget(ReactionKeqWidget):
+    """Records the thread that stores the converted data."""
+
+    stored_on = []
+
+    @property
+    def _converted(self):
+        return self.__dict__.get("_converted")
+
+    @_converted.setter
+    def _converted(self, value):
+        self.stored_on.append(threading.current_thread())
+        self.__dict__["_converted"] = value
+
+
+def test_converted_data_is_stored_on_the_loop_thread_and_reused():
+    apps = []
+    t = np.linspace(0, 10, 50)
+    csv = "t,A (mM),B (mM)\n" + "\n".join(f"{x},{1 + x},{2 + x}" for x in t)
+
+    def entry():
+        apps.append(RecordingWidget(default_reaction="A = B"))
+        apps[-1].display()
+
+    with HeadlessSession() as session:
+        opened = session.open("keq_entry", entry)
+        session.upload(opened.find(widgets.FileUpload), "data.csv", csv.encode())
+        button = opened.find(widgets.Button, "Beregn og plot")
+        session.click(button)
+        app = apps[0]
+        first = app._converted
+        session.click(button)
+
+    assert app._converted is first
+    np.testing.assert_allclose(first[2][2], np.column_stack([1 + t, 2 + t]) * 1e-3)
+    assert all(thread is threading.main_thread() for thread in RecordingWidget.stored_on)
+    assert len(RecordingWidget.stored_on) == 4  # __init__, CSV read, two computations
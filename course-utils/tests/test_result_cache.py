@@ -0,0 +1,35 @@
+import numpy as np
+
+from fysisk_biokemi.widgets.utils import LRUResultCache
+
+
+def test_evicts_least_recently_used_entry():
+    cache = LRUResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert list(cache._data) == ["a", "c"]
+    assert cache.stats["hits"] == 1
+
+
+def test_bounded_by_array_bytes():
+    cache = LRUResultCache(max_bytes=2 * 800)
+    for key in "abc":
+        cache.put(key, (np.zeros(50), np.zeros(50)))  # 800 bytes each
+    assert list(cache._data) == ["b", "c"]
+    assert cache.nbytes == 1600
+
+    cache.put("huge", np.zeros(1000))  # larger than the whole cache: not stored
+    assert "huge" not in cache
+    assert len(cache) == 2
+
+
+def test_put_replaces_existing_entry():
+    cache = LRUResultCache()
+    cache.put("a", np.zeros(10))
+    cache.put("a", np.zeros(20))
+    assert cache.nbytes == 160
+    assert cache.get("missing", "default") == "default"
+    assert cache.stats["misses"] == 1
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from fysisk_biokemi.widgets.utils import adaptive_sample
+
+
+def test_refines_near_a_kink():
+    kink = 0.3
+    x, y = adaptive_sample(lambda x: np.abs(x - kink), 0.0, 1.0, max_points=200)
+    assert np.all(np.diff(x) > 0)
+    np.testing.assert_allclose(y, np.abs(x - kink))
+
+    spacing = np.diff(x)
+    near = np.abs(x[:-1] - kink) < 0.05
+    assert spacing[near].min() < spacing[~near].min() / 10
+    # Straight segments away from the kink need no extra points.
+    assert np.isclose(spacing[~near].max(), 1 / 32)
+
+
+def test_respects_point_budget_and_calls_once_per_pass():
+    calls = []
+
+    def step(x):
+        calls.append(len(x))
+        return (x > 0.5).astype(float)
+
+    x, _ = adaptive_sample(step, 0.0, 1.0, max_points=60, max_passes=50)
+    assert len(x) <= 60
+    assert sum(calls) == len(x)
+
+
+def test_log_sampling_of_a_binding_curve():
+    x, y = adaptive_sample(lambda L: L / (1e-6 + L), 1e-9, 1e-3, log=True, max_points=300)
+    assert x[0] == pytest.approx(1e-9) and x[-1] == pytest.approx(1e-3)
+    reference = np.geomspace(1e-9, 1e-3, 5000)
+    interpolated = np.interp(np.log10(reference), np.log10(x), y)
+    assert np.max(np.abs(interpolated - reference / (1e-6 + reference))) < 5e-3
+
+    with pytest.raises(ValueError, match="positive range"):
+        adaptive_sample(np.sin, 0.0, 1.0, log=True)
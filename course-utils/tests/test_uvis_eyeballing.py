@@ -0,0 +1,41 @@
+from decimal import Decimal, getcontext
+
+import numpy as np
+import pytest
+
+from fysisk_biokemi.widgets.uvis_eyeballing import quadratic_fraction_bound
+
+
+def exact_fraction_bound(K_D, P_total, L_total):
+    getcontext().prec = 50
+    K, P, L = Decimal(K_D), Decimal(P_total), Decimal(L_total)
+    b = P + L + K
+    return float((b - (b * b - 4 * P * L).sqrt()) / (2 * P))
+
+
+def naive_fraction_bound(K_D, P_total, L_total):
+    b = P_total + L_total + K_D
+    return (b - np.sqrt(b**2 - 4 * P_total * L_total)) / (2 * P_total)
+
+
+@pytest.mark.parametrize(
+    "K_D, P_total, L_total",
+    [(1e-6, 1e-6, 1e-6), (1e-9, 1.0, 1e-12), (1e-12, 1e-3, 1e-9), (1e-3, 1e-9, 1e-6)],
+)
+def test_quadratic_fraction_bound_matches_exact_root(K_D, P_total, L_total):
+    exact = exact_fraction_bound(K_D, P_total, L_total)
+    assert quadratic_fraction_bound(K_D, P_total, L_total) == pytest.approx(exact, rel=1e-12, abs=0)
+
+
+def test_precise_where_textbook_formula_cancels():
+    K_D, P_total, L_total = 1e-9, 1.0, 1e-12
+    exact = exact_fraction_bound(K_D, P_total, L_total)
+    assert abs(naive_fraction_bound(K_D, P_total, L_total) / exact - 1) > 1e-6
+    assert abs(quadratic_fraction_bound(K_D, P_total, L_total) / exact - 1) < 1e-12
+
+
+def test_quadratic_fraction_bound_broadcasts():
+    theta = quadratic_fraction_bound(1e-6, np.array([[1e-7], [1e-5]]), np.logspace(-9, -3, 5))
+    assert theta.shape == (2, 5)
+    assert np.all((theta >= 0) & (theta <= 1))
+    assert quadratic_fraction_bound(0.0, 0.0, 0.0) == 0.0